@@ -0,0 +1,111 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+
+interface IHarvestable {
+    function harvestTrigger(uint256 callCostInWei) external view returns (bool);
+
+    function harvest() external;
+}
+
+// Harvests many strategies in one transaction. Set it as each strategy's keeper, and
+// our keepers call it instead of sending one harvest per strategy.
+// A strategy that reverts is reported and skipped, the rest of the batch still goes through.
+// One that runs out of gas reverts the whole batch instead, so a batch sent with too little
+// gas can't quietly skip harvests, and gas estimates cover every harvest in full.
+contract BatchHarvester {
+    address public governance;
+    address public pendingGovernance;
+    mapping(address => bool) public keepers;
+
+    event Harvested(address indexed strategy, uint256 gasUsed);
+    event HarvestSkipped(address indexed strategy);
+    event HarvestFailed(address indexed strategy, bytes reason);
+    event KeeperUpdated(address indexed keeper, bool allowed);
+
+    modifier onlyGovernance() {
+        require(msg.sender == governance, "!governance");
+        _;
+    }
+
+    modifier onlyKeepers() {
+        require(keepers[msg.sender] || msg.sender == governance, "!keeper");
+        _;
+    }
+
+    constructor(address _governance) public {
+        governance = _governance;
+    }
+
+    function setKeeper(address _keeper, bool _allowed) external onlyGovernance {
+        keepers[_keeper] = _allowed;
+        emit KeeperUpdated(_keeper, _allowed);
+    }
+
+    function setPendingGovernance(address _pendingGovernance)
+        external
+        onlyGovernance
+    {
+        pendingGovernance = _pendingGovernance;
+    }
+
+    function acceptGovernance() external {
+        require(msg.sender == pendingGovernance, "!pendingGovernance");
+        governance = pendingGovernance;
+        pendingGovernance = address(0);
+    }
+
+    ///@notice Harvest every strategy whose harvestTrigger(_callCostInWei) fires. Returns how many we harvested.
+    function harvestBatch(address[] calldata _strategies, uint256 _callCostInWei)
+        external
+        onlyKeepers
+        returns (uint256 harvested)
+    {
+        for (uint256 i = 0; i < _strategies.length; i++) {
+            address strategy = _strategies[i];
+            // a trigger can have changed since our keeper checked it, so check again
+            bool due;
+            uint256 gasBefore = gasleft();
+            try IHarvestable(strategy).harvestTrigger(_callCostInWei) returns (
+                bool _due
+            ) {
+                due = _due;
+            } catch (bytes memory reason) {
+                require(gasleft() > gasBefore / 64, "out of gas");
+                emit HarvestFailed(strategy, reason);
+                continue;
+            }
+
+            if (!due) {
+                emit HarvestSkipped(strategy);
+            } else if (_harvest(strategy)) {
+                harvested++;
+            }
+        }
+    }
+
+    ///@notice Harvest every strategy, triggers or not. Returns how many we harvested.
+    function forceHarvestBatch(address[] calldata _strategies)
+        external
+        onlyKeepers
+        returns (uint256 harvested)
+    {
+        for (uint256 i = 0; i < _strategies.length; i++) {
+            if (_harvest(_strategies[i])) {
+                harvested++;
+            }
+        }
+    }
+
+    function _harvest(address _strategy) internal returns (bool) {
+        uint256 gasBefore = gasleft();
+        try IHarvestable(_strategy).harvest() {
+            emit Harvested(_strategy, gasBefore - gasleft());
+            return true;
+        } catch (bytes memory reason) {
+            // a call gets at most 63/64 of our gas, so if that's all gone it ran out rather than reverted
+            require(gasleft() > gasBefore / 64, "out of gas");
+            emit HarvestFailed(_strategy, reason);
+            return false;
+        }
+    }
+}
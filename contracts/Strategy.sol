@@ -46,6 +46,26 @@ interface ISolidlyRouter {
         bool stable,
         uint256 liquidity
     ) external view returns (uint256 amountA, uint256 amountB);
+
+    struct route {
+        address from;
+        address to;
+        bool stable;
+    }
+
+    function swapExactTokensForTokens(
+        uint256 amountIn,
+        uint256 amountOutMin,
+        route[] calldata routes,
+        address to,
+        uint256 deadline
+    ) external returns (uint256[] memory amounts);
+
+    function pairFor(
+        address tokenA,
+        address tokenB,
+        bool stable
+    ) external view returns (address pair);
 }
 
 // boo:xboo ratios, enter = "Locks Boo and mints xBoo", leave = "Unlocks the staked + gained Boo, and burns xBoo"
@@ -59,11 +79,46 @@ interface IXboo is IERC20 {
     function leave(uint256) external;
 }
 
+interface ISolidlyPair is IERC20 {
+    function token0() external view returns (address);
+
+    function token1() external view returns (address);
+
+    function stable() external view returns (bool);
+
+    function getReserves()
+        external
+        view
+        returns (
+            uint256 _reserve0,
+            uint256 _reserve1,
+            uint256 _blockTimestampLast
+        );
+
+    function observationLength() external view returns (uint256);
+
+    function quote(
+        address tokenIn,
+        uint256 amountIn,
+        uint256 granularity
+    ) external view returns (uint256 amountOut);
+
+    function getAmountOut(uint256 amountIn, address tokenIn)
+        external
+        view
+        returns (uint256);
+}
+
 interface ITradeFactory {
     function enable(address, address) external;
 }
 
 interface ILpDepositer {
+    struct Amounts {
+        uint256 solid;
+        uint256 sex;
+    }
+
     function deposit(address pool, uint256 _amount) external;
 
     function withdraw(address pool, uint256 _amount) external; // use amount = 0 for harvesting rewards
@@ -74,6 +129,11 @@ interface ILpDepositer {
         returns (uint256);
 
     function getReward(address[] memory lps) external;
+
+    function pendingRewards(address account, address[] calldata pools)
+        external
+        view
+        returns (Amounts[] memory pending);
 }
 
 contract Strategy is BaseStrategy {
@@ -86,11 +146,19 @@ contract Strategy is BaseStrategy {
     // swap stuff
     address internal constant solidlyRouter =
         0xa38cd27185a464914D3046f0AB9d43356B34829D;
+
+    // these share a single slot, harvests read most of them
+    address public tradeFactory;
     bool public tradesEnabled;
     bool public realiseLosses;
     bool public depositerAvoid;
-    address public tradeFactory =
-        address(0xD3f89C21719Ec5961a3E6B0f9bBf9F9b4180E9e9);
+    bool internal forceHarvestTriggerOnce; // only set this to true externally when we want to trigger our keepers to harvest for us
+    uint16 public lpSlippage; // 995 = 0.5% slippage allowance
+    bool public syncCompounding; // sell our sex and solid for boo inside harvest instead of through the trade factory
+    uint16 public rewardSellSlippage; // basis points under the twap we accept when selling rewards
+    uint16 public booBuffer; // basis points of our assets we keep loose to pay small withdrawals with
+
+    uint256 public minRewardToSell; // don't bother selling less sex or solid than this
 
     IERC20 internal constant boo =
         IERC20(0x841FAD6EAe12c286d1Fd18d1d525DFfA75C7EFFE);
@@ -101,36 +169,138 @@ contract Strategy is BaseStrategy {
         IERC20(0xD31Fcd1f7Ba190dBc75354046F6024A9b86014d7);
     IERC20 internal constant solid =
         IERC20(0x888EF71766ca594DED1F0FA3AE64eD2941740A20);
+    address internal constant wftm =
+        0x21be370D5312f44cB42ce377BC9b8a0cEF1A4C83;
 
-    uint256 public lpSlippage = 995; //0.5% slippage allowance
+    // solidly pairs keep an observation every 30 minutes, so we price off a 2 hour average
+    uint256 internal constant twapPoints = 4;
 
     string internal stratName; // we use this for our strategy's name on cloning
-    address public lpToken =
-        address(0x5804F6C40f44cF7593F73cf3aa16F7037213A623);
-    ILpDepositer public lpDepositer =
+    ILpDepositer public constant lpDepositer =
         ILpDepositer(0x26E1A0d851CF28E697870e1b7F053B605C8b060F);
 
-    bool internal forceHarvestTriggerOnce; // only set this to true externally when we want to trigger our keepers to harvest for us
+    // the boo/xboo solidly pairs we lp into, weights are basis points of our lp and add up to 10_000.
+    // each one fits in a single slot
+    struct Pool {
+        address lpToken;
+        bool stable;
+        uint16 weight;
+    }
+    Pool[] public pools;
+    uint256 internal constant maxPools = 8; // keeps our harvest loops bounded
+
     uint256 public minHarvestCredit; // if we hit this amount of credit, harvest the strategy
 
+    // one of our pools, read once per harvest/withdrawal
+    struct PoolSnapshot {
+        address lpToken;
+        bool stable;
+        uint256 weight; // target weight in basis points
+        uint256 stakedLp; // lp staked in the lpDepositer
+        uint256 looseLp; // lp sitting in the strategy
+        uint256 lpSupply; // total supply of the lp
+        uint256 reserveBoo; // boo reserves of the lp
+        uint256 reserveXboo; // xboo reserves of the lp
+        uint256 booInLp; // boo our lp (staked + loose) is worth
+        uint256 xbooInLp; // xboo our lp (staked + loose) is worth
+    }
+
+    // everything our position is made of, read once per harvest/withdrawal and passed around
+    struct PositionSnapshot {
+        PoolSnapshot[] pools;
+        uint256 booInLp; // boo our lp is worth, across all pools
+        uint256 xbooInLp; // xboo our lp is worth, across all pools
+        uint256 looseXboo; // xboo sitting in the strategy
+        uint256 looseBoo; // boo sitting in the strategy
+        uint256 booInXboo; // boo locked in xboo
+        uint256 xbooSupply; // total supply of xboo
+        uint256 xbooRate; // boo for 1e18 xboo
+        uint256 totalAssets; // all of the above valued in boo
+    }
+
     /* ========== CONSTRUCTOR ========== */
 
     constructor(address _vault, string memory _name)
         public
         BaseStrategy(_vault)
     {
-        _initializeStrat(_name);
+        // start out with everything in the volatile boo/xboo pair
+        _initializeStrat(
+            _name,
+            address(0x5804F6C40f44cF7593F73cf3aa16F7037213A623)
+        );
     }
 
     /* ========== CLONING ========== */
 
     event Cloned(address indexed clone);
 
+    // clones are created with no storage, so only the original has this set
+    bool public isOriginal = true;
+
+    ///@notice Deploy an EIP-1167 minimal proxy of this strategy, starting out with everything in _lpToken.
+    function cloneStrategy(
+        address _vault,
+        address _strategist,
+        address _rewards,
+        address _keeper,
+        string memory _name,
+        address _lpToken
+    ) external returns (address newStrategy) {
+        require(isOriginal, "!clone");
+        bytes20 addressBytes = bytes20(address(this));
+
+        assembly {
+            // EIP-1167 bytecode
+            let clone_code := mload(0x40)
+            mstore(
+                clone_code,
+                0x3d602d80600a3d3981f3363d3d373d3d3d363d73000000000000000000000000
+            )
+            mstore(add(clone_code, 0x14), addressBytes)
+            mstore(
+                add(clone_code, 0x28),
+                0x5af43d82803e903d91602b57fd5bf30000000000000000000000000000000000
+            )
+            newStrategy := create(0, clone_code, 0x37)
+        }
+
+        Strategy(newStrategy).initialize(
+            _vault,
+            _strategist,
+            _rewards,
+            _keeper,
+            _name,
+            _lpToken
+        );
+
+        emit Cloned(newStrategy);
+    }
+
+    // BaseStrategy's _initialize only runs once, so neither can this
+    function initialize(
+        address _vault,
+        address _strategist,
+        address _rewards,
+        address _keeper,
+        string memory _name,
+        address _lpToken
+    ) public {
+        _initialize(_vault, _strategist, _rewards, _keeper);
+        _initializeStrat(_name, _lpToken);
+    }
+
     // this is called by our original strategy, as well as any clones
-    function _initializeStrat(string memory _name) internal {
+    function _initializeStrat(string memory _name, address _lpToken)
+        internal
+    {
         // initialize variables
-        maxReportDelay = 43200; // 1/2 day in seconds, if we hit this then harvestTrigger = True
+        maxReportDelay = 259200; // 3 days in seconds, if we hit this then harvestTrigger = True whatever our profit
         healthCheck = address(0xf13Cd6887C62B5beC145e30c38c4938c5E627fe0); // Fantom common health check
+        tradeFactory = address(0xD3f89C21719Ec5961a3E6B0f9bBf9F9b4180E9e9);
+        lpSlippage = 995; //0.5% slippage allowance
+        rewardSellSlippage = 100; // 1% under the twap
+        minRewardToSell = 1e17;
 
         // set our strategy's name
         stratName = _name;
@@ -138,9 +308,10 @@ contract Strategy is BaseStrategy {
         // turn off our credit harvest trigger to start with
         minHarvestCredit = type(uint256).max;
 
+        // start out with everything in one boo/xboo pair
+        _addPool(_lpToken, 10_000);
+
         // add approvals on all tokens
-        IERC20(lpToken).approve(address(lpDepositer), type(uint256).max);
-        IERC20(lpToken).approve(address(solidlyRouter), type(uint256).max);
         xboo.approve(address(solidlyRouter), type(uint256).max);
         boo.approve(address(xboo), type(uint256).max);
         boo.approve(address(solidlyRouter), type(uint256).max);
@@ -165,39 +336,248 @@ contract Strategy is BaseStrategy {
         return xboo.xBOOForBOO(xbooAmount);
     }
 
+    // lp staked in our first pool, all we had before we ran several pools
     function balanceOfLPStaked() public view returns (uint256) {
-        return lpDepositer.userBalances(address(this), lpToken);
+        return balanceOfLPStaked(0);
+    }
+
+    // lp staked in one of our pools. lp of different pairs isn't worth the same, so we don't add them up
+    function balanceOfLPStaked(uint256 _poolIndex)
+        public
+        view
+        returns (uint256)
+    {
+        return
+            lpDepositer.userBalances(address(this), pools[_poolIndex].lpToken);
     }
 
+    // boo and xboo for this much lp of our first pool
     function balanceOfConstituents(uint256 liquidity)
         public
         view
         returns (uint256 amountBoo, uint256 amountXBoo)
+    {
+        return balanceOfConstituents(liquidity, 0);
+    }
+
+    // boo and xboo for this much lp of one of our pools
+    function balanceOfConstituents(uint256 liquidity, uint256 _poolIndex)
+        public
+        view
+        returns (uint256 amountBoo, uint256 amountXBoo)
     {
         (amountBoo, amountXBoo) = ISolidlyRouter(solidlyRouter)
             .quoteRemoveLiquidity(
                 address(boo),
                 address(xboo),
-                false,
+                pools[_poolIndex].stable,
                 liquidity
             );
     }
 
+    function poolCount() external view returns (uint256) {
+        return pools.length;
+    }
+
     function estimatedTotalAssets() public view override returns (uint256) {
-        uint256 lpTokens = balanceOfLPStaked().add(
-            IERC20(lpToken).balanceOf(address(this))
-        );
+        return _positionSnapshot().totalAssets;
+    }
 
-        (uint256 amountBoo, uint256 amountXBoo) = balanceOfConstituents(
-            lpTokens
-        );
+    ///@notice Every component of our position in one call, for keepers and dashboards.
+    function positionSnapshot()
+        external
+        view
+        returns (PositionSnapshot memory)
+    {
+        return _positionSnapshot();
+    }
 
-        uint256 balanceOfxBooinBoo = balanceOfXbooInWant(
-            amountXBoo.add(xboo.balanceOf(address(this)))
-        );
+    function _positionSnapshot()
+        internal
+        view
+        returns (PositionSnapshot memory snapshot)
+    {
+        uint256 poolsLength = pools.length;
+        snapshot.pools = new PoolSnapshot[](poolsLength);
+        for (uint256 i = 0; i < poolsLength; i++) {
+            snapshot.pools[i] = _poolSnapshot(pools[i]);
+        }
+
+        snapshot.looseXboo = xboo.balanceOf(address(this));
+        snapshot.looseBoo = balanceOfWant();
+        snapshot.booInXboo = boo.balanceOf(address(xboo));
+        snapshot.xbooSupply = xboo.totalSupply();
+        _valuePosition(snapshot);
+    }
+
+    // fill in the totals of a snapshot we've read, kept pure so our maths can be tested on any state
+    function _valuePosition(PositionSnapshot memory _snapshot) internal pure {
+        for (uint256 i = 0; i < _snapshot.pools.length; i++) {
+            PoolSnapshot memory pool = _snapshot.pools[i];
+            _valuePool(pool);
+            _snapshot.booInLp = _snapshot.booInLp.add(pool.booInLp);
+            _snapshot.xbooInLp = _snapshot.xbooInLp.add(pool.xbooInLp);
+        }
+        _snapshot.xbooRate = _xbooToBoo(_snapshot, 1e18);
 
         // look at our staked tokens and any free tokens sitting in the strategy
-        return balanceOfxBooinBoo.add(balanceOfWant()).add(amountBoo);
+        _snapshot.totalAssets = _xbooToBoo(
+            _snapshot,
+            _snapshot.xbooInLp.add(_snapshot.looseXboo)
+        ).add(_snapshot.looseBoo).add(_snapshot.booInLp);
+    }
+
+    function _poolSnapshot(Pool memory _pool)
+        internal
+        view
+        returns (PoolSnapshot memory pool)
+    {
+        pool.lpToken = _pool.lpToken;
+        pool.stable = _pool.stable;
+        pool.weight = _pool.weight;
+        pool.stakedLp = lpDepositer.userBalances(address(this), _pool.lpToken);
+        pool.looseLp = IERC20(_pool.lpToken).balanceOf(address(this));
+        pool.lpSupply = IERC20(_pool.lpToken).totalSupply();
+        (pool.reserveBoo, pool.reserveXboo) = _lpReserves(_pool.lpToken);
+    }
+
+    // boo and xboo our lp (staked + loose) is worth, same maths as the router's quoteRemoveLiquidity
+    function _valuePool(PoolSnapshot memory _pool) internal pure {
+        if (_pool.lpSupply > 0) {
+            uint256 lpTokens = _pool.stakedLp.add(_pool.looseLp);
+            _pool.booInLp = lpTokens.mul(_pool.reserveBoo).div(_pool.lpSupply);
+            _pool.xbooInLp = lpTokens.mul(_pool.reserveXboo).div(
+                _pool.lpSupply
+            );
+        }
+    }
+
+    // an lp's reserves in a single call
+    function _lpReserves(address _lpToken)
+        internal
+        view
+        returns (uint256 reserveBoo, uint256 reserveXboo)
+    {
+        (uint256 reserve0, uint256 reserve1, ) = ISolidlyPair(_lpToken)
+            .getReserves();
+        if (address(boo) < address(xboo)) {
+            (reserveBoo, reserveXboo) = (reserve0, reserve1);
+        } else {
+            (reserveBoo, reserveXboo) = (reserve1, reserve0);
+        }
+    }
+
+    // same maths as xboo's xBOOForBOO, without the external call
+    function _xbooToBoo(PositionSnapshot memory _snapshot, uint256 _xbooAmount)
+        internal
+        pure
+        returns (uint256)
+    {
+        if (_snapshot.xbooSupply == 0) {
+            return 0;
+        }
+        return _xbooAmount.mul(_snapshot.booInXboo).div(_snapshot.xbooSupply);
+    }
+
+    // what our lp in a pool is worth in boo
+    function _poolValue(
+        PositionSnapshot memory _snapshot,
+        PoolSnapshot memory _pool
+    ) internal pure returns (uint256) {
+        return _pool.booInLp.add(_xbooToBoo(_snapshot, _pool.xbooInLp));
+    }
+
+    // the lp tokens of all of our pools, for the lpDepositer's batch calls
+    function _lpTokens() internal view returns (address[] memory lpTokens) {
+        uint256 poolsLength = pools.length;
+        lpTokens = new address[](poolsLength);
+        for (uint256 i = 0; i < poolsLength; i++) {
+            lpTokens[i] = pools[i].lpToken;
+        }
+    }
+
+    ///@notice SEX and SOLID our pools have earned in the lpDepositer that we haven't claimed yet.
+    function pendingRewards()
+        external
+        view
+        returns (uint256 pendingSex, uint256 pendingSolid)
+    {
+        return _pendingRewards(_lpTokens());
+    }
+
+    ///@notice What our position is worth over our debt to the vault, in boo. Mostly xboo growth since our last report.
+    function unrealizedProfit() external view returns (uint256) {
+        return _unrealizedProfit(vault.strategies(address(this)).totalDebt);
+    }
+
+    ///@notice What our next harvest should bring in, in boo: unrealizedProfit plus our pending SEX and SOLID at twap prices.
+    function expectedHarvestProfit() external view returns (uint256) {
+        return
+            _expectedHarvestProfit(vault.strategies(address(this)).totalDebt);
+    }
+
+    // sex and solid our pools have earned that we haven't claimed yet
+    function _pendingRewards(address[] memory _pairs)
+        internal
+        view
+        returns (uint256 pendingSex, uint256 pendingSolid)
+    {
+        ILpDepositer.Amounts[] memory pending =
+            lpDepositer.pendingRewards(address(this), _pairs);
+        for (uint256 i = 0; i < pending.length; i++) {
+            pendingSex = pendingSex.add(pending[i].sex);
+            pendingSolid = pendingSolid.add(pending[i].solid);
+        }
+    }
+
+    function _unrealizedProfit(uint256 _totalDebt)
+        internal
+        view
+        returns (uint256)
+    {
+        uint256 assets = estimatedTotalAssets();
+        return assets > _totalDebt ? assets - _totalDebt : 0;
+    }
+
+    // what our next harvest should report: xboo growth and anything else over our debt, plus our pending sex and solid in boo
+    function _expectedHarvestProfit(uint256 _totalDebt)
+        internal
+        view
+        returns (uint256)
+    {
+        return _unrealizedProfit(_totalDebt).add(_pendingRewardsInBoo());
+    }
+
+    // our pending sex and solid, through wftm into boo at the twap
+    function _pendingRewardsInBoo() internal view returns (uint256) {
+        (uint256 pendingSex, uint256 pendingSolid) =
+            _pendingRewards(_lpTokens());
+        uint256 rewardsInWftm =
+            _twapQuote(address(sex), wftm, pendingSex).add(
+                _twapQuote(address(solid), wftm, pendingSolid)
+            );
+        return _twapQuote(wftm, address(boo), rewardsInWftm);
+    }
+
+    // a price that can't be moved within a block, off the volatile solidly pair's observations
+    // returns 0 if there's no pair or it doesn't have enough history yet
+    function _twapQuote(
+        address _tokenIn,
+        address _tokenOut,
+        uint256 _amountIn
+    ) internal view returns (uint256) {
+        if (_amountIn == 0) {
+            return 0;
+        }
+        address pair =
+            ISolidlyRouter(solidlyRouter).pairFor(_tokenIn, _tokenOut, false);
+        if (
+            !pair.isContract() ||
+            ISolidlyPair(pair).observationLength() <= twapPoints
+        ) {
+            return 0;
+        }
+        return ISolidlyPair(pair).quote(_tokenIn, _amountIn, twapPoints);
     }
 
     function _setUpTradeFactory() internal {
@@ -227,13 +607,15 @@ contract Strategy is BaseStrategy {
         if (tradesEnabled == false && tradeFactory != address(0)) {
             _setUpTradeFactory();
         }
-        // claim our rewards
-        address[] memory pairs = new address[](1);
-        pairs[0] = address(lpToken);
-        lpDepositer.getReward(pairs);
+        _claimRewards(_lpTokens());
+        if (syncCompounding) {
+            _sellRewards();
+        }
 
-        uint256 assets = estimatedTotalAssets();
-        uint256 wantBal = balanceOfWant();
+        // read our position once and use it for profit and liquidation
+        PositionSnapshot memory snapshot = _positionSnapshot();
+        uint256 assets = snapshot.totalAssets;
+        uint256 wantBal = snapshot.looseBoo;
 
         uint256 debt = vault.strategies(address(this)).totalDebt;
         uint256 amountToFree;
@@ -255,9 +637,21 @@ contract Strategy is BaseStrategy {
             }
         }
 
+        // on top of what goes to the vault, keep our buffer of loose boo for withdrawals out of what's
+        // left, topping it up from our lp if withdrawals have drained it. only harvests do this, not tends
+        uint256 toHold =
+            amountToFree.add(
+                _booBufferTarget(
+                    assets > amountToFree ? assets - amountToFree : 0
+                )
+            );
+
         //amountToFree > 0 checking (included in the if statement)
-        if (wantBal < amountToFree) {
-            liquidatePosition(amountToFree);
+        if (
+            wantBal < amountToFree ||
+            (wantBal < toHold && toHold - wantBal > 1e17)
+        ) {
+            _liquidatePosition(toHold, snapshot);
 
             uint256 newLoose = want.balanceOf(address(this));
 
@@ -276,132 +670,432 @@ contract Strategy is BaseStrategy {
         forceHarvestTriggerOnce = false;
     }
 
+    // claim our rewards from these pools at once, skipping the call when there's nothing to claim
+    function _claimRewards(address[] memory _pairs) internal {
+        (uint256 pendingSex, uint256 pendingSolid) = _pendingRewards(_pairs);
+        if (pendingSex > 0 || pendingSolid > 0) {
+            lpDepositer.getReward(_pairs);
+        }
+    }
+
+    // sell our sex and solid for boo through wftm on solidly, with min outs off the pairs' twaps
+    function _sellRewards() internal {
+        _sellReward(address(sex));
+        _sellReward(address(solid));
+    }
+
+    function _sellReward(address _token) internal {
+        uint256 amount = IERC20(_token).balanceOf(address(this));
+        if (amount <= minRewardToSell) {
+            return;
+        }
+        uint256 expected =
+            _twapQuote(wftm, address(boo), _twapQuote(_token, wftm, amount));
+        // no twap yet, so these wait for the trade factory or our next harvest
+        if (expected == 0) {
+            return;
+        }
+
+        ISolidlyRouter.route[] memory routes = new ISolidlyRouter.route[](2);
+        routes[0] = ISolidlyRouter.route(_token, wftm, false);
+        routes[1] = ISolidlyRouter.route(wftm, address(boo), false);
+        ISolidlyRouter(solidlyRouter).swapExactTokensForTokens(
+            amount,
+            expected.mul(uint256(10_000).sub(rewardSellSlippage)).div(10_000),
+            routes,
+            address(this),
+            block.timestamp
+        );
+    }
+
     function adjustPosition(uint256 _debtOutstanding) internal override {
         if (emergencyExit) {
             return;
         }
         // send all of our want tokens to be deposited
         uint256 toInvest = balanceOfWant();
+        if (toInvest <= 1e17) {
+            return;
+        }
+
+        // read our pools and xboo's rate once, with any loose xboo we hold
+        PositionSnapshot memory snapshot = _positionSnapshot();
+
+        // keep our buffer of loose boo back, prepareReturn tops it up when we harvest
+        uint256 buffer = _booBufferTarget(snapshot.totalAssets);
+        if (toInvest < buffer) {
+            return;
+        }
+        toInvest = toInvest.sub(buffer);
+
         // stake only if we have something to stake
         // dont bother for less than 0.1 boo
         if (toInvest > 1e17) {
-            uint256 booB = boo.balanceOf(lpToken);
-            uint256 xbooB = xboo.balanceOf(lpToken);
+            // only what's over our buffer gets split between our pools
+            snapshot.looseBoo = toInvest;
+            uint256[] memory allocations = _depositAllocations(snapshot);
 
-            //ratio we need of boo to xboo to lp
-            uint256 ratio_lp = booB.mul(1e18).div(xbooB);
+            for (uint256 i = 0; i < allocations.length; i++) {
+                if (allocations[i] > 0) {
+                    _depositToPool(snapshot, snapshot.pools[i], allocations[i]);
+                }
+            }
+        }
+    }
 
-            //ratio boo to xboo in xBoo
-            uint256 ratio_xboo = xboo.xBOOForBOO(1e18);
+    function _booBufferTarget(uint256 _totalAssets)
+        internal
+        view
+        returns (uint256)
+    {
+        return _totalAssets.mul(booBuffer).div(10_000);
+    }
 
-            //allow 0.5% slippage by default
-            if (ratio_lp < ratio_xboo.mul(lpSlippage).div(1000)) {
-                //dont do anything because we would be lping into the lp at a bad price
-                return;
-            }
+    // split our loose boo so each pool moves toward its target weight
+    function _depositAllocations(PositionSnapshot memory _snapshot)
+        internal
+        pure
+        returns (uint256[] memory allocations)
+    {
+        uint256 poolsLength = _snapshot.pools.length;
+        allocations = new uint256[](poolsLength);
 
-            if (ratio_xboo < ratio_lp.mul(lpSlippage).div(1000)) {
-                //dont do anything because we would be lping into the lp at a bad price
-                return;
+        uint256 totalValue = _snapshot.looseBoo;
+        for (uint256 i = 0; i < poolsLength; i++) {
+            allocations[i] = _poolValue(_snapshot, _snapshot.pools[i]);
+            totalValue = totalValue.add(allocations[i]);
+        }
+
+        // how far under its target each pool is, these always add up to at least our loose boo
+        uint256 totalShortfall;
+        for (uint256 i = 0; i < poolsLength; i++) {
+            uint256 target =
+                totalValue.mul(_snapshot.pools[i].weight).div(10_000);
+            allocations[i] = target > allocations[i]
+                ? target.sub(allocations[i])
+                : 0;
+            totalShortfall = totalShortfall.add(allocations[i]);
+        }
+
+        if (totalShortfall == 0) {
+            return allocations;
+        }
+        for (uint256 i = 0; i < poolsLength; i++) {
+            allocations[i] = allocations[i].mul(_snapshot.looseBoo).div(
+                totalShortfall
+            );
+        }
+    }
+
+    function _depositToPool(
+        PositionSnapshot memory _snapshot,
+        PoolSnapshot memory _pool,
+        uint256 _booAmount
+    ) internal {
+        // nothing to price our deposit against in an empty pool
+        if (_pool.reserveBoo == 0 || _pool.reserveXboo == 0) {
+            return;
+        }
+
+        //dont do anything because we would be lping into the lp at a bad price
+        if (!_lpPriceInRange(_snapshot, _pool)) {
+            return;
+        }
+
+        uint256 booToLp = _booAmount;
+        uint256 xbooToLp = _snapshot.looseXboo;
+        (uint256 booToEnter, uint256 xbooToLeave) =
+            _depositSplit(_snapshot, _pool, _booAmount);
+
+        // same maths as xboo's enter and leave, so we know exactly what we'll get
+        if (booToEnter > 0) {
+            xboo.enter(booToEnter);
+            uint256 xbooMinted =
+                booToEnter.mul(_snapshot.xbooSupply).div(_snapshot.booInXboo);
+            _snapshot.booInXboo = _snapshot.booInXboo.add(booToEnter);
+            _snapshot.xbooSupply = _snapshot.xbooSupply.add(xbooMinted);
+            booToLp = booToLp.sub(booToEnter);
+            xbooToLp = xbooToLp.add(xbooMinted);
+        } else if (xbooToLeave > 0) {
+            xboo.leave(xbooToLeave);
+            uint256 booFromXboo = _xbooToBoo(_snapshot, xbooToLeave);
+            _snapshot.booInXboo = _snapshot.booInXboo.sub(booFromXboo);
+            _snapshot.xbooSupply = _snapshot.xbooSupply.sub(xbooToLeave);
+            booToLp = booToLp.add(booFromXboo);
+            xbooToLp = xbooToLp.sub(xbooToLeave);
+        }
+
+        // any xboo the lp didn't take carries over to our next pool
+        _snapshot.looseXboo = xbooToLp.sub(
+            _addLiquidityAndStake(_pool, booToLp, xbooToLp)
+        );
+    }
+
+    // whether the lp's price of xboo in boo is within lpSlippage of xboo's own rate
+    function _lpPriceInRange(
+        PositionSnapshot memory _snapshot,
+        PoolSnapshot memory _pool
+    ) internal view returns (bool) {
+        //price of xboo in the lp. that's the reserve ratio on a volatile pair, a stable pair's curve sits flat
+        //around 1:1 so we quote a swap too small to move it (the 0.01% fee is well inside our slippage)
+        uint256 ratio_lp;
+        if (_pool.stable) {
+            uint256 xbooIn = _pool.reserveXboo.div(1e6);
+            if (xbooIn == 0) {
+                return false;
             }
-            //amount to swap is:
-            // B0 * Rxboo / (Rlp + Rxboo)
-            uint256 numerator = toInvest.mul(ratio_xboo);
-            uint256 denom = ratio_xboo.add(ratio_lp);
+            ratio_lp = ISolidlyPair(_pool.lpToken)
+                .getAmountOut(xbooIn, address(xboo))
+                .mul(1e18)
+                .div(xbooIn);
+        } else {
+            ratio_lp = _pool.reserveBoo.mul(1e18).div(_pool.reserveXboo);
+        }
 
-            uint256 newInvest = (numerator.div(denom)).sub(1e6); // remove a bit incase of rounding error
+        //ratio boo to xboo in xBoo
+        uint256 ratio_xboo = _xbooToBoo(_snapshot, 1e18);
 
-            // deposit our boo into xboo
-            xboo.enter(newInvest);
+        //allow 0.5% slippage by default
+        uint256 slippage = lpSlippage;
+        return
+            ratio_lp >= ratio_xboo.mul(slippage).div(1000) &&
+            ratio_xboo >= ratio_lp.mul(slippage).div(1000);
+    }
 
-            // deposit into lp
-            ISolidlyRouter(solidlyRouter).addLiquidity(
-                address(boo),
-                address(xboo),
-                false,
-                boo.balanceOf(address(this)),
-                xboo.balanceOf(address(this)),
-                0,
-                0,
-                address(this),
-                2**256 - 1
+    // boo to turn into xboo (or xboo back into boo) so what we deposit matches the lp's reserves
+    function _depositSplit(
+        PositionSnapshot memory _snapshot,
+        PoolSnapshot memory _pool,
+        uint256 _booAmount
+    ) internal pure returns (uint256 booToEnter, uint256 xbooToLeave) {
+        uint256 booSide = _booAmount.mul(_pool.reserveXboo);
+        uint256 xbooSide = _snapshot.looseXboo.mul(_pool.reserveBoo);
+
+        if (booSide > xbooSide) {
+            // (boo - s) / (xboo + s * xbooSupply / booInXboo) = reserveBoo / reserveXboo
+            booToEnter = booSide.sub(xbooSide).mul(_snapshot.booInXboo).div(
+                _pool.reserveXboo.mul(_snapshot.booInXboo).add(
+                    _pool.reserveBoo.mul(_snapshot.xbooSupply)
+                )
             );
-
-            //deposit to lp depositer
-            lpDepositer.deposit(
-                lpToken,
-                IERC20(lpToken).balanceOf(address(this))
+        } else {
+            // (boo + x * booInXboo / xbooSupply) / (xboo - x) = reserveBoo / reserveXboo
+            xbooToLeave = xbooSide.sub(booSide).mul(_snapshot.xbooSupply).div(
+                _pool.reserveBoo.mul(_snapshot.xbooSupply).add(
+                    _pool.reserveXboo.mul(_snapshot.booInXboo)
+                )
             );
         }
     }
 
-    //returns lp tokens needed to get that amount of boo
-    function booToLpTokens(uint256 amountOfBooWeWant) public returns (uint256) {
-        //amount of boo and xboo for 1 lp token
-        (uint256 amountBooPerLp, uint256 amountXBoo) = balanceOfConstituents(
-            1e18
+    function _addLiquidityAndStake(
+        PoolSnapshot memory _pool,
+        uint256 _booAmount,
+        uint256 _xbooAmount
+    ) internal returns (uint256 xbooUsed) {
+        // deposit into lp
+        (, xbooUsed, ) = ISolidlyRouter(solidlyRouter).addLiquidity(
+            address(boo),
+            address(xboo),
+            _pool.stable,
+            _booAmount,
+            _xbooAmount,
+            0,
+            0,
+            address(this),
+            2**256 - 1
         );
 
-        //1 lp token is this amoubt of boo
-        amountBooPerLp = amountBooPerLp.add(xboo.xBOOForBOO(amountXBoo));
-
-        uint256 lpTokensWeNeed = amountOfBooWeWant.mul(1e18).div(
-            amountBooPerLp
+        //deposit to lp depositer, along with any loose lp we already had
+        lpDepositer.deposit(
+            _pool.lpToken,
+            IERC20(_pool.lpToken).balanceOf(address(this))
         );
+    }
 
-        return lpTokensWeNeed;
+    //returns lp tokens of our first pool needed to get that amount of boo
+    function booToLpTokens(uint256 amountOfBooWeWant)
+        external
+        view
+        returns (uint256)
+    {
+        return booToLpTokens(amountOfBooWeWant, 0);
     }
 
-    function liquidatePosition(uint256 _amountNeeded)
-        internal
-        override
-        returns (uint256 _liquidatedAmount, uint256 _loss)
+    //returns lp tokens of a pool needed to get that amount of boo
+    function booToLpTokens(uint256 amountOfBooWeWant, uint256 poolIndex)
+        public
+        view
+        returns (uint256)
     {
-        //if we have loose xboo. liquidated it
-        xboo.leave(xboo.balanceOf(address(this)));
+        PositionSnapshot memory snapshot = _positionSnapshot();
+        return
+            _booToLpTokens(
+                amountOfBooWeWant,
+                snapshot,
+                snapshot.pools[poolIndex]
+            );
+    }
 
-        uint256 balanceOfBoo = want.balanceOf(address(this));
+    ///@notice Preflight for a withdrawal: lp we'd break and unstake in each pool, and the loose boo we'd end up with.
+    function withdrawalPlan(uint256 _amountNeeded)
+        external
+        view
+        returns (
+            uint256[] memory lpToRemove,
+            uint256[] memory lpToUnstake,
+            uint256 booAfter
+        )
+    {
+        PositionSnapshot memory snapshot = _positionSnapshot();
+        _simulateLeave(snapshot);
+        (lpToRemove, lpToUnstake) = _planWithdrawal(_amountNeeded, snapshot);
+
+        booAfter = snapshot.looseBoo;
+        for (uint256 i = 0; i < lpToRemove.length; i++) {
+            booAfter = booAfter.add(
+                _lpToBoo(lpToRemove[i], snapshot, snapshot.pools[i])
+            );
+        }
+    }
 
-        // if we need more boo than is already loose in the contract
-        if (balanceOfBoo < _amountNeeded) {
-            // boo needed beyond any boo that is already loose in the contract
-            uint256 amountToFree = _amountNeeded.sub(balanceOfBoo);
+    // breaking L lp gives L * reserve / supply of each token, and xboo leaves at booInXboo / xbooSupply.
+    // invert that and round up, padding for the three roundings down on the way out
+    function _booToLpTokens(
+        uint256 amountOfBooWeWant,
+        PositionSnapshot memory _snapshot,
+        PoolSnapshot memory _pool
+    ) internal pure returns (uint256) {
+        uint256 denominator = _pool.reserveBoo.mul(_snapshot.xbooSupply).add(
+            _pool.reserveXboo.mul(_snapshot.booInXboo)
+        );
+        if (amountOfBooWeWant == 0 || denominator == 0) {
+            return 0;
+        }
 
-            // converts this amount into lpTokens
-            uint256 lpTokensNeeded = booToLpTokens(amountToFree);
+        uint256 numerator = amountOfBooWeWant
+            .add(_xbooToBoo(_snapshot, 1))
+            .add(3)
+            .mul(_pool.lpSupply)
+            .mul(_snapshot.xbooSupply);
 
-            uint256 balanceOfLpTokens = IERC20(lpToken).balanceOf(
-                address(this)
+        return numerator.add(denominator).sub(1).div(denominator);
+    }
+
+    // boo we get for breaking this much lp and leaving the xboo, same maths as removeLiquidity and leave
+    function _lpToBoo(
+        uint256 _lpAmount,
+        PositionSnapshot memory _snapshot,
+        PoolSnapshot memory _pool
+    ) internal pure returns (uint256) {
+        if (_lpAmount == 0) {
+            return 0;
+        }
+        uint256 amountBoo = _lpAmount.mul(_pool.reserveBoo).div(_pool.lpSupply);
+        uint256 amountXBoo =
+            _lpAmount.mul(_pool.reserveXboo).div(_pool.lpSupply);
+        return amountBoo.add(_xbooToBoo(_snapshot, amountXBoo));
+    }
+
+    // lp to break (and unstake) in each pool so we hold at least _amountNeeded boo, assumes loose xboo is already out.
+    // we spread what we need across our pools by how much of our lp each one holds
+    function _planWithdrawal(
+        uint256 _amountNeeded,
+        PositionSnapshot memory _snapshot
+    )
+        internal
+        pure
+        returns (uint256[] memory lpToRemove, uint256[] memory lpToUnstake)
+    {
+        uint256 poolsLength = _snapshot.pools.length;
+        lpToRemove = new uint256[](poolsLength);
+        lpToUnstake = new uint256[](poolsLength);
+
+        if (_snapshot.looseBoo >= _amountNeeded) {
+            return (lpToRemove, lpToUnstake);
+        }
+        uint256 amountToFree = _amountNeeded.sub(_snapshot.looseBoo);
+
+        uint256 totalValue;
+        for (uint256 i = 0; i < poolsLength; i++) {
+            totalValue = totalValue.add(
+                _poolValue(_snapshot, _snapshot.pools[i])
             );
+        }
+        if (totalValue == 0) {
+            return (lpToRemove, lpToUnstake);
+        }
 
-            if (balanceOfLpTokens < lpTokensNeeded) {
-                uint256 toWithdrawfromSolidex = lpTokensNeeded.sub(
-                    balanceOfLpTokens
+        for (uint256 i = 0; i < poolsLength; i++) {
+            PoolSnapshot memory pool = _snapshot.pools[i];
+            // add a wei so our shares don't round down below what we need
+            uint256 booFromPool =
+                amountToFree.mul(_poolValue(_snapshot, pool)).div(totalValue).add(
+                    1
                 );
 
-                uint256 staked = balanceOfLPStaked();
-                lpDepositer.withdraw(
-                    lpToken,
-                    Math.min(toWithdrawfromSolidex, staked)
-                );
+            lpToRemove[i] = Math.min(
+                _booToLpTokens(booFromPool, _snapshot, pool),
+                pool.looseLp.add(pool.stakedLp)
+            );
 
-                balanceOfLpTokens = IERC20(lpToken).balanceOf(address(this));
+            if (lpToRemove[i] > pool.looseLp) {
+                lpToUnstake[i] = lpToRemove[i].sub(pool.looseLp);
             }
+        }
+    }
 
-            (uint256 amountBoo, uint256 amountxBoo) = ISolidlyRouter(
-                solidlyRouter
-            ).removeLiquidity(
-                    address(boo),
-                    address(xboo),
-                    false,
-                    Math.min(lpTokensNeeded, balanceOfLpTokens),
-                    0,
-                    0,
-                    address(this),
-                    type(uint256).max
+    // keep our snapshot in line with leaving all of our loose xboo
+    function _simulateLeave(PositionSnapshot memory _snapshot) internal pure {
+        uint256 booFromXboo = _xbooToBoo(_snapshot, _snapshot.looseXboo);
+        _snapshot.booInXboo = _snapshot.booInXboo.sub(booFromXboo);
+        _snapshot.xbooSupply = _snapshot.xbooSupply.sub(_snapshot.looseXboo);
+        _snapshot.looseXboo = 0;
+        _snapshot.looseBoo = _snapshot.looseBoo.add(booFromXboo);
+    }
+
+    function liquidatePosition(uint256 _amountNeeded)
+        internal
+        override
+        returns (uint256 _liquidatedAmount, uint256 _loss)
+    {
+        // withdrawals our loose boo covers are a single transfer, no need to read our position
+        if (balanceOfWant() >= _amountNeeded) {
+            return (_amountNeeded, 0);
+        }
+        return _liquidatePosition(_amountNeeded, _positionSnapshot());
+    }
+
+    function _liquidatePosition(
+        uint256 _amountNeeded,
+        PositionSnapshot memory _snapshot
+    ) internal returns (uint256 _liquidatedAmount, uint256 _loss) {
+        //if we have loose xboo. liquidated it
+        if (_snapshot.looseXboo > 0) {
+            xboo.leave(_snapshot.looseXboo);
+            _simulateLeave(_snapshot);
+        }
+
+        // if we need more boo than is already loose in the contract
+        if (_snapshot.looseBoo < _amountNeeded) {
+            (uint256[] memory lpToRemove, uint256[] memory lpToUnstake) =
+                _planWithdrawal(_amountNeeded, _snapshot);
+
+            // break lp in every pool we need to, then leave all of the xboo we got at once
+            uint256 xbooFreed;
+            for (uint256 i = 0; i < lpToRemove.length; i++) {
+                xbooFreed = xbooFreed.add(
+                    _removeFromPool(
+                        _snapshot.pools[i],
+                        lpToRemove[i],
+                        lpToUnstake[i]
+                    )
                 );
+            }
 
-            xboo.leave(xboo.balanceOf(address(this)));
+            if (xbooFreed > 0) {
+                xboo.leave(xbooFreed);
+            }
 
             _liquidatedAmount = Math.min(
                 want.balanceOf(address(this)),
@@ -416,32 +1110,101 @@ contract Strategy is BaseStrategy {
         }
     }
 
-    function liquidateAllPositions() internal override returns (uint256) {
-        lpDepositer.withdraw(lpToken, balanceOfLPStaked());
-        ISolidlyRouter(solidlyRouter).removeLiquidity(
+    function _removeFromPool(
+        PoolSnapshot memory _pool,
+        uint256 _lpToRemove,
+        uint256 _lpToUnstake
+    ) internal returns (uint256 xbooFreed) {
+        if (_lpToUnstake > 0) {
+            lpDepositer.withdraw(_pool.lpToken, _lpToUnstake);
+        }
+
+        if (_lpToRemove > 0) {
+            // our snapshot's reserves give the router's quote without asking it
+            (, xbooFreed) = _removeLiquidity(
+                _pool.stable,
+                _lpToRemove,
+                _lpToRemove.mul(_pool.reserveBoo).div(_pool.lpSupply),
+                _lpToRemove.mul(_pool.reserveXboo).div(_pool.lpSupply)
+            );
+        }
+    }
+
+    // pull everything out of a pool, leaving boo and xboo loose in the strategy
+    function _exitPool(Pool memory _pool) internal {
+        uint256 staked =
+            lpDepositer.userBalances(address(this), _pool.lpToken);
+        if (staked > 0) {
+            lpDepositer.withdraw(_pool.lpToken, staked);
+        }
+
+        uint256 lpBalance = IERC20(_pool.lpToken).balanceOf(address(this));
+        if (lpBalance > 0) {
+            (uint256 booQuote, uint256 xbooQuote) =
+                ISolidlyRouter(solidlyRouter).quoteRemoveLiquidity(
+                    address(boo),
+                    address(xboo),
+                    _pool.stable,
+                    lpBalance
+                );
+            _removeLiquidity(_pool.stable, lpBalance, booQuote, xbooQuote);
+        }
+    }
+
+    // break this much lp, taking no less than lpSlippage under the router's quote for it
+    function _removeLiquidity(
+        bool _stable,
+        uint256 _liquidity,
+        uint256 _booQuote,
+        uint256 _xbooQuote
+    ) internal returns (uint256 booOut, uint256 xbooOut) {
+        uint256 slippage = lpSlippage;
+        (booOut, xbooOut) = ISolidlyRouter(solidlyRouter).removeLiquidity(
             address(boo),
             address(xboo),
-            false,
-            IERC20(lpToken).balanceOf(address(this)),
-            0,
-            0,
+            _stable,
+            _liquidity,
+            _booQuote.mul(slippage).div(1000),
+            _xbooQuote.mul(slippage).div(1000),
             address(this),
             type(uint256).max
         );
-        xboo.leave(xboo.balanceOf(address(this)));
+    }
+
+    function liquidateAllPositions() internal override returns (uint256) {
+        uint256 poolsLength = pools.length;
+        for (uint256 i = 0; i < poolsLength; i++) {
+            _exitPool(pools[i]);
+        }
+
+        uint256 xbooBalance = xboo.balanceOf(address(this));
+        if (xbooBalance > 0) {
+            xboo.leave(xbooBalance);
+        }
 
         return balanceOfWant();
     }
 
+    // the new strategy needs the same pools added to pick up our lp
     function prepareMigration(address _newStrategy) internal override {
-        if (!depositerAvoid) {
-            lpDepositer.withdraw(lpToken, balanceOfLPStaked());
-        }
+        bool avoidDepositer = depositerAvoid;
+        uint256 poolsLength = pools.length;
+        for (uint256 i = 0; i < poolsLength; i++) {
+            address lpToken = pools[i].lpToken;
+
+            if (!avoidDepositer) {
+                uint256 staked =
+                    lpDepositer.userBalances(address(this), lpToken);
+                if (staked > 0) {
+                    lpDepositer.withdraw(lpToken, staked);
+                }
+            }
 
-        uint256 lpBalance = IERC20(lpToken).balanceOf(address(this));
+            uint256 lpBalance = IERC20(lpToken).balanceOf(address(this));
 
-        if (lpBalance > 0) {
-            IERC20(lpToken).safeTransfer(_newStrategy, lpBalance);
+            if (lpBalance > 0) {
+                IERC20(lpToken).safeTransfer(_newStrategy, lpBalance);
+            }
         }
 
         uint256 xbooBalance = xboo.balanceOf(address(this));
@@ -466,7 +1229,7 @@ contract Strategy is BaseStrategy {
         returns (address[] memory)
     {}
 
-    // our main trigger is regarding our DCA since there is low liquidity for our emissionToken
+    // harvest once what we'd report pays for the call, with maxReportDelay as our backstop for a stale report
     function harvestTrigger(uint256 callCostinEth)
         public
         view
@@ -474,11 +1237,7 @@ contract Strategy is BaseStrategy {
         returns (bool)
     {
         StrategyParams memory params = vault.strategies(address(this));
-
-        // harvest no matter what once we reach our maxDelay
-        if (block.timestamp.sub(params.lastReport) > maxReportDelay) {
-            return true;
-        }
+        uint256 sinceReport = block.timestamp.sub(params.lastReport);
 
         // trigger if we want to manually harvest
         if (forceHarvestTriggerOnce) {
@@ -490,16 +1249,118 @@ contract Strategy is BaseStrategy {
             return true;
         }
 
-        // otherwise, we don't harvest
+        // don't harvest more often than minReportDelay on profit alone
+        if (sinceReport < minReportDelay) {
+            return false;
+        }
+
+        // trigger once our profit covers the call profitFactor times over. without a price for our gas we
+        // wait for maxReportDelay
+        uint256 callCost = ethToWant(callCostinEth);
+        if (
+            callCost > 0 &&
+            _expectedHarvestProfit(params.totalDebt) >
+            profitFactor.mul(callCost)
+        ) {
+            return true;
+        }
+
+        // harvest no matter what once our report is this stale
+        return sinceReport > maxReportDelay;
+    }
+
+    // tend deposits our idle boo without a report, once what it would earn until our next harvest pays for the call
+    function tendTrigger(uint256 callCostInWei)
+        public
+        view
+        override
+        returns (bool)
+    {
+        StrategyParams memory params = vault.strategies(address(this));
+        if (params.activation == 0 || emergencyExit) {
+            return false;
+        }
+
+        // our next harvest deposits it anyway, and from the first second after one we have no yield to go on
+        uint256 sinceReport = block.timestamp.sub(params.lastReport);
+        if (sinceReport == 0 || sinceReport >= maxReportDelay) {
+            return false;
+        }
+
+        // what adjustPosition would deposit, with our buffer kept back
+        PositionSnapshot memory snapshot = _positionSnapshot();
+        uint256 buffer = _booBufferTarget(snapshot.totalAssets);
+        if (snapshot.looseBoo <= buffer.add(1e17)) {
+            return false;
+        }
+        uint256 idle = snapshot.looseBoo.sub(buffer);
+        uint256 invested = snapshot.totalAssets.sub(snapshot.looseBoo);
+        if (invested == 0 || !_canDeposit(snapshot, idle)) {
+            return false;
+        }
+
+        // without a price for our gas we wait for our harvest
+        uint256 callCost = ethToWant(callCostInWei);
+        if (callCost == 0) {
+            return false;
+        }
+
+        // our idle boo earns what our lp has per boo since our last harvest, until we harvest anyway
+        uint256 earned =
+            _pendingRewardsInBoo().mul(idle).div(invested).add(
+                _growthSinceReportOn(snapshot, params.totalDebt, idle)
+            );
+        uint256 expectedYield =
+            earned.mul(maxReportDelay.sub(sinceReport)).div(sinceReport);
+        return expectedYield > callCost;
+    }
+
+    // what our invested position has gained over our debt since our last harvest (xboo growth, mostly), on this
+    // much of our idle boo. the idle boo itself isn't growth, so we leave it out
+    function _growthSinceReportOn(
+        PositionSnapshot memory _snapshot,
+        uint256 _totalDebt,
+        uint256 _idle
+    ) internal pure returns (uint256) {
+        uint256 invested = _snapshot.totalAssets.sub(_snapshot.looseBoo);
+        uint256 counted = _totalDebt.add(_idle);
+        if (invested == 0 || _snapshot.totalAssets <= counted) {
+            return 0;
+        }
+        return _snapshot.totalAssets.sub(counted).mul(_idle).div(invested);
+    }
+
+    // whether depositing this much boo would put any of it in a pool, rather than trip every pool's lpSlippage gate
+    function _canDeposit(PositionSnapshot memory _snapshot, uint256 _booAmount)
+        internal
+        view
+        returns (bool)
+    {
+        _snapshot.looseBoo = _booAmount;
+        uint256[] memory allocations = _depositAllocations(_snapshot);
+        for (uint256 i = 0; i < allocations.length; i++) {
+            PoolSnapshot memory pool = _snapshot.pools[i];
+            if (
+                allocations[i] > 0 &&
+                pool.reserveBoo > 0 &&
+                pool.reserveXboo > 0 &&
+                _lpPriceInRange(_snapshot, pool)
+            ) {
+                return true;
+            }
+        }
         return false;
     }
 
+    ///@notice Our call cost in boo, off the wftm/boo solidly pair's twap. 0 until that pair has enough history.
     function ethToWant(uint256 _amtInWei)
         public
         view
         override
         returns (uint256)
-    {}
+    {
+        return _twapQuote(wftm, address(want), _amtInWei);
+    }
 
     function updateTradeFactory(address _newTradeFactory)
         external
@@ -566,10 +1427,104 @@ contract Strategy is BaseStrategy {
         if (!_force) {
             require(_slippage >= 990, "higher than 1pc slippage set");
         }
-        lpSlippage = _slippage;
+        lpSlippage = uint16(_slippage);
+    }
+
+    ///@notice Sell SEX and SOLID for BOO inside harvest (sync), or only through the trade factory (async).
+    /// In sync mode the trade factory keeps whatever we don't sell: dust, or anything without a twap yet.
+    function setSyncCompounding(bool _sync) external onlyGovernance {
+        syncCompounding = _sync;
+        sex.safeApprove(solidlyRouter, 0);
+        solid.safeApprove(solidlyRouter, 0);
+        if (_sync) {
+            sex.safeApprove(solidlyRouter, type(uint256).max);
+            solid.safeApprove(solidlyRouter, type(uint256).max);
+        }
+    }
+
+    ///@notice Basis points under the twap we accept when selling rewards in sync mode.
+    function setRewardSellSlippage(uint256 _slippage)
+        external
+        onlyVaultManagers
+    {
+        require(_slippage <= 10_000, "higher than max");
+        rewardSellSlippage = uint16(_slippage);
+    }
+
+    ///@notice Basis points of our assets to keep as loose BOO, so small withdrawals don't unwind our lp.
+    /// Harvests keep it back from what they deposit and refill it when withdrawals have used it up.
+    function setBooBuffer(uint256 _buffer) external onlyVaultManagers {
+        require(_buffer <= 10_000, "higher than max");
+        booBuffer = uint16(_buffer);
+    }
+
+    ///@notice In sync mode we don't sell less SEX or SOLID than this.
+    function setMinRewardToSell(uint256 _minRewardToSell)
+        external
+        onlyVaultManagers
+    {
+        minRewardToSell = _minRewardToSell;
     }
 
     function setDepositerAvoid(bool _avoid) external onlyGovernance {
         depositerAvoid = _avoid;
     }
+
+    ///@notice Add another boo/xboo solidly pair to lp into. It starts with zero weight, use setPoolWeights to send funds to it.
+    function addPool(address _lpToken) external onlyVaultManagers {
+        _addPool(_lpToken, 0);
+    }
+
+    ///@notice Remove a pool with zero weight, whatever we hold in it is left loose for our next harvest to redeploy.
+    function removePool(uint256 _index) external onlyVaultManagers {
+        require(pools.length > 1, "last pool");
+        Pool memory pool = pools[_index];
+        require(pool.weight == 0, "pool has weight");
+
+        // our harvests only claim from the pools we list, so claim this one's rewards while it's still ours
+        address[] memory lpTokens = new address[](1);
+        lpTokens[0] = pool.lpToken;
+        _claimRewards(lpTokens);
+
+        _exitPool(pool);
+        IERC20(pool.lpToken).approve(address(lpDepositer), 0);
+        IERC20(pool.lpToken).approve(address(solidlyRouter), 0);
+
+        pools[_index] = pools[pools.length - 1];
+        pools.pop();
+    }
+
+    ///@notice Target weights for our pools in basis points, in the same order as pools. Must add up to 10_000.
+    function setPoolWeights(uint256[] calldata _weights)
+        external
+        onlyVaultManagers
+    {
+        require(_weights.length == pools.length, "wrong length");
+        uint256 totalWeight;
+        for (uint256 i = 0; i < _weights.length; i++) {
+            pools[i].weight = uint16(_weights[i]); // anything over 10_000 fails our total check below
+            totalWeight = totalWeight.add(_weights[i]);
+        }
+        require(totalWeight == 10_000, "weights must add to 10_000");
+    }
+
+    function _addPool(address _lpToken, uint256 _weight) internal {
+        require(pools.length < maxPools, "too many pools");
+        for (uint256 i = 0; i < pools.length; i++) {
+            require(pools[i].lpToken != _lpToken, "pool exists");
+        }
+
+        ISolidlyPair pair = ISolidlyPair(_lpToken);
+        address token0 = pair.token0();
+        address token1 = pair.token1();
+        require(
+            (token0 == address(boo) && token1 == address(xboo)) ||
+                (token0 == address(xboo) && token1 == address(boo)),
+            "not a boo/xboo pair"
+        );
+
+        IERC20(_lpToken).approve(address(lpDepositer), type(uint256).max);
+        IERC20(_lpToken).approve(address(solidlyRouter), type(uint256).max);
+        pools.push(Pool(_lpToken, pair.stable(), uint16(_weight)));
+    }
 }
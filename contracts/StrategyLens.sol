@@ -0,0 +1,237 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+import {StrategyParams} from "@yearnvaults/contracts/BaseStrategy.sol";
+
+// Strategy's PoolSnapshot and PositionSnapshot, field for field so their abi matches
+struct LensPoolSnapshot {
+    address lpToken;
+    bool stable;
+    uint256 weight;
+    uint256 stakedLp;
+    uint256 looseLp;
+    uint256 lpSupply;
+    uint256 reserveBoo;
+    uint256 reserveXboo;
+    uint256 booInLp;
+    uint256 xbooInLp;
+}
+
+struct LensPositionSnapshot {
+    LensPoolSnapshot[] pools;
+    uint256 booInLp;
+    uint256 xbooInLp;
+    uint256 looseXboo;
+    uint256 looseBoo;
+    uint256 booInXboo;
+    uint256 xbooSupply;
+    uint256 xbooRate;
+    uint256 totalAssets;
+}
+
+interface ILensStrategy {
+    function vault() external view returns (address);
+
+    function harvestTrigger(uint256 callCostInWei) external view returns (bool);
+
+    function balanceOfLPStaked() external view returns (uint256);
+
+    function positionSnapshot()
+        external
+        view
+        returns (LensPositionSnapshot memory);
+}
+
+interface ILensVault {
+    function strategies(address _strategy)
+        external
+        view
+        returns (StrategyParams memory);
+
+    function creditAvailable(address _strategy) external view returns (uint256);
+}
+
+// What keepers and dashboards read about each strategy of a fleet, in one eth_call.
+// It's never deployed: eth_call its creation code with the constructor's arguments and the
+// constructor returns our snapshot instead of runtime code. strategy_tools/lens.py builds that
+// call and decodes what comes back.
+//
+// The snapshot is one fixed size record per strategy, packed tight (see recordSize):
+// strategy, vault, harvestTrigger, failed, estimatedTotalAssets, balanceOfLPStaked, the boo and
+// xboo behind all of our lp in every pool (estimatedTotalAssets, booInLp and xbooInLp all come from
+// positionSnapshot), creditAvailable, then vault.strategies() with performanceFee and debtRatio as
+// uint16 and activation and lastReport as uint64. A read that reverts leaves its fields at 0 and
+// sets its bit in failed.
+contract StrategyLens {
+    uint256 public constant recordSize = 382;
+
+    uint8 internal constant vaultFailed = 1;
+    uint8 internal constant triggerFailed = 2;
+    uint8 internal constant assetsFailed = 4;
+    uint8 internal constant stakedFailed = 8;
+    uint8 internal constant positionFailed = 16;
+    uint8 internal constant paramsFailed = 32;
+    uint8 internal constant creditFailed = 64;
+    uint8 internal constant allFailed = 127;
+
+    struct Record {
+        address strategy;
+        address vault;
+        bool harvestTrigger;
+        uint8 failed;
+        uint256 estimatedTotalAssets;
+        uint256 balanceOfLPStaked;
+        uint256 booInLp;
+        uint256 xbooInLp;
+        uint256 creditAvailable;
+        StrategyParams params;
+    }
+
+    constructor(address[] memory _strategies, uint256 _callCostInWei)
+        public
+    {
+        bytes memory snapshot = _snapshot(_strategies, _callCostInWei);
+        assembly {
+            return(add(snapshot, 32), mload(snapshot))
+        }
+    }
+
+    ///@notice The same snapshot, for a lens that has been deployed after all.
+    function snapshot(address[] calldata _strategies, uint256 _callCostInWei)
+        external
+        view
+        returns (bytes memory)
+    {
+        return _snapshot(_strategies, _callCostInWei);
+    }
+
+    function _snapshot(address[] memory _strategies, uint256 _callCostInWei)
+        internal
+        view
+        returns (bytes memory out)
+    {
+        uint256 length = _strategies.length * recordSize;
+        // a word of slack, each field is written as a whole word and the last one runs past our end
+        out = new bytes(length + 32);
+        assembly {
+            mstore(out, length)
+        }
+
+        uint256 offset;
+        for (uint256 i = 0; i < _strategies.length; i++) {
+            offset = _writeRecord(
+                out,
+                offset,
+                _read(_strategies[i], _callCostInWei)
+            );
+        }
+    }
+
+    function _read(address _strategy, uint256 _callCostInWei)
+        internal
+        view
+        returns (Record memory record)
+    {
+        record.strategy = _strategy;
+        // try/catch doesn't catch calls to an address without code, they revert the whole snapshot
+        uint256 size;
+        assembly {
+            size := extcodesize(_strategy)
+        }
+        if (size == 0) {
+            record.failed = allFailed;
+            return record;
+        }
+        ILensStrategy strategy = ILensStrategy(_strategy);
+
+        try strategy.harvestTrigger(_callCostInWei) returns (bool trigger) {
+            record.harvestTrigger = trigger;
+        } catch {
+            record.failed |= triggerFailed;
+        }
+        try strategy.balanceOfLPStaked() returns (uint256 staked) {
+            record.balanceOfLPStaked = staked;
+        } catch {
+            record.failed |= stakedFailed;
+        }
+        // balanceOfLPStaked is our first pool's, the snapshot covers them all. estimatedTotalAssets is
+        // the snapshot's totalAssets, so we don't walk our pools a second time for it
+        try strategy.positionSnapshot() returns (
+            LensPositionSnapshot memory position
+        ) {
+            record.estimatedTotalAssets = position.totalAssets;
+            (record.booInLp, record.xbooInLp) = (
+                position.booInLp,
+                position.xbooInLp
+            );
+        } catch {
+            record.failed |= assetsFailed | positionFailed;
+        }
+
+        try strategy.vault() returns (address vault) {
+            record.vault = vault;
+        } catch {
+            record.failed |= vaultFailed | paramsFailed | creditFailed;
+            return record;
+        }
+        try ILensVault(record.vault).strategies(_strategy) returns (
+            StrategyParams memory params
+        ) {
+            record.params = params;
+        } catch {
+            record.failed |= paramsFailed;
+        }
+        try ILensVault(record.vault).creditAvailable(_strategy) returns (
+            uint256 credit
+        ) {
+            record.creditAvailable = credit;
+        } catch {
+            record.failed |= creditFailed;
+        }
+    }
+
+    function _writeRecord(
+        bytes memory _out,
+        uint256 _offset,
+        Record memory _record
+    ) internal pure returns (uint256 offset) {
+        offset = _write(_out, _offset, uint256(_record.strategy), 20);
+        offset = _write(_out, offset, uint256(_record.vault), 20);
+        offset = _write(_out, offset, _record.harvestTrigger ? 1 : 0, 1);
+        offset = _write(_out, offset, _record.failed, 1);
+        offset = _write(_out, offset, _record.estimatedTotalAssets, 32);
+        offset = _write(_out, offset, _record.balanceOfLPStaked, 32);
+        offset = _write(_out, offset, _record.booInLp, 32);
+        offset = _write(_out, offset, _record.xbooInLp, 32);
+        offset = _write(_out, offset, _record.creditAvailable, 32);
+
+        StrategyParams memory params = _record.params;
+        offset = _write(_out, offset, uint16(params.performanceFee), 2);
+        offset = _write(_out, offset, uint64(params.activation), 8);
+        offset = _write(_out, offset, uint16(params.debtRatio), 2);
+        offset = _write(_out, offset, params.minDebtPerHarvest, 32);
+        offset = _write(_out, offset, params.maxDebtPerHarvest, 32);
+        offset = _write(_out, offset, uint64(params.lastReport), 8);
+        offset = _write(_out, offset, params.totalDebt, 32);
+        offset = _write(_out, offset, params.totalGain, 32);
+        offset = _write(_out, offset, params.totalLoss, 32);
+    }
+
+    // write the low _size bytes of _value big endian at _offset. we always write forward, so the
+    // zeros this leaves after them are overwritten by the next field
+    function _write(
+        bytes memory _out,
+        uint256 _offset,
+        uint256 _value,
+        uint256 _size
+    ) internal pure returns (uint256) {
+        assembly {
+            mstore(
+                add(add(_out, 32), _offset),
+                shl(mul(sub(32, _size), 8), _value)
+            )
+        }
+        return _offset + _size;
+    }
+}
@@ -0,0 +1,23 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+
+import "./MockERC20Base.sol";
+
+// A plain ERC20 anyone can mint and burn
+contract MockERC20 is MockERC20Base {
+    function initialize(
+        string calldata _name,
+        string calldata _symbol,
+        uint8 _decimals
+    ) external {
+        _initializeToken(_name, _symbol, _decimals);
+    }
+
+    function mint(address to, uint256 amount) external {
+        _mint(to, amount);
+    }
+
+    function burn(address from, uint256 amount) external {
+        _burn(from, amount);
+    }
+}
@@ -0,0 +1,98 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+
+import "@openzeppelin/contracts/math/SafeMath.sol";
+
+// Mocks are etched at the live Fantom addresses our Strategy hardcodes, so they
+// never rely on constructors or immutables: everything lives in storage and is
+// set through an initializer once the code is in place.
+
+// ERC20 plumbing shared by our mock tokens, xBOO and lp tokens
+contract MockERC20Base {
+    using SafeMath for uint256;
+
+    string public name;
+    string public symbol;
+    uint8 public decimals;
+
+    uint256 internal _totalSupply;
+    mapping(address => uint256) internal _balances;
+    mapping(address => mapping(address => uint256)) public allowance;
+
+    event Transfer(address indexed from, address indexed to, uint256 value);
+    event Approval(
+        address indexed owner,
+        address indexed spender,
+        uint256 value
+    );
+
+    function _initializeToken(
+        string memory _name,
+        string memory _symbol,
+        uint8 _decimals
+    ) internal {
+        require(decimals == 0, "initialized");
+        name = _name;
+        symbol = _symbol;
+        decimals = _decimals;
+    }
+
+    function totalSupply() public view returns (uint256) {
+        return _totalSupply;
+    }
+
+    function balanceOf(address account) public view returns (uint256) {
+        return _balances[account];
+    }
+
+    function approve(address spender, uint256 amount) external returns (bool) {
+        allowance[msg.sender][spender] = amount;
+        emit Approval(msg.sender, spender, amount);
+        return true;
+    }
+
+    function transfer(address to, uint256 amount) external returns (bool) {
+        _transfer(msg.sender, to, amount);
+        return true;
+    }
+
+    function transferFrom(
+        address from,
+        address to,
+        uint256 amount
+    ) external returns (bool) {
+        if (allowance[from][msg.sender] != uint256(-1)) {
+            allowance[from][msg.sender] = allowance[from][msg.sender].sub(
+                amount,
+                "ERC20: transfer amount exceeds allowance"
+            );
+        }
+        _transfer(from, to, amount);
+        return true;
+    }
+
+    function _transfer(
+        address from,
+        address to,
+        uint256 amount
+    ) internal {
+        _balances[from] = _balances[from].sub(
+            amount,
+            "ERC20: transfer amount exceeds balance"
+        );
+        _balances[to] = _balances[to].add(amount);
+        emit Transfer(from, to, amount);
+    }
+
+    function _mint(address to, uint256 amount) internal {
+        _totalSupply = _totalSupply.add(amount);
+        _balances[to] = _balances[to].add(amount);
+        emit Transfer(address(0), to, amount);
+    }
+
+    function _burn(address from, uint256 amount) internal {
+        _balances[from] = _balances[from].sub(amount);
+        _totalSupply = _totalSupply.sub(amount);
+        emit Transfer(from, address(0), amount);
+    }
+}
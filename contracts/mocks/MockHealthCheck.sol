@@ -0,0 +1,15 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+
+// Yearn's common health check, but everything is healthy
+contract MockHealthCheck {
+    function check(
+        uint256,
+        uint256,
+        uint256,
+        uint256,
+        uint256
+    ) external pure returns (bool) {
+        return true;
+    }
+}
@@ -0,0 +1,115 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+import "@openzeppelin/contracts/math/SafeMath.sol";
+import "./MockERC20.sol";
+
+// Solidex's LpDepositor: takes any solidly lp and pays out SEX and SOLID
+// every second, pro rata to the lp each user has staked.
+contract MockLpDepositer {
+    using SafeMath for uint256;
+
+    MockERC20 public sex;
+    MockERC20 public solid;
+    // paid per second for every 1e18 lp staked
+    uint256 public sexPerLp;
+    uint256 public solidPerLp;
+
+    struct Amounts {
+        uint256 solid;
+        uint256 sex;
+    }
+
+    mapping(address => mapping(address => uint256)) public userBalances;
+    mapping(address => uint256) public totalBalances;
+    mapping(address => mapping(address => uint256)) internal lastAccrued;
+    mapping(address => mapping(address => uint256)) internal owedSex;
+    mapping(address => mapping(address => uint256)) internal owedSolid;
+
+    event Deposited(address indexed user, address indexed pool, uint256 amount);
+    event Withdrawn(address indexed user, address indexed pool, uint256 amount);
+
+    function initialize(
+        address _sex,
+        address _solid,
+        uint256 _sexPerLp,
+        uint256 _solidPerLp
+    ) external {
+        require(address(sex) == address(0), "initialized");
+        sex = MockERC20(_sex);
+        solid = MockERC20(_solid);
+        sexPerLp = _sexPerLp;
+        solidPerLp = _solidPerLp;
+    }
+
+    function setRewardRates(uint256 _sexPerLp, uint256 _solidPerLp) external {
+        sexPerLp = _sexPerLp;
+        solidPerLp = _solidPerLp;
+    }
+
+    function deposit(address pool, uint256 _amount) external {
+        _accrue(msg.sender, pool);
+        MockERC20Base(pool).transferFrom(msg.sender, address(this), _amount);
+        userBalances[msg.sender][pool] = userBalances[msg.sender][pool].add(
+            _amount
+        );
+        totalBalances[pool] = totalBalances[pool].add(_amount);
+        emit Deposited(msg.sender, pool, _amount);
+    }
+
+    function withdraw(address pool, uint256 _amount) external {
+        _accrue(msg.sender, pool);
+        userBalances[msg.sender][pool] = userBalances[msg.sender][pool].sub(
+            _amount
+        );
+        totalBalances[pool] = totalBalances[pool].sub(_amount);
+        MockERC20Base(pool).transfer(msg.sender, _amount);
+        emit Withdrawn(msg.sender, pool, _amount);
+    }
+
+    function getReward(address[] calldata pools) external {
+        uint256 sexOwed;
+        uint256 solidOwed;
+        for (uint256 i = 0; i < pools.length; i++) {
+            _accrue(msg.sender, pools[i]);
+            sexOwed = sexOwed.add(owedSex[msg.sender][pools[i]]);
+            solidOwed = solidOwed.add(owedSolid[msg.sender][pools[i]]);
+            owedSex[msg.sender][pools[i]] = 0;
+            owedSolid[msg.sender][pools[i]] = 0;
+        }
+        if (sexOwed > 0) sex.mint(msg.sender, sexOwed);
+        if (solidOwed > 0) solid.mint(msg.sender, solidOwed);
+    }
+
+    function pendingRewards(address account, address[] calldata pools)
+        external
+        view
+        returns (Amounts[] memory pending)
+    {
+        pending = new Amounts[](pools.length);
+        for (uint256 i = 0; i < pools.length; i++) {
+            (pending[i].sex, pending[i].solid) = _pending(account, pools[i]);
+        }
+    }
+
+    function _pending(address user, address pool)
+        internal
+        view
+        returns (uint256 sexAmount, uint256 solidAmount)
+    {
+        uint256 elapsed = block.timestamp.sub(lastAccrued[user][pool]);
+        uint256 staked = userBalances[user][pool];
+        sexAmount = owedSex[user][pool].add(
+            staked.mul(elapsed).mul(sexPerLp).div(1e18)
+        );
+        solidAmount = owedSolid[user][pool].add(
+            staked.mul(elapsed).mul(solidPerLp).div(1e18)
+        );
+    }
+
+    function _accrue(address user, address pool) internal {
+        (owedSex[user][pool], owedSolid[user][pool]) = _pending(user, pool);
+        lastAccrued[user][pool] = block.timestamp;
+    }
+}
@@ -0,0 +1,41 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+
+// ySwaps' multicall swapper: _data is a packed uint8 optimization flag followed
+// by (address to, uint256 length, bytes data) calls, run one after another.
+// We only support 5, CallOnlyNoValue, which is all our payloads use.
+contract MockMulticallSwapper {
+    uint8 public constant CALL_ONLY_NO_VALUE = 5;
+
+    function swap(
+        address,
+        address,
+        address,
+        uint256,
+        uint256,
+        bytes calldata _data
+    ) external {
+        bytes memory data = _data;
+        require(
+            data.length > 0 && uint8(data[0]) == CALL_ONLY_NO_VALUE,
+            "CallOnlyOptimizationRequired"
+        );
+        uint256 offset = 1;
+        while (offset < data.length) {
+            address to;
+            uint256 length;
+            // skip the 32 byte length prefix of our bytes in memory
+            assembly {
+                to := shr(96, mload(add(add(data, 32), offset)))
+                length := mload(add(add(data, 52), offset))
+            }
+            bytes memory call = new bytes(length);
+            for (uint256 i = 0; i < length; i++) {
+                call[i] = data[offset + 52 + i];
+            }
+            (bool success, ) = to.call(call);
+            require(success, "MultiCallRevert");
+            offset += 52 + length;
+        }
+    }
+}
@@ -0,0 +1,62 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+
+import "./MockSolidlyPair.sol";
+
+// Solidly's BaseV1Factory, minus fees and pausing
+contract MockSolidlyFactory {
+    mapping(address => mapping(address => mapping(bool => address)))
+        public getPair;
+    mapping(address => bool) public isPair;
+    address[] public allPairs;
+
+    event PairCreated(
+        address indexed token0,
+        address indexed token1,
+        bool stable,
+        address pair,
+        uint256
+    );
+
+    function allPairsLength() external view returns (uint256) {
+        return allPairs.length;
+    }
+
+    function createPair(
+        address tokenA,
+        address tokenB,
+        bool stable
+    ) external returns (address pair) {
+        (address token0, address token1) = _sortTokens(tokenA, tokenB);
+        pair = address(new MockSolidlyPair());
+        MockSolidlyPair(pair).initialize(token0, token1, stable);
+        _register(pair);
+    }
+
+    // for pairs we etched ourselves at a fixed address
+    function registerPair(address pair) external {
+        _register(pair);
+    }
+
+    function _register(address pair) internal {
+        MockSolidlyPair _pair = MockSolidlyPair(pair);
+        address token0 = _pair.token0();
+        address token1 = _pair.token1();
+        bool stable = _pair.stable();
+        require(getPair[token0][token1][stable] == address(0), "PE"); // BaseV1: PAIR_EXISTS
+        getPair[token0][token1][stable] = pair;
+        getPair[token1][token0][stable] = pair;
+        isPair[pair] = true;
+        allPairs.push(pair);
+        emit PairCreated(token0, token1, stable, pair, allPairs.length);
+    }
+
+    function _sortTokens(address tokenA, address tokenB)
+        internal
+        pure
+        returns (address, address)
+    {
+        require(tokenA != tokenB, "IA"); // BaseV1: IDENTICAL_ADDRESSES
+        return tokenA < tokenB ? (tokenA, tokenB) : (tokenB, tokenA);
+    }
+}
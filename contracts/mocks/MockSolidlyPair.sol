@@ -0,0 +1,401 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+
+import "@openzeppelin/contracts/math/Math.sol";
+import "./MockERC20Base.sol";
+
+interface IERC20Minimal {
+    function balanceOf(address) external view returns (uint256);
+
+    function transfer(address, uint256) external returns (bool);
+
+    function transferFrom(
+        address,
+        address,
+        uint256
+    ) external returns (bool);
+
+    function decimals() external view returns (uint8);
+}
+
+library MockMath {
+    // babylonian method, like uniswap v2's Math.sqrt
+    function sqrt(uint256 y) internal pure returns (uint256 z) {
+        if (y > 3) {
+            z = y;
+            uint256 x = y / 2 + 1;
+            while (x < z) {
+                z = x;
+                x = (y / x + x) / 2;
+            }
+        } else if (y != 0) {
+            z = 1;
+        }
+    }
+}
+
+// A Solidly BaseV1Pair: x*y=k for volatile pairs, x3y+y3x=k for stable ones,
+// 0.01% fee on the way in. Fees stay in the pair, so they accrue to lps.
+// Keeps BaseV1Pair's cumulative reserves and 30 minute observations for its twap.
+contract MockSolidlyPair is MockERC20Base {
+    uint256 internal constant MINIMUM_LIQUIDITY = 10**3;
+    uint256 internal constant periodSize = 1800;
+
+    address public token0;
+    address public token1;
+    bool public stable;
+    uint256 internal decimals0;
+    uint256 internal decimals1;
+
+    uint256 public reserve0;
+    uint256 public reserve1;
+    uint256 public blockTimestampLast;
+
+    struct Observation {
+        uint256 timestamp;
+        uint256 reserve0Cumulative;
+        uint256 reserve1Cumulative;
+    }
+    Observation[] public observations;
+    uint256 public reserve0CumulativeLast;
+    uint256 public reserve1CumulativeLast;
+
+    event Mint(address indexed sender, uint256 amount0, uint256 amount1);
+    event Burn(
+        address indexed sender,
+        uint256 amount0,
+        uint256 amount1,
+        address indexed to
+    );
+    event Swap(
+        address indexed sender,
+        uint256 amount0In,
+        uint256 amount1In,
+        uint256 amount0Out,
+        uint256 amount1Out,
+        address indexed to
+    );
+    event Sync(uint256 reserve0, uint256 reserve1);
+
+    function initialize(
+        address _token0,
+        address _token1,
+        bool _stable
+    ) external {
+        require(token0 == address(0), "initialized");
+        require(_token0 < _token1, "unsorted");
+        _initializeToken(
+            _stable ? "StableV1 AMM" : "VolatileV1 AMM",
+            _stable ? "sAMM" : "vAMM",
+            18
+        );
+        token0 = _token0;
+        token1 = _token1;
+        stable = _stable;
+        decimals0 = 10**uint256(IERC20Minimal(_token0).decimals());
+        decimals1 = 10**uint256(IERC20Minimal(_token1).decimals());
+        observations.push(Observation(block.timestamp, 0, 0));
+    }
+
+    function getReserves()
+        public
+        view
+        returns (
+            uint256 _reserve0,
+            uint256 _reserve1,
+            uint256 _blockTimestampLast
+        )
+    {
+        return (reserve0, reserve1, blockTimestampLast);
+    }
+
+    function tokens() external view returns (address, address) {
+        return (token0, token1);
+    }
+
+    function observationLength() external view returns (uint256) {
+        return observations.length;
+    }
+
+    function _lastObservation() internal view returns (Observation memory) {
+        return observations[observations.length - 1];
+    }
+
+    // cumulative reserves as of now, counting the time since our last update
+    function currentCumulativePrices()
+        public
+        view
+        returns (
+            uint256 reserve0Cumulative,
+            uint256 reserve1Cumulative,
+            uint256 blockTimestamp
+        )
+    {
+        blockTimestamp = block.timestamp;
+        reserve0Cumulative = reserve0CumulativeLast;
+        reserve1Cumulative = reserve1CumulativeLast;
+        uint256 timeElapsed = blockTimestamp - blockTimestampLast;
+        reserve0Cumulative += reserve0 * timeElapsed;
+        reserve1Cumulative += reserve1 * timeElapsed;
+    }
+
+    // what amountIn gets at the average reserves of each of our last granularity observations, averaged
+    function quote(
+        address tokenIn,
+        uint256 amountIn,
+        uint256 granularity
+    ) external view returns (uint256 amountOut) {
+        uint256[] memory _prices = sample(tokenIn, amountIn, granularity, 1);
+        uint256 priceAverageCumulative;
+        for (uint256 i = 0; i < _prices.length; i++) {
+            priceAverageCumulative += _prices[i];
+        }
+        return priceAverageCumulative / granularity;
+    }
+
+    function sample(
+        address tokenIn,
+        uint256 amountIn,
+        uint256 points,
+        uint256 window
+    ) public view returns (uint256[] memory) {
+        uint256[] memory _prices = new uint256[](points);
+        uint256 length = observations.length - 1;
+        uint256 i = length.sub(points * window);
+        uint256 index = 0;
+        for (; i < length; i += window) {
+            uint256 nextIndex = i + window;
+            uint256 timeElapsed =
+                observations[nextIndex].timestamp - observations[i].timestamp;
+            uint256 _reserve0 =
+                (observations[nextIndex].reserve0Cumulative -
+                    observations[i].reserve0Cumulative) / timeElapsed;
+            uint256 _reserve1 =
+                (observations[nextIndex].reserve1Cumulative -
+                    observations[i].reserve1Cumulative) / timeElapsed;
+            _prices[index] = _getAmountOut(
+                amountIn,
+                tokenIn,
+                _reserve0,
+                _reserve1
+            );
+            index = index + 1;
+        }
+        return _prices;
+    }
+
+    function _update(uint256 balance0, uint256 balance1) internal {
+        uint256 timeElapsed = block.timestamp - blockTimestampLast;
+        if (timeElapsed > 0 && reserve0 != 0 && reserve1 != 0) {
+            reserve0CumulativeLast += reserve0 * timeElapsed;
+            reserve1CumulativeLast += reserve1 * timeElapsed;
+        }
+        // a new observation at most every periodSize
+        if (block.timestamp - _lastObservation().timestamp > periodSize) {
+            observations.push(
+                Observation(
+                    block.timestamp,
+                    reserve0CumulativeLast,
+                    reserve1CumulativeLast
+                )
+            );
+        }
+
+        reserve0 = balance0;
+        reserve1 = balance1;
+        blockTimestampLast = block.timestamp;
+        emit Sync(balance0, balance1);
+    }
+
+    // tokens have to be sent in first, like the real thing
+    function mint(address to) external returns (uint256 liquidity) {
+        uint256 _balance0 = IERC20Minimal(token0).balanceOf(address(this));
+        uint256 _balance1 = IERC20Minimal(token1).balanceOf(address(this));
+        uint256 _amount0 = _balance0.sub(reserve0);
+        uint256 _amount1 = _balance1.sub(reserve1);
+
+        if (_totalSupply == 0) {
+            liquidity = MockMath.sqrt(_amount0.mul(_amount1)).sub(MINIMUM_LIQUIDITY);
+            _mint(address(0), MINIMUM_LIQUIDITY);
+        } else {
+            liquidity = Math.min(
+                _amount0.mul(_totalSupply).div(reserve0),
+                _amount1.mul(_totalSupply).div(reserve1)
+            );
+        }
+        require(liquidity > 0, "ILM"); // BaseV1: INSUFFICIENT_LIQUIDITY_MINTED
+        _mint(to, liquidity);
+        _update(_balance0, _balance1);
+        emit Mint(msg.sender, _amount0, _amount1);
+    }
+
+    // lp has to be sent in first, like the real thing
+    function burn(address to)
+        external
+        returns (uint256 amount0, uint256 amount1)
+    {
+        uint256 _balance0 = IERC20Minimal(token0).balanceOf(address(this));
+        uint256 _balance1 = IERC20Minimal(token1).balanceOf(address(this));
+        uint256 _liquidity = _balances[address(this)];
+
+        amount0 = _liquidity.mul(_balance0).div(_totalSupply);
+        amount1 = _liquidity.mul(_balance1).div(_totalSupply);
+        require(amount0 > 0 && amount1 > 0, "ILB"); // BaseV1: INSUFFICIENT_LIQUIDITY_BURNED
+        _burn(address(this), _liquidity);
+        IERC20Minimal(token0).transfer(to, amount0);
+        IERC20Minimal(token1).transfer(to, amount1);
+
+        _update(
+            IERC20Minimal(token0).balanceOf(address(this)),
+            IERC20Minimal(token1).balanceOf(address(this))
+        );
+        emit Burn(msg.sender, amount0, amount1, to);
+    }
+
+    // tokens have to be sent in first, like the real thing
+    function swap(
+        uint256 amount0Out,
+        uint256 amount1Out,
+        address to,
+        bytes calldata
+    ) external {
+        require(amount0Out > 0 || amount1Out > 0, "IOA"); // BaseV1: INSUFFICIENT_OUTPUT_AMOUNT
+        uint256 _reserve0 = reserve0;
+        uint256 _reserve1 = reserve1;
+        require(amount0Out < _reserve0 && amount1Out < _reserve1, "IL"); // BaseV1: INSUFFICIENT_LIQUIDITY
+
+        if (amount0Out > 0) IERC20Minimal(token0).transfer(to, amount0Out);
+        if (amount1Out > 0) IERC20Minimal(token1).transfer(to, amount1Out);
+        uint256 _balance0 = IERC20Minimal(token0).balanceOf(address(this));
+        uint256 _balance1 = IERC20Minimal(token1).balanceOf(address(this));
+
+        uint256 amount0In =
+            _balance0 > _reserve0 - amount0Out
+                ? _balance0 - (_reserve0 - amount0Out)
+                : 0;
+        uint256 amount1In =
+            _balance1 > _reserve1 - amount1Out
+                ? _balance1 - (_reserve1 - amount1Out)
+                : 0;
+        require(amount0In > 0 || amount1In > 0, "IIA"); // BaseV1: INSUFFICIENT_INPUT_AMOUNT
+
+        // the fee stays in the pair, k has to hold without it
+        require(
+            _k(
+                _balance0.sub(amount0In / 10000),
+                _balance1.sub(amount1In / 10000)
+            ) >= _k(_reserve0, _reserve1),
+            "K"
+        );
+
+        _update(_balance0, _balance1);
+        emit Swap(msg.sender, amount0In, amount1In, amount0Out, amount1Out, to);
+    }
+
+    // force balances to match reserves
+    function skim(address to) external {
+        IERC20Minimal(token0).transfer(
+            to,
+            IERC20Minimal(token0).balanceOf(address(this)).sub(reserve0)
+        );
+        IERC20Minimal(token1).transfer(
+            to,
+            IERC20Minimal(token1).balanceOf(address(this)).sub(reserve1)
+        );
+    }
+
+    // force reserves to match balances
+    function sync() external {
+        _update(
+            IERC20Minimal(token0).balanceOf(address(this)),
+            IERC20Minimal(token1).balanceOf(address(this))
+        );
+    }
+
+    function getAmountOut(uint256 amountIn, address tokenIn)
+        external
+        view
+        returns (uint256)
+    {
+        amountIn = amountIn.sub(amountIn / 10000); // remove the fee
+        return _getAmountOut(amountIn, tokenIn, reserve0, reserve1);
+    }
+
+    function _getAmountOut(
+        uint256 amountIn,
+        address tokenIn,
+        uint256 _reserve0,
+        uint256 _reserve1
+    ) internal view returns (uint256) {
+        if (stable) {
+            uint256 xy = _k(_reserve0, _reserve1);
+            _reserve0 = _reserve0.mul(1e18).div(decimals0);
+            _reserve1 = _reserve1.mul(1e18).div(decimals1);
+            (uint256 reserveA, uint256 reserveB) =
+                tokenIn == token0
+                    ? (_reserve0, _reserve1)
+                    : (_reserve1, _reserve0);
+            amountIn = tokenIn == token0
+                ? amountIn.mul(1e18).div(decimals0)
+                : amountIn.mul(1e18).div(decimals1);
+            uint256 y =
+                reserveB.sub(_getY(amountIn.add(reserveA), xy, reserveB));
+            return y.mul(tokenIn == token0 ? decimals1 : decimals0).div(1e18);
+        }
+        (uint256 reserveIn, uint256 reserveOut) =
+            tokenIn == token0 ? (_reserve0, _reserve1) : (_reserve1, _reserve0);
+        return amountIn.mul(reserveOut).div(reserveIn.add(amountIn));
+    }
+
+    function _k(uint256 x, uint256 y) internal view returns (uint256) {
+        if (stable) {
+            uint256 _x = x.mul(1e18).div(decimals0);
+            uint256 _y = y.mul(1e18).div(decimals1);
+            uint256 _a = _x.mul(_y).div(1e18);
+            uint256 _b = _x.mul(_x).div(1e18).add(_y.mul(_y).div(1e18));
+            return _a.mul(_b).div(1e18); // x3y+y3x >= k
+        }
+        return x.mul(y); // xy >= k
+    }
+
+    function _f(uint256 x0, uint256 y) internal pure returns (uint256) {
+        return
+            x0.mul(y.mul(y).div(1e18).mul(y).div(1e18)).div(1e18).add(
+                x0.mul(x0).div(1e18).mul(x0).div(1e18).mul(y).div(1e18)
+            );
+    }
+
+    function _d(uint256 x0, uint256 y) internal pure returns (uint256) {
+        return
+            uint256(3).mul(x0).mul(y.mul(y).div(1e18)).div(1e18).add(
+                x0.mul(x0).div(1e18).mul(x0).div(1e18)
+            );
+    }
+
+    // newton's method for the y that keeps x3y+y3x = xy
+    function _getY(
+        uint256 x0,
+        uint256 xy,
+        uint256 y
+    ) internal pure returns (uint256) {
+        for (uint256 i = 0; i < 255; i++) {
+            uint256 yPrev = y;
+            uint256 k = _f(x0, y);
+            if (k < xy) {
+                y = y.add(xy.sub(k).mul(1e18).div(_d(x0, y)));
+            } else {
+                y = y.sub(k.sub(xy).mul(1e18).div(_d(x0, y)));
+            }
+            if (y > yPrev) {
+                if (y - yPrev <= 1) {
+                    return y;
+                }
+            } else {
+                if (yPrev - y <= 1) {
+                    return y;
+                }
+            }
+        }
+        return y;
+    }
+}
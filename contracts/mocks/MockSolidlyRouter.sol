@@ -0,0 +1,334 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+import "@openzeppelin/contracts/math/SafeMath.sol";
+import "./MockSolidlyFactory.sol";
+
+// Solidly's BaseV1Router01 against our mock factory
+contract MockSolidlyRouter {
+    using SafeMath for uint256;
+
+    struct route {
+        address from;
+        address to;
+        bool stable;
+    }
+
+    MockSolidlyFactory public factory;
+
+    modifier ensure(uint256 deadline) {
+        require(deadline >= block.timestamp, "EXPIRED");
+        _;
+    }
+
+    function initialize(address _factory) external {
+        require(address(factory) == address(0), "initialized");
+        factory = MockSolidlyFactory(_factory);
+    }
+
+    function sortTokens(address tokenA, address tokenB)
+        public
+        pure
+        returns (address token0, address token1)
+    {
+        require(tokenA != tokenB, "IA");
+        (token0, token1) = tokenA < tokenB
+            ? (tokenA, tokenB)
+            : (tokenB, tokenA);
+    }
+
+    function pairFor(
+        address tokenA,
+        address tokenB,
+        bool stable
+    ) public view returns (address pair) {
+        pair = factory.getPair(tokenA, tokenB, stable);
+    }
+
+    function isPair(address pair) external view returns (bool) {
+        return factory.isPair(pair);
+    }
+
+    function getReserves(
+        address tokenA,
+        address tokenB,
+        bool stable
+    ) public view returns (uint256 reserveA, uint256 reserveB) {
+        (address token0, ) = sortTokens(tokenA, tokenB);
+        (uint256 reserve0, uint256 reserve1, ) =
+            MockSolidlyPair(pairFor(tokenA, tokenB, stable)).getReserves();
+        (reserveA, reserveB) = tokenA == token0
+            ? (reserve0, reserve1)
+            : (reserve1, reserve0);
+    }
+
+    function quoteLiquidity(
+        uint256 amountA,
+        uint256 reserveA,
+        uint256 reserveB
+    ) public pure returns (uint256 amountB) {
+        require(amountA > 0, "INSUFFICIENT_AMOUNT");
+        require(reserveA > 0 && reserveB > 0, "INSUFFICIENT_LIQUIDITY");
+        amountB = amountA.mul(reserveB).div(reserveA);
+    }
+
+    function getAmountOut(
+        uint256 amountIn,
+        address tokenIn,
+        address tokenOut
+    ) external view returns (uint256 amount, bool stable) {
+        address pair = pairFor(tokenIn, tokenOut, true);
+        uint256 amountStable;
+        uint256 amountVolatile;
+        if (factory.isPair(pair)) {
+            amountStable = MockSolidlyPair(pair).getAmountOut(amountIn, tokenIn);
+        }
+        pair = pairFor(tokenIn, tokenOut, false);
+        if (factory.isPair(pair)) {
+            amountVolatile = MockSolidlyPair(pair).getAmountOut(
+                amountIn,
+                tokenIn
+            );
+        }
+        return
+            amountStable > amountVolatile
+                ? (amountStable, true)
+                : (amountVolatile, false);
+    }
+
+    function getAmountsOut(uint256 amountIn, route[] memory routes)
+        public
+        view
+        returns (uint256[] memory amounts)
+    {
+        require(routes.length >= 1, "INVALID_PATH");
+        amounts = new uint256[](routes.length + 1);
+        amounts[0] = amountIn;
+        for (uint256 i = 0; i < routes.length; i++) {
+            address pair = pairFor(routes[i].from, routes[i].to, routes[i].stable);
+            if (factory.isPair(pair)) {
+                amounts[i + 1] = MockSolidlyPair(pair).getAmountOut(
+                    amounts[i],
+                    routes[i].from
+                );
+            }
+        }
+    }
+
+    function quoteAddLiquidity(
+        address tokenA,
+        address tokenB,
+        bool stable,
+        uint256 amountADesired,
+        uint256 amountBDesired
+    )
+        external
+        view
+        returns (
+            uint256 amountA,
+            uint256 amountB,
+            uint256 liquidity
+        )
+    {
+        address _pair = pairFor(tokenA, tokenB, stable);
+        (uint256 reserveA, uint256 reserveB) = (0, 0);
+        uint256 _totalSupply = 0;
+        if (_pair != address(0)) {
+            _totalSupply = MockSolidlyPair(_pair).totalSupply();
+            (reserveA, reserveB) = getReserves(tokenA, tokenB, stable);
+        }
+        if (reserveA == 0 && reserveB == 0) {
+            (amountA, amountB) = (amountADesired, amountBDesired);
+            liquidity = MockMath.sqrt(amountA.mul(amountB)).sub(10**3);
+        } else {
+            uint256 amountBOptimal =
+                quoteLiquidity(amountADesired, reserveA, reserveB);
+            if (amountBOptimal <= amountBDesired) {
+                (amountA, amountB) = (amountADesired, amountBOptimal);
+            } else {
+                uint256 amountAOptimal =
+                    quoteLiquidity(amountBDesired, reserveB, reserveA);
+                (amountA, amountB) = (amountAOptimal, amountBDesired);
+            }
+            liquidity = Math.min(
+                amountA.mul(_totalSupply) / reserveA,
+                amountB.mul(_totalSupply) / reserveB
+            );
+        }
+    }
+
+    function quoteRemoveLiquidity(
+        address tokenA,
+        address tokenB,
+        bool stable,
+        uint256 liquidity
+    ) external view returns (uint256 amountA, uint256 amountB) {
+        address _pair = pairFor(tokenA, tokenB, stable);
+        if (_pair == address(0)) {
+            return (0, 0);
+        }
+        (uint256 reserveA, uint256 reserveB) =
+            getReserves(tokenA, tokenB, stable);
+        uint256 _totalSupply = MockSolidlyPair(_pair).totalSupply();
+        amountA = liquidity.mul(reserveA) / _totalSupply;
+        amountB = liquidity.mul(reserveB) / _totalSupply;
+    }
+
+    function _addLiquidity(
+        address tokenA,
+        address tokenB,
+        bool stable,
+        uint256 amountADesired,
+        uint256 amountBDesired,
+        uint256 amountAMin,
+        uint256 amountBMin
+    ) internal returns (uint256 amountA, uint256 amountB) {
+        require(amountADesired >= amountAMin);
+        require(amountBDesired >= amountBMin);
+        if (pairFor(tokenA, tokenB, stable) == address(0)) {
+            factory.createPair(tokenA, tokenB, stable);
+        }
+        (uint256 reserveA, uint256 reserveB) =
+            getReserves(tokenA, tokenB, stable);
+        if (reserveA == 0 && reserveB == 0) {
+            (amountA, amountB) = (amountADesired, amountBDesired);
+        } else {
+            uint256 amountBOptimal =
+                quoteLiquidity(amountADesired, reserveA, reserveB);
+            if (amountBOptimal <= amountBDesired) {
+                require(amountBOptimal >= amountBMin, "INSUFFICIENT_B_AMOUNT");
+                (amountA, amountB) = (amountADesired, amountBOptimal);
+            } else {
+                uint256 amountAOptimal =
+                    quoteLiquidity(amountBDesired, reserveB, reserveA);
+                assert(amountAOptimal <= amountADesired);
+                require(amountAOptimal >= amountAMin, "INSUFFICIENT_A_AMOUNT");
+                (amountA, amountB) = (amountAOptimal, amountBDesired);
+            }
+        }
+    }
+
+    function addLiquidity(
+        address tokenA,
+        address tokenB,
+        bool stable,
+        uint256 amountADesired,
+        uint256 amountBDesired,
+        uint256 amountAMin,
+        uint256 amountBMin,
+        address to,
+        uint256 deadline
+    )
+        external
+        ensure(deadline)
+        returns (
+            uint256 amountA,
+            uint256 amountB,
+            uint256 liquidity
+        )
+    {
+        (amountA, amountB) = _addLiquidity(
+            tokenA,
+            tokenB,
+            stable,
+            amountADesired,
+            amountBDesired,
+            amountAMin,
+            amountBMin
+        );
+        address pair = pairFor(tokenA, tokenB, stable);
+        IERC20Minimal(tokenA).transferFrom(msg.sender, pair, amountA);
+        IERC20Minimal(tokenB).transferFrom(msg.sender, pair, amountB);
+        liquidity = MockSolidlyPair(pair).mint(to);
+    }
+
+    function removeLiquidity(
+        address tokenA,
+        address tokenB,
+        bool stable,
+        uint256 liquidity,
+        uint256 amountAMin,
+        uint256 amountBMin,
+        address to,
+        uint256 deadline
+    ) public ensure(deadline) returns (uint256 amountA, uint256 amountB) {
+        address pair = pairFor(tokenA, tokenB, stable);
+        require(MockSolidlyPair(pair).transferFrom(msg.sender, pair, liquidity));
+        (uint256 amount0, uint256 amount1) = MockSolidlyPair(pair).burn(to);
+        (address token0, ) = sortTokens(tokenA, tokenB);
+        (amountA, amountB) = tokenA == token0
+            ? (amount0, amount1)
+            : (amount1, amount0);
+        require(amountA >= amountAMin, "INSUFFICIENT_A_AMOUNT");
+        require(amountB >= amountBMin, "INSUFFICIENT_B_AMOUNT");
+    }
+
+    function _swap(
+        uint256[] memory amounts,
+        route[] memory routes,
+        address _to
+    ) internal {
+        for (uint256 i = 0; i < routes.length; i++) {
+            (address token0, ) = sortTokens(routes[i].from, routes[i].to);
+            uint256 amountOut = amounts[i + 1];
+            (uint256 amount0Out, uint256 amount1Out) =
+                routes[i].from == token0
+                    ? (uint256(0), amountOut)
+                    : (amountOut, uint256(0));
+            address to =
+                i < routes.length - 1
+                    ? pairFor(
+                        routes[i + 1].from,
+                        routes[i + 1].to,
+                        routes[i + 1].stable
+                    )
+                    : _to;
+            MockSolidlyPair(pairFor(routes[i].from, routes[i].to, routes[i].stable))
+                .swap(amount0Out, amount1Out, to, new bytes(0));
+        }
+    }
+
+    function swapExactTokensForTokensSimple(
+        uint256 amountIn,
+        uint256 amountOutMin,
+        address tokenFrom,
+        address tokenTo,
+        bool stable,
+        address to,
+        uint256 deadline
+    ) external ensure(deadline) returns (uint256[] memory amounts) {
+        route[] memory routes = new route[](1);
+        routes[0] = route(tokenFrom, tokenTo, stable);
+        amounts = _swapExact(amountIn, amountOutMin, routes, to);
+    }
+
+    function swapExactTokensForTokens(
+        uint256 amountIn,
+        uint256 amountOutMin,
+        route[] calldata routes,
+        address to,
+        uint256 deadline
+    ) external ensure(deadline) returns (uint256[] memory amounts) {
+        amounts = _swapExact(amountIn, amountOutMin, routes, to);
+    }
+
+    function _swapExact(
+        uint256 amountIn,
+        uint256 amountOutMin,
+        route[] memory routes,
+        address to
+    ) internal returns (uint256[] memory amounts) {
+        amounts = getAmountsOut(amountIn, routes);
+        require(
+            amounts[amounts.length - 1] >= amountOutMin,
+            "INSUFFICIENT_OUTPUT_AMOUNT"
+        );
+        IERC20Minimal(routes[0].from).transferFrom(
+            msg.sender,
+            pairFor(routes[0].from, routes[0].to, routes[0].stable),
+            amounts[0]
+        );
+        _swap(amounts, routes, to);
+    }
+}
@@ -0,0 +1,13 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+
+// Our mock LpDepositer takes any pair, a gauge is just a flag here
+contract MockSolidlyVoter {
+    mapping(address => address) public gauges;
+
+    function createGauge(address pair) external returns (address) {
+        require(gauges[pair] == address(0), "exists");
+        gauges[pair] = address(this);
+        return address(this);
+    }
+}
@@ -0,0 +1,88 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+import "../Strategy.sol";
+
+// Runs our strategy's pure maths on whatever state we hand it, many cases per call,
+// so tests can check it against strategy_tools.model without setting up each state on chain.
+contract MockStrategyMaths is Strategy {
+    // looseBoo, looseXboo, booInXboo, xbooSupply, booWanted
+    uint256 internal constant caseFields = 5;
+    // reserveBoo, reserveXboo, lpSupply, stakedLp, looseLp, weight
+    uint256 internal constant poolFields = 6;
+    // lp for booWanted, allocation, boo to enter, xboo to leave
+    uint256 internal constant poolResults = 4;
+
+    constructor(address _vault) public Strategy(_vault, "MockStrategyMaths") {}
+
+    ///@notice Each case is caseFields words then poolFields words for each of its _poolsPerCase pools.
+    /// Each result is totalAssets, then poolResults words for each pool.
+    function evaluate(uint256[] memory _cases, uint256 _poolsPerCase)
+        external
+        pure
+        returns (uint256[] memory results)
+    {
+        uint256 caseLength = caseFields.add(poolFields.mul(_poolsPerCase));
+        uint256 resultLength = poolResults.mul(_poolsPerCase).add(1);
+        require(_cases.length % caseLength == 0, "bad cases");
+        uint256 caseCount = _cases.length / caseLength;
+
+        results = new uint256[](caseCount.mul(resultLength));
+        for (uint256 i = 0; i < caseCount; i++) {
+            _evaluateCase(
+                _cases,
+                i.mul(caseLength),
+                _poolsPerCase,
+                results,
+                i.mul(resultLength)
+            );
+        }
+    }
+
+    function _evaluateCase(
+        uint256[] memory _cases,
+        uint256 _in,
+        uint256 _poolsPerCase,
+        uint256[] memory _results,
+        uint256 _out
+    ) internal pure {
+        PositionSnapshot memory snapshot;
+        snapshot.looseBoo = _cases[_in];
+        snapshot.looseXboo = _cases[_in + 1];
+        snapshot.booInXboo = _cases[_in + 2];
+        snapshot.xbooSupply = _cases[_in + 3];
+        uint256 booWanted = _cases[_in + 4];
+
+        snapshot.pools = new PoolSnapshot[](_poolsPerCase);
+        for (uint256 j = 0; j < _poolsPerCase; j++) {
+            uint256 offset = _in + caseFields + j * poolFields;
+            PoolSnapshot memory pool = snapshot.pools[j];
+            pool.reserveBoo = _cases[offset];
+            pool.reserveXboo = _cases[offset + 1];
+            pool.lpSupply = _cases[offset + 2];
+            pool.stakedLp = _cases[offset + 3];
+            pool.looseLp = _cases[offset + 4];
+            pool.weight = _cases[offset + 5];
+        }
+
+        _valuePosition(snapshot);
+        _results[_out] = snapshot.totalAssets;
+
+        uint256[] memory allocations = _depositAllocations(snapshot);
+        for (uint256 j = 0; j < _poolsPerCase; j++) {
+            uint256 offset = _out + 1 + j * poolResults;
+            _results[offset] = _booToLpTokens(
+                booWanted,
+                snapshot,
+                snapshot.pools[j]
+            );
+            _results[offset + 1] = allocations[j];
+            (_results[offset + 2], _results[offset + 3]) = _depositSplit(
+                snapshot,
+                snapshot.pools[j],
+                allocations[j]
+            );
+        }
+    }
+}
@@ -0,0 +1,100 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+import "@openzeppelin/contracts/math/SafeMath.sol";
+import "./MockERC20Base.sol";
+
+interface IMockAsyncSwapper {
+    function swap(
+        address _receiver,
+        address _tokenIn,
+        address _tokenOut,
+        uint256 _amountIn,
+        uint256 _minAmountOut,
+        bytes calldata _data
+    ) external;
+}
+
+// Stands in for ySwaps' TradeFactory: strategies enable tokenIn -> tokenOut
+// pairs, mechanics execute trades through a swapper and the strategy has to
+// end up with at least _minAmountOut more tokenOut.
+contract MockTradeFactory {
+    using SafeMath for uint256;
+
+    struct AsyncTradeExecutionDetails {
+        address _strategy;
+        address _tokenIn;
+        address _tokenOut;
+        uint256 _amount;
+        uint256 _minAmountOut;
+    }
+
+    bytes32 public constant STRATEGY = keccak256("STRATEGY");
+    bytes32 public constant MECHANIC = keccak256("MECHANIC");
+
+    address public governance;
+    mapping(bytes32 => mapping(address => bool)) public hasRole;
+    mapping(address => mapping(address => mapping(address => bool)))
+        public enabled;
+
+    event AsyncTradeExecuted(uint256 _receivedAmount);
+
+    function initialize(address _governance) external {
+        require(governance == address(0), "initialized");
+        governance = _governance;
+        hasRole[MECHANIC][_governance] = true;
+    }
+
+    function grantRole(bytes32 _role, address _account) external {
+        require(msg.sender == governance, "NotAuthorized");
+        hasRole[_role][_account] = true;
+    }
+
+    function revokeRole(bytes32 _role, address _account) external {
+        require(msg.sender == governance, "NotAuthorized");
+        hasRole[_role][_account] = false;
+    }
+
+    function enable(address _tokenIn, address _tokenOut) external {
+        require(hasRole[STRATEGY][msg.sender], "NotAuthorized");
+        enabled[msg.sender][_tokenIn][_tokenOut] = true;
+    }
+
+    function disable(address _tokenIn, address _tokenOut) external {
+        require(hasRole[STRATEGY][msg.sender], "NotAuthorized");
+        enabled[msg.sender][_tokenIn][_tokenOut] = false;
+    }
+
+    function execute(
+        AsyncTradeExecutionDetails calldata _details,
+        address _swapper,
+        bytes calldata _data
+    ) external returns (uint256 _receivedAmount) {
+        require(hasRole[MECHANIC][msg.sender], "NotAuthorized");
+        require(
+            enabled[_details._strategy][_details._tokenIn][_details._tokenOut],
+            "IncorrectSwapInformation"
+        );
+        uint256 before =
+            MockERC20Base(_details._tokenOut).balanceOf(_details._strategy);
+        MockERC20Base(_details._tokenIn).transferFrom(
+            _details._strategy,
+            _swapper,
+            _details._amount
+        );
+        IMockAsyncSwapper(_swapper).swap(
+            _details._strategy,
+            _details._tokenIn,
+            _details._tokenOut,
+            _details._amount,
+            _details._minAmountOut,
+            _data
+        );
+        _receivedAmount = MockERC20Base(_details._tokenOut)
+            .balanceOf(_details._strategy)
+            .sub(before);
+        require(_receivedAmount >= _details._minAmountOut, "InvalidAmountOut");
+        emit AsyncTradeExecuted(_receivedAmount);
+    }
+}
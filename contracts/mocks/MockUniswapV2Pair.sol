@@ -0,0 +1,104 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+
+import "./MockSolidlyPair.sol";
+
+// A UniswapV2Pair the way SpookySwap runs it: x*y=k with a 0.2% fee
+contract MockUniswapV2Pair is MockERC20Base {
+    uint256 internal constant MINIMUM_LIQUIDITY = 10**3;
+
+    address public token0;
+    address public token1;
+    uint112 internal reserve0;
+    uint112 internal reserve1;
+    uint32 internal blockTimestampLast;
+
+    event Sync(uint112 reserve0, uint112 reserve1);
+
+    function initialize(address _token0, address _token1) external {
+        require(token0 == address(0), "initialized");
+        _initializeToken("Spooky LP", "spLP", 18);
+        token0 = _token0;
+        token1 = _token1;
+    }
+
+    function getReserves()
+        public
+        view
+        returns (
+            uint112 _reserve0,
+            uint112 _reserve1,
+            uint32 _blockTimestampLast
+        )
+    {
+        return (reserve0, reserve1, blockTimestampLast);
+    }
+
+    function _update(uint256 balance0, uint256 balance1) internal {
+        require(balance0 <= uint112(-1) && balance1 <= uint112(-1), "OVERFLOW");
+        reserve0 = uint112(balance0);
+        reserve1 = uint112(balance1);
+        blockTimestampLast = uint32(block.timestamp % 2**32);
+        emit Sync(reserve0, reserve1);
+    }
+
+    function mint(address to) external returns (uint256 liquidity) {
+        uint256 balance0 = IERC20Minimal(token0).balanceOf(address(this));
+        uint256 balance1 = IERC20Minimal(token1).balanceOf(address(this));
+        uint256 amount0 = balance0.sub(reserve0);
+        uint256 amount1 = balance1.sub(reserve1);
+        if (_totalSupply == 0) {
+            liquidity = MockMath.sqrt(amount0.mul(amount1)).sub(MINIMUM_LIQUIDITY);
+            _mint(address(0), MINIMUM_LIQUIDITY);
+        } else {
+            liquidity = Math.min(
+                amount0.mul(_totalSupply) / reserve0,
+                amount1.mul(_totalSupply) / reserve1
+            );
+        }
+        require(liquidity > 0, "UniswapV2: INSUFFICIENT_LIQUIDITY_MINTED");
+        _mint(to, liquidity);
+        _update(balance0, balance1);
+    }
+
+    function swap(
+        uint256 amount0Out,
+        uint256 amount1Out,
+        address to,
+        bytes calldata
+    ) external {
+        require(
+            amount0Out > 0 || amount1Out > 0,
+            "UniswapV2: INSUFFICIENT_OUTPUT_AMOUNT"
+        );
+        (uint112 _reserve0, uint112 _reserve1, ) = getReserves();
+        require(
+            amount0Out < _reserve0 && amount1Out < _reserve1,
+            "UniswapV2: INSUFFICIENT_LIQUIDITY"
+        );
+        if (amount0Out > 0) IERC20Minimal(token0).transfer(to, amount0Out);
+        if (amount1Out > 0) IERC20Minimal(token1).transfer(to, amount1Out);
+        uint256 balance0 = IERC20Minimal(token0).balanceOf(address(this));
+        uint256 balance1 = IERC20Minimal(token1).balanceOf(address(this));
+        uint256 amount0In =
+            balance0 > _reserve0 - amount0Out
+                ? balance0 - (_reserve0 - amount0Out)
+                : 0;
+        uint256 amount1In =
+            balance1 > _reserve1 - amount1Out
+                ? balance1 - (_reserve1 - amount1Out)
+                : 0;
+        require(
+            amount0In > 0 || amount1In > 0,
+            "UniswapV2: INSUFFICIENT_INPUT_AMOUNT"
+        );
+        uint256 balance0Adjusted = balance0.mul(1000).sub(amount0In.mul(2));
+        uint256 balance1Adjusted = balance1.mul(1000).sub(amount1In.mul(2));
+        require(
+            balance0Adjusted.mul(balance1Adjusted) >=
+                uint256(_reserve0).mul(_reserve1).mul(1000**2),
+            "UniswapV2: K"
+        );
+        _update(balance0, balance1);
+    }
+}
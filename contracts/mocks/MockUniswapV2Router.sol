@@ -0,0 +1,176 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+
+import "./MockUniswapV2Pair.sol";
+
+// UniswapV2Factory, minus fees
+contract MockUniswapV2Factory {
+    mapping(address => mapping(address => address)) public getPair;
+    address[] public allPairs;
+
+    event PairCreated(
+        address indexed token0,
+        address indexed token1,
+        address pair,
+        uint256
+    );
+
+    function allPairsLength() external view returns (uint256) {
+        return allPairs.length;
+    }
+
+    function createPair(address tokenA, address tokenB)
+        external
+        returns (address pair)
+    {
+        require(tokenA != tokenB, "UniswapV2: IDENTICAL_ADDRESSES");
+        (address token0, address token1) =
+            tokenA < tokenB ? (tokenA, tokenB) : (tokenB, tokenA);
+        require(getPair[token0][token1] == address(0), "UniswapV2: PAIR_EXISTS");
+        pair = address(new MockUniswapV2Pair());
+        MockUniswapV2Pair(pair).initialize(token0, token1);
+        getPair[token0][token1] = pair;
+        getPair[token1][token0] = pair;
+        allPairs.push(pair);
+        emit PairCreated(token0, token1, pair, allPairs.length);
+    }
+}
+
+// UniswapV2Router02's exact-in swaps and adding liquidity, SpookySwap's 0.2% fee
+contract MockUniswapV2Router {
+    using SafeMath for uint256;
+
+    MockUniswapV2Factory public factory;
+
+    modifier ensure(uint256 deadline) {
+        require(deadline >= block.timestamp, "UniswapV2Router: EXPIRED");
+        _;
+    }
+
+    function initialize(address _factory) external {
+        require(address(factory) == address(0), "initialized");
+        factory = MockUniswapV2Factory(_factory);
+    }
+
+    function getReserves(address tokenA, address tokenB)
+        public
+        view
+        returns (uint256 reserveA, uint256 reserveB)
+    {
+        MockUniswapV2Pair pair =
+            MockUniswapV2Pair(factory.getPair(tokenA, tokenB));
+        (uint256 reserve0, uint256 reserve1, ) = pair.getReserves();
+        (reserveA, reserveB) = tokenA == pair.token0()
+            ? (reserve0, reserve1)
+            : (reserve1, reserve0);
+    }
+
+    function getAmountOut(
+        uint256 amountIn,
+        uint256 reserveIn,
+        uint256 reserveOut
+    ) public pure returns (uint256) {
+        require(amountIn > 0, "UniswapV2Library: INSUFFICIENT_INPUT_AMOUNT");
+        require(
+            reserveIn > 0 && reserveOut > 0,
+            "UniswapV2Library: INSUFFICIENT_LIQUIDITY"
+        );
+        uint256 amountInWithFee = amountIn.mul(998);
+        return
+            amountInWithFee.mul(reserveOut) /
+            reserveIn.mul(1000).add(amountInWithFee);
+    }
+
+    function getAmountsOut(uint256 amountIn, address[] memory path)
+        public
+        view
+        returns (uint256[] memory amounts)
+    {
+        require(path.length >= 2, "UniswapV2Library: INVALID_PATH");
+        amounts = new uint256[](path.length);
+        amounts[0] = amountIn;
+        for (uint256 i; i < path.length - 1; i++) {
+            (uint256 reserveIn, uint256 reserveOut) =
+                getReserves(path[i], path[i + 1]);
+            amounts[i + 1] = getAmountOut(amounts[i], reserveIn, reserveOut);
+        }
+    }
+
+    function addLiquidity(
+        address tokenA,
+        address tokenB,
+        uint256 amountADesired,
+        uint256 amountBDesired,
+        uint256,
+        uint256,
+        address to,
+        uint256 deadline
+    )
+        external
+        ensure(deadline)
+        returns (
+            uint256 amountA,
+            uint256 amountB,
+            uint256 liquidity
+        )
+    {
+        if (factory.getPair(tokenA, tokenB) == address(0)) {
+            factory.createPair(tokenA, tokenB);
+        }
+        (uint256 reserveA, uint256 reserveB) = getReserves(tokenA, tokenB);
+        if (reserveA == 0 && reserveB == 0) {
+            (amountA, amountB) = (amountADesired, amountBDesired);
+        } else {
+            uint256 amountBOptimal = amountADesired.mul(reserveB) / reserveA;
+            if (amountBOptimal <= amountBDesired) {
+                (amountA, amountB) = (amountADesired, amountBOptimal);
+            } else {
+                (amountA, amountB) = (
+                    amountBDesired.mul(reserveA) / reserveB,
+                    amountBDesired
+                );
+            }
+        }
+        address pair = factory.getPair(tokenA, tokenB);
+        IERC20Minimal(tokenA).transferFrom(msg.sender, pair, amountA);
+        IERC20Minimal(tokenB).transferFrom(msg.sender, pair, amountB);
+        liquidity = MockUniswapV2Pair(pair).mint(to);
+    }
+
+    function swapExactTokensForTokens(
+        uint256 amountIn,
+        uint256 amountOutMin,
+        address[] calldata path,
+        address to,
+        uint256 deadline
+    ) external ensure(deadline) returns (uint256[] memory amounts) {
+        amounts = getAmountsOut(amountIn, path);
+        require(
+            amounts[amounts.length - 1] >= amountOutMin,
+            "UniswapV2Router: INSUFFICIENT_OUTPUT_AMOUNT"
+        );
+        IERC20Minimal(path[0]).transferFrom(
+            msg.sender,
+            factory.getPair(path[0], path[1]),
+            amounts[0]
+        );
+        for (uint256 i; i < path.length - 1; i++) {
+            (address input, address output) = (path[i], path[i + 1]);
+            uint256 amountOut = amounts[i + 1];
+            (uint256 amount0Out, uint256 amount1Out) =
+                input < output
+                    ? (uint256(0), amountOut)
+                    : (amountOut, uint256(0));
+            address _to =
+                i < path.length - 2
+                    ? factory.getPair(output, path[i + 2])
+                    : to;
+            MockUniswapV2Pair(factory.getPair(input, output)).swap(
+                amount0Out,
+                amount1Out,
+                _to,
+                new bytes(0)
+            );
+        }
+    }
+}
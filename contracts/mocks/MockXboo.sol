@@ -0,0 +1,44 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+
+import "./MockERC20.sol";
+import "./MockERC20Base.sol";
+
+// xBOO's share maths, straight from BooMirrorWorld
+contract MockXboo is MockERC20Base {
+    MockERC20 public boo;
+
+    function initialize(address _boo) external {
+        require(address(boo) == address(0), "initialized");
+        _initializeToken("Boo MirrorWorld", "xBOO", 18);
+        boo = MockERC20(_boo);
+    }
+
+    function enter(uint256 _amount) external {
+        uint256 totalBoo = boo.balanceOf(address(this));
+        uint256 totalShares = totalSupply();
+        if (totalShares == 0 || totalBoo == 0) {
+            _mint(msg.sender, _amount);
+        } else {
+            _mint(msg.sender, _amount.mul(totalShares).div(totalBoo));
+        }
+        boo.transferFrom(msg.sender, address(this), _amount);
+    }
+
+    function leave(uint256 _share) external {
+        uint256 totalShares = totalSupply();
+        uint256 what = _share.mul(boo.balanceOf(address(this))).div(
+            totalShares
+        );
+        _burn(msg.sender, _share);
+        boo.transfer(msg.sender, what);
+    }
+
+    function xBOOForBOO(uint256 _xBOOAmount) external view returns (uint256) {
+        return _xBOOAmount.mul(boo.balanceOf(address(this))).div(totalSupply());
+    }
+
+    function BOOForxBOO(uint256 _booAmount) external view returns (uint256) {
+        return _booAmount.mul(totalSupply()).div(boo.balanceOf(address(this)));
+    }
+}
@@ -0,0 +1,40 @@
+from brownie import Strategy, accounts
+from eth_utils import is_checksum_address
+import click
+
+# clones our original boo strategy for every vault in CLONES, one minimal proxy each.
+# each entry is (vault, strategy name, boo/xboo solidly pair to start in)
+
+ORIGINAL = "0x0000000000000000000000000000000000000000"  # the fully deployed strategy to clone
+
+VOLATILE_PAIR = "0x5804F6C40f44cF7593F73cf3aa16F7037213A623"
+CLONES = [
+    # ("0xVault", "boo_Xboo_veLp_Solidex", VOLATILE_PAIR),
+]
+
+
+def clone_strategies(original, clones, strategist, rewards, keeper, sender):
+    """Clone ``original`` once per (vault, name, lp token), returning the new strategies."""
+    strategies = []
+    for vault, name, lp_token in clones:
+        tx = original.cloneStrategy(vault, strategist, rewards, keeper, name, lp_token, {"from": sender})
+        strategy = Strategy.at(tx.events["Cloned"]["clone"])
+        print(f"{name}: {strategy} for {vault}, {tx.gas_used} gas")
+        strategies.append(strategy)
+    return strategies
+
+
+def main():
+
+    deployer = accounts.load(click.prompt("Account", type=click.Choice(accounts.load())))
+
+    original = Strategy.at(ORIGINAL)
+    assert original.isOriginal()
+
+    strategist = click.prompt("Strategist", default=deployer.address)
+    rewards = click.prompt("Rewards", default=strategist)
+    keeper = click.prompt("Keeper", default=strategist)
+    for address in (strategist, rewards, keeper):
+        assert is_checksum_address(address)
+
+    clone_strategies(original, CLONES, strategist, rewards, keeper, deployer)
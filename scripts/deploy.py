@@ -5,9 +5,13 @@ from eth_utils import is_checksum_address
 import click
 
 API_VERSION = config["dependencies"][0].split("@")[-1]
-Vault = project.load(
-    Path.home() / ".brownie" / "packages" / config["dependencies"][0]
-).Vault
+
+
+# loading the vaults package compiles it, only do that when we actually deploy
+def load_vault():
+    return project.load(
+        Path.home() / ".brownie" / "packages" / config["dependencies"][0]
+    ).Vault
 
 
 def get_address(msg: str, default: str = None) -> str:
@@ -35,7 +39,7 @@ def main():
     print(f"You are using: 'dev' [{dev.address}]")
 
     if input("Is there a Vault for this strategy already? y/[N]: ").lower() == "y":
-        vault = Vault.at(get_address("Deployed Vault: "))
+        vault = load_vault().at(get_address("Deployed Vault: "))
         assert vault.apiVersion() == API_VERSION
     else:
         print("You should deploy one vault using scripts from Vault project")
@@ -0,0 +1,21 @@
+import os
+
+from brownie import accounts, network, project
+
+from strategy_tools.deploy_pipeline import DeployPipeline
+
+# non-interactive rollout of every strategy in a manifest, see strategy_tools/deploy_pipeline.py.
+#   DEPLOYER_ACCOUNT=deployer DEPLOYER_PASSWORD=... brownie run deploy_manifest main manifest.yml --network ftm-main
+# rerunning with the same state file picks up where the last run stopped
+
+
+def main(manifest, state="deploy_state.json", record="deployment.json"):
+    print(f"You are using the '{network.show_active()}' network")
+    deployer = accounts.load(os.environ["DEPLOYER_ACCOUNT"], password=os.environ.get("DEPLOYER_PASSWORD"))
+
+    pipeline = DeployPipeline(project.get_loaded_projects()[0], manifest, deployer, state, record)
+    result = pipeline.run()
+
+    print(f"Deployed {len(result['strategies'])} strategies, record written to {record}")
+    for failure in result["failed"]:
+        print(f"{failure['name']} failed: {failure['errors']}")
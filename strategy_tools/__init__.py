@@ -0,0 +1 @@
+"""Off-chain tooling for the boo/xboo Solidex strategy."""
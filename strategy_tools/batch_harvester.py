@@ -0,0 +1,217 @@
+"""Harvest many strategies per transaction through our ``BatchHarvester`` contract.
+
+Each strategy's cost inside a batch is ``eth_estimateGas`` of its ``harvestTrigger`` and
+its ``harvest()``, both sent from the harvester and less their base costs, plus
+``BATCH_OVERHEAD_GAS`` for the harvester's own work. Estimating a one strategy
+``harvestBatch`` instead would come in low: the harvester catches a harvest that runs
+out of gas like any other revert, so the estimate settles on a limit where that harvest
+fails. Strategies are packed first fit decreasing into batches that stay under a gas
+budget, and each batch goes out as one transaction. The harvester has to be every
+strategy's keeper, and the account we send from one of the harvester's keepers.
+
+    KEEPER_PRIVATE_KEY=0x... python -m strategy_tools.batch_harvester \\
+        --rpc http://127.0.0.1:8545 --strategies strategies.txt \\
+        --harvester 0x... --gas-budget 8000000
+"""
+import argparse
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from strategy_tools.keeper import CALL_ERRORS, HARVEST_CALLDATA, Keeper, Sender
+from strategy_tools.rpc import RpcClient, encode_function_call
+
+logger = logging.getLogger(__name__)
+
+TX_BASE_GAS = 21_000  # paid once per transaction, which is what batching saves
+# on top of our estimate for a batch's gas limit, states move between estimate and
+# inclusion
+GAS_MARGIN = 1.2
+BATCH_OVERHEAD_GAS = (
+    10_000  # per strategy in a batch: the harvester's calls, loop and event
+)
+
+
+def harvest_batch_calldata(strategies: Sequence[str], call_cost: int) -> str:
+    return encode_function_call(
+        "harvestBatch(address[],uint256)",
+        ["address[]", "uint256"],
+        [list(strategies), call_cost],
+    )
+
+
+async def estimate_costs(
+    rpc: RpcClient,
+    harvester: str,
+    strategies: Sequence[str],
+    call_cost: int,
+    block: Any = "latest",
+    concurrency: int = 64,
+) -> Dict[str, Optional[int]]:
+    """Gas each strategy adds to a batch, ``None`` where estimating it reverted."""
+    semaphore = asyncio.Semaphore(concurrency)
+    trigger_calldata = encode_function_call(
+        "harvestTrigger(uint256)", ["uint256"], [call_cost]
+    )
+
+    async def estimate(strategy: str) -> Optional[int]:
+        # the harvester is the strategy's keeper, so it's allowed to call harvest()
+        # itself
+        calls = [
+            {"from": harvester, "to": strategy, "data": data}
+            for data in (trigger_calldata, HARVEST_CALLDATA)
+        ]
+        async with semaphore:
+            try:
+                gas = [await rpc.eth_estimate_gas(tx, block) for tx in calls]
+            except CALL_ERRORS as exc:
+                logger.warning("estimating a harvest failed for %s: %r", strategy, exc)
+                return None
+        return sum(max(g - TX_BASE_GAS, 0) for g in gas) + BATCH_OVERHEAD_GAS
+
+    results = await asyncio.gather(*(estimate(strategy) for strategy in strategies))
+    return dict(zip(strategies, results))
+
+
+def batch_gas(batch: Sequence[str], costs: Mapping[str, int]) -> int:
+    return TX_BASE_GAS + sum(costs[strategy] for strategy in batch)
+
+
+def pack_batches(costs: Mapping[str, int], gas_budget: int) -> List[List[str]]:
+    """Strategies into as few batches under ``gas_budget`` as first fit decreasing
+    finds.
+
+    A strategy that doesn't fit in a batch of its own still gets one, its harvest may
+    simply fail.
+    """
+    batches: List[List[str]] = []
+    loads: List[int] = []
+    for strategy in sorted(costs, key=lambda strategy: (-costs[strategy], strategy)):
+        cost = costs[strategy]
+        for i, load in enumerate(loads):
+            if load + cost <= gas_budget:
+                batches[i].append(strategy)
+                loads[i] += cost
+                break
+        else:
+            if TX_BASE_GAS + cost > gas_budget:
+                logger.warning(
+                    "%s needs %d gas, over our %d budget on its own",
+                    strategy,
+                    cost,
+                    gas_budget,
+                )
+            batches.append([strategy])
+            loads.append(TX_BASE_GAS + cost)
+    return batches
+
+
+@dataclass
+class BatchKeeper(Keeper):
+    """Our keeper, sending the strategies that trigger in batches through ``harvester``.
+    """
+
+    harvester: str = ""
+    gas_budget: int = 8_000_000
+
+    async def send_harvests(
+        self, triggered: Sequence[str], gas_price: int, call_cost: int
+    ) -> Tuple[Dict[str, str], Dict[str, str]]:
+        sent: Dict[str, str] = {}
+        failed: Dict[str, str] = {}
+        if not triggered:
+            return sent, failed
+
+        estimates = await estimate_costs(
+            self.rpc, self.harvester, triggered, call_cost, concurrency=self.concurrency
+        )
+        costs = {
+            strategy: cost for strategy, cost in estimates.items() if cost is not None
+        }
+        failed.update(
+            (strategy, "gas estimate reverted")
+            for strategy, cost in estimates.items()
+            if cost is None
+        )
+
+        async def send(batch: List[str]) -> None:
+            gas = int(batch_gas(batch, costs) * GAS_MARGIN)
+            try:
+                tx_hash = await self.sender.send(
+                    self.harvester,
+                    harvest_batch_calldata(batch, call_cost),
+                    gas_price,
+                    gas,
+                )
+            except CALL_ERRORS as exc:
+                failed.update((strategy, str(exc) or repr(exc)) for strategy in batch)
+                return
+            for strategy in batch:
+                sent[strategy] = tx_hash
+                self._pending[strategy] = tx_hash
+
+        await asyncio.gather(
+            *(send(batch) for batch in pack_batches(costs, self.gas_budget))
+        )
+        return sent, failed
+
+
+async def create_batch_keeper(
+    rpc: RpcClient,
+    private_key: str,
+    strategies: Sequence[str],
+    harvester: str,
+    **kwargs,
+) -> BatchKeeper:
+    chain_id = int(await rpc.request("eth_chainId"), 16)
+    sender = Sender(rpc, private_key, chain_id, kwargs.pop("gas_limit", 3_000_000))
+    return BatchKeeper(rpc, sender, strategies, harvester=harvester, **kwargs)
+
+
+async def _main(args: argparse.Namespace) -> None:
+    with open(args.strategies) as f:
+        strategies = [
+            line.strip() for line in f if line.strip() and not line.startswith("#")
+        ]
+    async with RpcClient(args.rpc, max_connections=args.concurrency) as rpc:
+        keeper = await create_batch_keeper(
+            rpc,
+            os.environ["KEEPER_PRIVATE_KEY"],
+            strategies,
+            args.harvester,
+            gas_budget=args.gas_budget,
+            concurrency=args.concurrency,
+            poll_interval=args.poll_interval,
+            harvest_gas=args.harvest_gas,
+        )
+        await keeper.run()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rpc", required=True, help="node http endpoint")
+    parser.add_argument(
+        "--strategies", required=True, help="file with one strategy address per line"
+    )
+    parser.add_argument(
+        "--harvester",
+        required=True,
+        help="our BatchHarvester, keeper of every strategy",
+    )
+    parser.add_argument(
+        "--gas-budget", type=int, default=8_000_000, help="most gas one batch may use"
+    )
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--harvest-gas", type=int, default=2_500_000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,451 @@
+"""Deploy a fleet of strategies from a manifest, pipelining every transaction.
+
+The manifest (YAML or JSON) lists the strategies to roll out::
+
+    original: "0x..."          # optional, clone this instead of deploying in full
+    defaults:                  # merged into every strategy below
+      keeper: "0x..."
+      health_check: "0x..."
+      debt_ratio: 500          # add to the vault at this ratio (sender is governance)
+      params:
+        max_report_delay: 43200
+    strategies:
+      - vault: "0x..."
+        name: boo_Xboo_veLp_Solidex
+
+Transactions go out back to back with nonces tracked locally, and we only wait for
+receipts twice: once for the deployments (we need their addresses) and once for
+everything that configures them. Every step is written to a state file as it's sent and
+settled, so rerunning after a crash or a failed step picks up where we left off without
+redeploying anything. A deployment record with every strategy's address and transactions
+is written at the end.
+
+Several steps need a role on the strategy or its vault (see ``STEP_ROLES``): most params
+take the strategist or governance, ``setHealthCheck``, ``setRealiseLosses``,
+``setBooBuffer`` and the other sell and buffer params take the vault's management or
+governance, and ``updateTradeFactory`` and ``addStrategy`` take governance. A step the
+sender can't send is recorded as failed instead of being sent to revert.
+"""
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import yaml
+from brownie import chain, web3
+from eth_abi import decode_single
+from eth_utils import keccak, to_checksum_address
+from web3.exceptions import TimeExhausted, TransactionNotFound
+
+from strategy_tools.rpc import encode_function_call
+
+VOLATILE_PAIR = "0x5804F6C40f44cF7593F73cf3aa16F7037213A623"
+DEFAULT_TRADE_FACTORY = "0xD3f89C21719Ec5961a3E6B0f9bBf9F9b4180E9e9"
+CLONED_TOPIC = "0x" + keccak(text="Cloned(address)").hex()
+
+# who may call what. BaseStrategy's onlyAuthorized is the strategist or governance,
+# onlyVaultManagers the vault's management or governance, and onlyEmergencyAuthorized
+# any of those or the guardian
+AUTHORIZED = ("strategist", "governance")
+VAULT_MANAGERS = ("management", "governance")
+EMERGENCY_AUTHORIZED = ("strategist", "governance", "management", "guardian")
+
+# manifest params and the setters they call, with the overload to use where there's more
+# than one
+PARAMS = {
+    "max_report_delay": ("setMaxReportDelay", None),
+    "min_report_delay": ("setMinReportDelay", None),
+    "profit_factor": ("setProfitFactor", None),
+    "debt_threshold": ("setDebtThreshold", None),
+    "min_harvest_credit": ("setMinHarvestCredit", None),
+    "lp_slippage": ("setLpSlippage", "uint256"),
+    "realise_losses": ("setRealiseLosses", None),
+    "do_health_check": ("setDoHealthCheck", None),
+    "reward_sell_slippage": ("setRewardSellSlippage", None),
+    "min_reward_to_sell": ("setMinRewardToSell", None),
+    "boo_buffer": ("setBooBuffer", None),
+}
+
+# the roles allowed to send each configuration step, checked before we send it
+STEP_ROLES = {
+    "setMaxReportDelay": AUTHORIZED,
+    "setMinReportDelay": AUTHORIZED,
+    "setProfitFactor": AUTHORIZED,
+    "setDebtThreshold": AUTHORIZED,
+    "setMinHarvestCredit": EMERGENCY_AUTHORIZED,
+    "setLpSlippage": EMERGENCY_AUTHORIZED,
+    "setRealiseLosses": VAULT_MANAGERS,
+    "setDoHealthCheck": VAULT_MANAGERS,
+    "setRewardSellSlippage": VAULT_MANAGERS,
+    "setMinRewardToSell": VAULT_MANAGERS,
+    "setBooBuffer": VAULT_MANAGERS,
+    "setHealthCheck": VAULT_MANAGERS,
+    "updateTradeFactory": ("governance",),
+    "setRewards": ("strategist",),
+    "setKeeper": AUTHORIZED,
+    "setStrategist": AUTHORIZED,
+    "addStrategy": ("governance",),
+}
+
+SENT, CONFIRMED, FAILED = "sent", "confirmed", "failed"
+
+
+@dataclass
+class Entry:
+    """One strategy from the manifest, defaults filled in."""
+
+    name: str
+    vault: str
+    strategist: str
+    rewards: str
+    keeper: str
+    lp_token: str = VOLATILE_PAIR
+    health_check: Optional[str] = None
+    trade_factory: Optional[str] = None
+    debt_ratio: Optional[int] = None
+    min_debt_per_harvest: int = 0
+    max_debt_per_harvest: int = 2 ** 256 - 1
+    performance_fee: int = 1_000
+    params: Optional[Dict[str, Any]] = None
+
+
+def load_manifest(path: str, sender: str) -> Tuple[Optional[str], List[Entry]]:
+    """``(original to clone or None, entries)`` from a YAML or JSON manifest."""
+    with open(path) as f:
+        manifest = json.load(f) if str(path).endswith(".json") else yaml.safe_load(f)
+    defaults = manifest.get("defaults", {})
+    entries = []
+    for item in manifest["strategies"]:
+        fields = {**defaults, **item}
+        fields["params"] = {**defaults.get("params", {}), **item.get("params", {})}
+        unknown = set(fields["params"]) - set(PARAMS)
+        if unknown:
+            raise ValueError(f"{fields['name']}: unknown params {sorted(unknown)}")
+        fields.setdefault("strategist", sender)
+        fields.setdefault("rewards", fields["strategist"])
+        fields.setdefault("keeper", fields["strategist"])
+        entries.append(Entry(**fields))
+    names = [entry.name for entry in entries]
+    if len(set(names)) != len(names):
+        raise ValueError("strategy names must be unique, they key our state file")
+    return manifest.get("original"), entries
+
+
+class DeployPipeline:
+    """Sends, tracks and resumes every transaction of a rollout from one account."""
+
+    def __init__(
+        self,
+        project: Any,
+        manifest: str,
+        sender: Any,
+        state_path: str,
+        record_path: str,
+        timeout: int = 600,
+    ):
+        self.project = project
+        self.sender = sender
+        self.original, self.entries = load_manifest(manifest, sender.address)
+        self.state_path = Path(state_path)
+        self.record_path = Path(record_path)
+        self.timeout = timeout
+        self.state = (
+            json.loads(self.state_path.read_text()) if self.state_path.exists() else {}
+        )
+        self.state.setdefault("sender", sender.address)
+        self.state.setdefault("strategies", {})
+        if self.state["sender"] != sender.address:
+            raise ValueError(
+                f"state file was written by {self.state['sender']}, "
+                f"not {sender.address}"
+            )
+        self._nonce: Optional[int] = None
+
+    # ---------- state ----------
+
+    def _save(self) -> None:
+        tmp = self.state_path.with_suffix(self.state_path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.state, indent=2, sort_keys=True))
+        os.replace(tmp, self.state_path)
+
+    def _strategy(self, name: str) -> Dict[str, Any]:
+        return self.state["strategies"].setdefault(name, {"address": None, "steps": {}})
+
+    def _next_nonce(self) -> int:
+        if self._nonce is None:
+            self._nonce = web3.eth.get_transaction_count(self.sender.address, "pending")
+        nonce = self._nonce
+        self._nonce += 1
+        return nonce
+
+    # ---------- steps ----------
+
+    def _deploy(self, entry: Entry, nonce: int) -> str:
+        tx = {"from": self.sender, "nonce": nonce, "required_confs": 0, "silent": True}
+        if self.original:
+            original = self.project.Strategy.at(self.original)
+            data = original.cloneStrategy.encode_input(
+                entry.vault,
+                entry.strategist,
+                entry.rewards,
+                entry.keeper,
+                entry.name,
+                entry.lp_token,
+            )
+            return self.sender.transfer(original, 0, data=data, **_kwargs(tx)).txid
+        return self.project.Strategy.deploy(entry.vault, entry.name, tx).txid
+
+    def _configure_steps(self, entry: Entry) -> List[Tuple[str, str, str]]:
+        """``(step, target, calldata)`` for everything after deploying, in the order
+        they must run.
+        """
+        strategy = self.project.Strategy.at(self._strategy(entry.name)["address"])
+        steps = []
+        for name, value in (entry.params or {}).items():
+            (setter, overload) = PARAMS[name]
+            method = getattr(strategy, setter)
+            method = method[overload] if overload else method
+            steps.append((setter, strategy.address, method.encode_input(value)))
+        if entry.health_check:
+            steps.append(
+                (
+                    "setHealthCheck",
+                    strategy.address,
+                    strategy.setHealthCheck.encode_input(entry.health_check),
+                )
+            )
+        if (
+            entry.trade_factory
+            and to_checksum_address(entry.trade_factory) != DEFAULT_TRADE_FACTORY
+        ):
+            steps.append(
+                (
+                    "updateTradeFactory",
+                    strategy.address,
+                    strategy.updateTradeFactory.encode_input(entry.trade_factory),
+                )
+            )
+        if not self.original:
+            # clones get these at initialization, full deployments start out with us in
+            # every role
+            if entry.rewards != self.sender.address:
+                steps.append(
+                    (
+                        "setRewards",
+                        strategy.address,
+                        strategy.setRewards.encode_input(entry.rewards),
+                    )
+                )
+            if entry.keeper != self.sender.address:
+                steps.append(
+                    (
+                        "setKeeper",
+                        strategy.address,
+                        strategy.setKeeper.encode_input(entry.keeper),
+                    )
+                )
+            if entry.strategist != self.sender.address:
+                steps.append(
+                    (
+                        "setStrategist",
+                        strategy.address,
+                        strategy.setStrategist.encode_input(entry.strategist),
+                    )
+                )
+        if entry.debt_ratio is not None:
+            data = encode_function_call(
+                "addStrategy(address,uint256,uint256,uint256,uint256)",
+                ["address", "uint256", "uint256", "uint256", "uint256"],
+                [
+                    strategy.address,
+                    entry.debt_ratio,
+                    entry.min_debt_per_harvest,
+                    entry.max_debt_per_harvest,
+                    entry.performance_fee,
+                ],
+            )
+            steps.append(("addStrategy", entry.vault, data))
+        return steps
+
+    def _send(self, step: Dict[str, Any], send) -> None:
+        """Send one step with the next nonce, recording it as failed if the node won't
+        take it.
+        """
+        nonce = self._next_nonce()
+        try:
+            step.update(txid=send(nonce), nonce=nonce, status=SENT, error=None)
+        except Exception as e:
+            # nothing went out with this nonce, so start again from what the node has
+            self._nonce = None
+            step.update(txid=None, nonce=None, status=FAILED, error=str(e))
+        self._save()
+
+    def _settle(self, step: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Wait for a sent step and record how it went, returning its receipt if it was
+        mined.
+        """
+        try:
+            web3.eth.get_transaction(step["txid"])
+        except TransactionNotFound:
+            # the node lost it, so it's safe to send again. its nonce is free again too
+            # and anything we send after it would wait on that gap, so start again from
+            # what the node has
+            self._nonce = None
+            step.update(status=FAILED, error="dropped")
+            self._save()
+            return None
+        try:
+            receipt = web3.eth.wait_for_transaction_receipt(
+                step["txid"], timeout=self.timeout
+            )
+        except TimeExhausted:
+            # still pending, leave it for the next run
+            return None
+        if receipt["status"] == 1:
+            step.update(
+                status=CONFIRMED,
+                block=receipt["blockNumber"],
+                gas_used=receipt["gasUsed"],
+                error=None,
+            )
+        else:
+            step.update(status=FAILED, error="reverted")
+        self._save()
+        return receipt
+
+    def _pending(self, step: Dict[str, Any]) -> bool:
+        return step.get("status") != CONFIRMED
+
+    # ---------- phases ----------
+
+    def deploy(self) -> None:
+        """Send every deployment that hasn't confirmed yet, then wait for all of them.
+        """
+        for entry in self.entries:
+            step = self._strategy(entry.name)["steps"].setdefault("deploy", {})
+            if step.get("status") == SENT:
+                self._settle_deploy(entry)
+            if self._pending(step) and step.get("status") != SENT:
+                self._send(step, lambda nonce, entry=entry: self._deploy(entry, nonce))
+
+        for entry in self.entries:
+            if self._strategy(entry.name)["steps"]["deploy"].get("status") == SENT:
+                self._settle_deploy(entry)
+
+    def _settle_deploy(self, entry: Entry) -> None:
+        strategy = self._strategy(entry.name)
+        receipt = self._settle(strategy["steps"]["deploy"])
+        if receipt is not None and receipt["status"] == 1:
+            strategy["address"] = self._deployed_address(receipt)
+            self._save()
+
+    def _deployed_address(self, receipt: Any) -> str:
+        if not self.original:
+            return receipt["contractAddress"]
+        for log in receipt["logs"]:
+            if (
+                log["address"] == to_checksum_address(self.original)
+                and log["topics"][0].hex() == CLONED_TOPIC
+            ):
+                return to_checksum_address(log["topics"][1][-20:])
+        raise ValueError(f"no Cloned event in {receipt['transactionHash'].hex()}")
+
+    def configure(self) -> None:
+        """Send every configuration step of every deployed strategy, then wait for all
+        of them.
+        """
+        sent = []
+        for entry in self.entries:
+            strategy = self._strategy(entry.name)
+            if strategy["address"] is None:
+                continue
+            roles = self._sender_roles(entry)
+            for name, target, data in self._configure_steps(entry):
+                step = strategy["steps"].setdefault(name, {})
+                if step.get("status") == SENT:
+                    self._settle(step)
+                if not self._pending(step) or step.get("status") == SENT:
+                    continue
+                if not roles & set(STEP_ROLES[name]):
+                    # it would only revert, and cost us the gas
+                    needed = " or ".join(STEP_ROLES[name])
+                    step.update(status=FAILED, error=f"sender isn't {needed}")
+                    self._save()
+                    continue
+                self._send(
+                    step,
+                    lambda nonce, target=target, data=data: self._call(
+                        target, data, nonce
+                    ),
+                )
+                sent.append(step)
+        for step in sent:
+            if step["status"] == SENT:
+                self._settle(step)
+
+    def _sender_roles(self, entry: Entry) -> Set[str]:
+        """The roles we hold on ``entry``'s strategy and vault, as of now."""
+        strategy = self.project.Strategy.at(self._strategy(entry.name)["address"])
+        holders = {"strategist": strategy.strategist()}
+        for role in ("governance", "management", "guardian"):
+            result = web3.eth.call(
+                {"to": entry.vault, "data": encode_function_call(f"{role}()")}
+            )
+            holders[role] = to_checksum_address(decode_single("address", result))
+        return {
+            role for role, holder in holders.items() if holder == self.sender.address
+        }
+
+    def _call(self, target: str, data: str, nonce: int) -> str:
+        tx = {"nonce": nonce, "required_confs": 0, "silent": True}
+        return self.sender.transfer(target, 0, data=data, **tx).txid
+
+    def run(self) -> Dict[str, Any]:
+        """Deploy, configure and write the deployment record, returning it."""
+        self.deploy()
+        self.configure()
+        return self.write_record()
+
+    def write_record(self) -> Dict[str, Any]:
+        strategies, failed = [], []
+        for entry in self.entries:
+            strategy = self._strategy(entry.name)
+            steps = strategy["steps"]
+            done = strategy["address"] is not None and all(
+                s.get("status") == CONFIRMED for s in steps.values()
+            )
+            record = {
+                "name": entry.name,
+                "vault": entry.vault,
+                "strategy": strategy["address"],
+                "transactions": {
+                    name: step.get("txid") for name, step in steps.items()
+                },
+                "gas_used": sum(step.get("gas_used", 0) for step in steps.values()),
+            }
+            if done:
+                strategies.append(record)
+            else:
+                record["errors"] = {
+                    name: step.get("error")
+                    for name, step in steps.items()
+                    if step.get("status") != CONFIRMED
+                }
+                failed.append(record)
+        record = {
+            "chain_id": chain.id,
+            "sender": self.sender.address,
+            "original": self.original,
+            "written_at": datetime.now(timezone.utc).isoformat(),
+            "complete": not failed,
+            "strategies": strategies,
+            "failed": failed,
+        }
+        self.record_path.write_text(json.dumps(record, indent=2))
+        return record
+
+
+def _kwargs(tx: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in tx.items() if key != "from"}
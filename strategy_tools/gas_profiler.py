@@ -0,0 +1,187 @@
+"""Gas profiler for our transactions, built on brownie's call traces.
+
+Every opcode in a trace is charged to the stack of functions it ran under:
+external calls (``Vault.report``, ``MockLpDepositer.getReward``...) and the
+internal functions brownie's source maps resolve inside them
+(``Strategy._depositToPool``...). A call opcode is charged only its own
+overhead, what its callee spent is charged to the callee. From that we get
+exclusive and inclusive gas per function, a table, and folded stacks that
+flamegraph.pl, inferno or speedscope read directly.
+
+    python -m strategy_tools.gas_profiler 0xTxHash --network development \\
+        --folded harvest.folded
+
+In a brownie session, ``profile_transaction(tx).table()``. Running the gas
+benchmarks with ``GAS_PROFILE_DIR=profiles`` writes one profile per benchmark.
+"""
+import argparse
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+CALL_OPS = frozenset(("CALL", "CALLCODE", "DELEGATECALL", "STATICCALL", "CREATE", "CREATE2"))
+OVERHEAD = "[intrinsic and refunds]"  # what the trace doesn't show: 21k + calldata, less refunds
+
+Stack = Tuple[str, ...]
+
+
+class Step(NamedTuple):
+    """The parts of one trace step we need."""
+
+    depth: int  # call depth
+    jump_depth: int  # internal function depth within the call
+    fn: str  # "Contract.function" this step is running
+    op: str
+    gas: int  # gas left before this step
+    gas_cost: int
+
+
+class Row(NamedTuple):
+    name: str
+    calls: int
+    inclusive: int
+    exclusive: int
+
+
+def steps_from_trace(trace: Iterable[Dict[str, Any]]) -> List[Step]:
+    """Steps from brownie's ``TransactionReceipt.trace``."""
+    return [
+        Step(step["depth"], step.get("jumpDepth", 0), step["fn"], step["op"], step["gas"], step["gasCost"])
+        for step in trace
+    ]
+
+
+def step_costs(steps: Sequence[Step]) -> List[int]:
+    """Gas each step spent itself. Call opcodes get what they cost beyond their callee."""
+    costs = [0] * len(steps)
+    pending = []  # (call step, its depth, gas charged before it entered)
+    charged = 0
+    for i, step in enumerate(steps):
+        # back in a frame that made a call, so we know what the call cost
+        while pending and step.depth <= pending[-1][1]:
+            call, _, before = pending.pop()
+            costs[call] = steps[call].gas - step.gas - (charged - before)
+            charged += costs[call]
+        if step.op in CALL_OPS and i + 1 < len(steps) and steps[i + 1].depth > step.depth:
+            pending.append((i, step.depth, charged))
+            continue
+        costs[i] = step.gas_cost
+        charged += costs[i]
+    # a call that never came back (the whole transaction reverted inside it) is charged its opcode cost
+    for call, _, _ in pending:
+        costs[call] = steps[call].gas_cost
+    return costs
+
+
+def fold(steps: Sequence[Step]) -> Tuple[Dict[Stack, int], Counter]:
+    """Exclusive gas per stack of functions, and how often each function was entered."""
+    costs = step_costs(steps)
+    folded: Dict[Stack, int] = defaultdict(int)
+    calls: Counter = Counter()
+    frames: List[Tuple[int, int, str]] = []  # (depth, jump depth, function)
+    for step, cost in zip(steps, costs):
+        level = (step.depth, step.jump_depth)
+        while frames and frames[-1][:2] > level:
+            frames.pop()
+        if frames and frames[-1][:2] == level and frames[-1][2] != step.fn:
+            frames.pop()
+        if not frames or frames[-1][:2] < level:
+            frames.append((step.depth, step.jump_depth, step.fn))
+            calls[step.fn] += 1
+        folded[tuple(frame[2] for frame in frames)] += cost
+    return dict(folded), calls
+
+
+@dataclass
+class GasProfile:
+    """Where a transaction's gas went."""
+
+    stacks: Dict[Stack, int]
+    calls: Counter = field(default_factory=Counter)
+    gas_used: int = 0  # from the receipt, 0 if unknown
+
+    @classmethod
+    def from_steps(cls, steps: Sequence[Step], gas_used: int = 0) -> "GasProfile":
+        stacks, calls = fold(steps)
+        return cls(stacks, calls, gas_used)
+
+    @property
+    def traced(self) -> int:
+        return sum(self.stacks.values())
+
+    @property
+    def overhead(self) -> int:
+        """Receipt gas the trace doesn't account for, negative when refunds outweigh intrinsic gas."""
+        return self.gas_used - self.traced if self.gas_used else 0
+
+    def rows(self) -> List[Row]:
+        """Calls, inclusive and exclusive gas per function, most expensive first."""
+        inclusive: Dict[str, int] = defaultdict(int)
+        exclusive: Dict[str, int] = defaultdict(int)
+        for stack, gas in self.stacks.items():
+            exclusive[stack[-1]] += gas
+            for name in set(stack):  # recursion is only counted once
+                inclusive[name] += gas
+        rows = [Row(name, self.calls[name], inclusive[name], exclusive[name]) for name in inclusive]
+        return sorted(rows, key=lambda row: (-row.inclusive, row.name))
+
+    def folded(self) -> str:
+        """One ``frame;frame;frame gas`` line per stack, for flame graph tools."""
+        lines = [f"{';'.join(stack)} {gas}" for stack, gas in sorted(self.stacks.items()) if gas > 0]
+        if self.overhead > 0:
+            lines.append(f"{OVERHEAD} {self.overhead}")
+        return "\n".join(lines) + "\n"
+
+    def table(self, limit: int = 0) -> str:
+        total = self.gas_used or self.traced
+        rows = self.rows()[: limit or None]
+        width = max([len(row.name) for row in rows] + [len(OVERHEAD), 8])
+        lines = [f"{'function':<{width}} {'calls':>6} {'inclusive':>10} {'incl %':>7} {'exclusive':>10} {'excl %':>7}"]
+        for row in rows:
+            lines.append(
+                f"{row.name:<{width}} {row.calls:>6} {row.inclusive:>10} {row.inclusive / total:>7.1%} "
+                f"{row.exclusive:>10} {row.exclusive / total:>7.1%}"
+            )
+        if self.gas_used:
+            lines.append(f"{OVERHEAD:<{width}} {'':>6} {'':>10} {'':>7} {self.overhead:>10} {self.overhead / total:>7.1%}")
+            lines.append(f"{'total':<{width}} {'':>6} {self.gas_used:>10}")
+        return "\n".join(lines)
+
+    def write(self, path: Path) -> None:
+        """``path.folded`` and ``path.txt``."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.with_suffix(".folded").write_text(self.folded())
+        path.with_suffix(".txt").write_text(self.table() + "\n")
+
+
+def profile_transaction(tx: Any) -> GasProfile:
+    """Profile a brownie ``TransactionReceipt``. Needs a node with ``debug_traceTransaction``."""
+    return GasProfile.from_steps(steps_from_trace(tx.trace), tx.gas_used)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("tx", nargs="+", help="transaction hashes to profile")
+    parser.add_argument("--network", default="development", help="brownie network, a local chain that can trace")
+    parser.add_argument("--folded", help="write folded stacks here, one file per transaction if several")
+    parser.add_argument("--limit", type=int, default=0, help="only show the most expensive functions")
+    args = parser.parse_args()
+
+    from brownie import chain, network, project
+
+    project.load()
+    network.connect(args.network)
+    for tx_hash in args.tx:
+        profile = profile_transaction(chain.get_transaction(tx_hash))
+        print(f"{tx_hash}\n{profile.table(args.limit)}\n")
+        if args.folded:
+            path = Path(args.folded)
+            if len(args.tx) > 1:
+                path = path.with_name(f"{path.stem}_{tx_hash[:10]}{path.suffix}")
+            path.write_text(profile.folded())
+
+
+if __name__ == "__main__":
+    main()
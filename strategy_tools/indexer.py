@@ -0,0 +1,384 @@
+"""Incremental indexer for our strategy and vault logs into SQLite.
+
+Logs are fetched with ``eth_getLogs`` in block ranges that adapt to the node:
+a range that comes back with too many results is halved and retried, and the
+range doubles again after every success. Each range is decoded with the
+Strategy and Vault ABIs and written in the same transaction as the checkpoint,
+so a rerun (or a crash) picks up right after the last range written.
+
+    python -m strategy_tools.indexer --rpc http://127.0.0.1:8545 --db logs.db \\
+        --address 0xStrategy --address 0xVault --start-block 30000000
+
+Reading it back:
+
+    >>> store = LogStore("logs.db")
+    >>> store.events("Harvested", address=strategy)
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from eth_abi import decode_abi, decode_single
+from eth_utils import event_abi_to_log_topic, to_checksum_address
+
+from strategy_tools.rpc import RpcClient, RpcError
+
+logger = logging.getLogger(__name__)
+
+# what providers say when a range has too many logs in it
+TOO_MANY_RESULTS = (
+    "too many results",
+    "query returned more than",
+    "response size exceeded",
+    "log response size",
+    "limit exceeded",
+    "block range is too wide",
+)
+DEFAULT_ABIS = (
+    "build/contracts/Strategy.json",
+    "build/contracts/dependencies/yearn/yearn-vaults@0.4.2-1/Vault.json",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    transaction_hash TEXT NOT NULL,
+    address TEXT NOT NULL,
+    event TEXT NOT NULL,
+    args TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS logs_event ON logs (event, block_number);
+CREATE INDEX IF NOT EXISTS logs_address_event ON logs (address, event, block_number);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    name TEXT PRIMARY KEY,
+    block INTEGER NOT NULL
+);
+"""
+
+
+class TooManyResults(Exception):
+    """A range holds more logs than the node (or our own limit) will return."""
+
+
+@dataclass
+class IndexReport:
+    """One indexing run."""
+
+    from_block: int
+    to_block: int
+    logs: int  # logs written
+    skipped: int  # logs with no event in our ABIs
+    requests: int  # eth_getLogs calls, halved retries included
+    halvings: int
+    elapsed: float
+
+    @property
+    def logs_per_second(self) -> float:
+        return self.logs / self.elapsed if self.elapsed else 0.0
+
+
+def _abi_type(item: Dict[str, Any]) -> str:
+    if item["type"].startswith("tuple"):
+        return (
+            "("
+            + ",".join(_abi_type(c) for c in item["components"])
+            + ")"
+            + item["type"][len("tuple") :]
+        )
+    return item["type"]
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return "0x" + value.hex()
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    return value
+
+
+class EventDecoder:
+    """Decodes raw logs for every event in a set of ABIs, keyed by topic0."""
+
+    def __init__(self, abis: Sequence[Sequence[Dict[str, Any]]]):
+        self.events: Dict[str, Dict[str, Any]] = {}
+        for abi in abis:
+            for item in abi:
+                if item["type"] == "event" and not item.get("anonymous"):
+                    topic = "0x" + event_abi_to_log_topic(item).hex()
+                    self.events.setdefault(topic, item)
+
+    @property
+    def topics(self) -> List[str]:
+        return list(self.events)
+
+    def decode(self, log: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """``(event name, args)`` for a raw ``eth_getLogs`` entry, ``None`` if it isn't
+        one of ours.
+        """
+        if not log["topics"] or log["topics"][0] not in self.events:
+            return None
+        event = self.events[log["topics"][0]]
+        indexed = [i for i in event["inputs"] if i["indexed"]]
+        plain = [i for i in event["inputs"] if not i["indexed"]]
+        args = {}
+        for item, topic in zip(indexed, log["topics"][1:]):
+            topic = bytes.fromhex(topic[2:])
+            kind = _abi_type(item)
+            # dynamic indexed values only leave their hash behind
+            dynamic = (
+                kind in ("string", "bytes")
+                or kind.endswith("]")
+                or kind.startswith("(")
+            )
+            args[item["name"]] = topic if dynamic else decode_single(kind, topic)
+        values = decode_abi(
+            [_abi_type(i) for i in plain], bytes.fromhex(log["data"][2:])
+        )
+        args.update(zip((i["name"] for i in plain), values))
+        for item in event["inputs"]:
+            if item["type"] == "address" and isinstance(args[item["name"]], str):
+                args[item["name"]] = to_checksum_address(args[item["name"]])
+        return event["name"], {name: _jsonable(value) for name, value in args.items()}
+
+
+def load_abi(path: str) -> List[Dict[str, Any]]:
+    """An ABI from a plain ABI json or a brownie build artifact."""
+    with open(path) as f:
+        data = json.load(f)
+    return data["abi"] if isinstance(data, dict) else data
+
+
+class LogStore:
+    """Decoded logs and checkpoints in SQLite."""
+
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def checkpoint(self, name: str) -> Optional[int]:
+        row = self.connection.execute(
+            "SELECT block FROM checkpoints WHERE name = ?", (name,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def write(
+        self, name: str, rows: Sequence[Tuple[int, int, str, str, str, str]], block: int
+    ) -> None:
+        """Write a range's logs and move the checkpoint to its last block, all or
+        nothing.
+        """
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO logs VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            self.connection.execute(
+                "INSERT INTO checkpoints VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET block = excluded.block",
+                (name, block),
+            )
+
+    def events(
+        self,
+        event: Optional[str] = None,
+        address: Optional[str] = None,
+        from_block: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """Decoded logs in chain order, optionally for one event and/or one contract."""
+        query = (
+            "SELECT block_number, log_index, transaction_hash, address, event, args "
+            "FROM logs WHERE block_number >= ?"
+        )
+        params: List[Any] = [from_block]
+        if event is not None:
+            query += " AND event = ?"
+            params.append(event)
+        if address is not None:
+            query += " AND address = ?"
+            params.append(to_checksum_address(address))
+        query += " ORDER BY block_number, log_index"
+        return [
+            {
+                "block_number": block,
+                "log_index": index,
+                "transaction_hash": tx,
+                "address": contract,
+                "event": name,
+                "args": json.loads(args),
+            }
+            for block, index, tx, contract, name, args in self.connection.execute(
+                query, params
+            )
+        ]
+
+    def count(self, event: Optional[str] = None) -> int:
+        if event is None:
+            return self.connection.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM logs WHERE event = ?", (event,)
+        ).fetchone()[0]
+
+
+@dataclass
+class Indexer:
+    """Indexes ``addresses`` (every contract if empty) from ``start_block`` on, resuming
+    from the checkpoint.
+    """
+
+    rpc: RpcClient
+    store: LogStore
+    decoder: EventDecoder
+    addresses: Sequence[str] = ()
+    name: str = "default"
+    start_block: int = 0
+    chunk_size: int = 2_000
+    max_chunk_size: int = 100_000
+    # treat bigger responses as too many, like a provider limit would
+    max_logs: Optional[int] = None
+    confirmations: int = 0  # stay this far behind the head, out of reach of reorgs
+
+    async def _get_logs(self, from_block: int, to_block: int) -> List[Dict[str, Any]]:
+        params: Dict[str, Any] = {
+            "fromBlock": hex(from_block),
+            "toBlock": hex(to_block),
+            "topics": [self.decoder.topics],
+        }
+        if self.addresses:
+            params["address"] = [
+                to_checksum_address(address) for address in self.addresses
+            ]
+        try:
+            logs = await self.rpc.request("eth_getLogs", [params])
+        except RpcError as e:
+            if any(marker in str(e).lower() for marker in TOO_MANY_RESULTS):
+                raise TooManyResults(str(e)) from e
+            raise
+        if self.max_logs is not None and len(logs) > self.max_logs:
+            raise TooManyResults(f"{len(logs)} logs in {from_block}-{to_block}")
+        return logs
+
+    def _rows(
+        self, logs: Sequence[Dict[str, Any]]
+    ) -> Tuple[List[Tuple[int, int, str, str, str, str]], int]:
+        rows, skipped = [], 0
+        for log in logs:
+            decoded = self.decoder.decode(log)
+            if decoded is None:
+                skipped += 1
+                continue
+            (event, args) = decoded
+            rows.append(
+                (
+                    int(log["blockNumber"], 16),
+                    int(log["logIndex"], 16),
+                    log["transactionHash"],
+                    to_checksum_address(log["address"]),
+                    event,
+                    json.dumps(args),
+                )
+            )
+        return rows, skipped
+
+    async def run(self, to_block: Optional[int] = None) -> IndexReport:
+        """Index everything from the checkpoint up to ``to_block`` (the head less
+        confirmations by default).
+        """
+        start = time.perf_counter()
+        requests = self.rpc.calls
+        if to_block is None:
+            to_block = await self.rpc.block_number() - self.confirmations
+        checkpoint = self.store.checkpoint(self.name)
+        from_block = self.start_block if checkpoint is None else checkpoint + 1
+        report = IndexReport(from_block, to_block, 0, 0, 0, 0, 0.0)
+
+        block = from_block
+        chunk = self.chunk_size
+        while block <= to_block:
+            end = min(block + chunk - 1, to_block)
+            try:
+                logs = await self._get_logs(block, end)
+            except TooManyResults:
+                if end == block:
+                    raise
+                chunk = max((end - block + 1) // 2, 1)
+                report.halvings += 1
+                continue
+            rows, skipped = self._rows(logs)
+            self.store.write(self.name, rows, end)
+            report.logs += len(rows)
+            report.skipped += skipped
+            logger.debug("blocks %d-%d: %d logs", block, end, len(rows))
+            block = end + 1
+            chunk = min(chunk * 2, self.max_chunk_size)
+
+        report.requests = self.rpc.calls - requests
+        report.elapsed = time.perf_counter() - start
+        return report
+
+
+async def _main(args: argparse.Namespace) -> None:
+    decoder = EventDecoder([load_abi(path) for path in args.abi or DEFAULT_ABIS])
+    store = LogStore(args.db)
+    async with RpcClient(args.rpc) as rpc:
+        indexer = Indexer(
+            rpc,
+            store,
+            decoder,
+            args.address,
+            args.name,
+            args.start_block,
+            args.chunk_size,
+            confirmations=args.confirmations,
+        )
+        report = await indexer.run()
+    store.close()
+    logger.info(
+        "blocks %d-%d: %d logs in %d requests (%d halvings), %.0f logs/s",
+        report.from_block,
+        report.to_block,
+        report.logs,
+        report.requests,
+        report.halvings,
+        report.logs_per_second,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rpc", required=True, help="node http endpoint")
+    parser.add_argument("--db", default="logs.db", help="sqlite file to write to")
+    parser.add_argument(
+        "--address",
+        action="append",
+        default=[],
+        help="contract to index, repeat for more",
+    )
+    parser.add_argument(
+        "--abi",
+        action="append",
+        help=f"abi or brownie artifact, default {', '.join(DEFAULT_ABIS)}",
+    )
+    parser.add_argument(
+        "--name", default="default", help="checkpoint name, one per set of addresses"
+    )
+    parser.add_argument("--start-block", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=2_000)
+    parser.add_argument("--confirmations", type=int, default=5)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
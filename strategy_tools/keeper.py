@@ -0,0 +1,298 @@
+"""Asyncio keeper that harvests a fleet of strategies when ``harvestTrigger`` says so.
+
+Every new block we evaluate ``harvestTrigger(callCost)`` for all strategies
+concurrently (pinned to that block, bounded by a semaphore, over one pooled
+connection) and send ``harvest()`` for the ones that fire through a local
+nonce manager, so sends never wait on each other.
+
+    KEEPER_PRIVATE_KEY=0x... python -m strategy_tools.keeper \\
+        --rpc http://127.0.0.1:8545 --strategies strategies.txt
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+from eth_account import Account
+
+from strategy_tools.rpc import RpcClient, RpcError, decode_result, encode_function_call
+
+logger = logging.getLogger(__name__)
+
+HARVEST_CALLDATA = encode_function_call("harvest()")
+
+# what one strategy's call or send can fail with, none of them should take the rest of
+# the fleet down
+CALL_ERRORS = (RpcError, aiohttp.ClientError, asyncio.TimeoutError)
+
+
+@dataclass
+class CycleReport:
+    """What happened while evaluating one block."""
+
+    block: int
+    strategies: int
+    triggered: List[str]
+    sent: Dict[str, str]
+    failed: Dict[str, str]
+    trigger_latency: float  # seconds to evaluate every harvestTrigger
+    rpc_calls: int  # requests made during the cycle
+
+
+class NonceManager:
+    """Hands out sequential nonces locally, re-syncing with the node after a failure."""
+
+    def __init__(self, rpc: RpcClient, address: str):
+        self.rpc = rpc
+        self.address = address
+        self._next: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    async def next(self) -> int:
+        async with self._lock:
+            if self._next is None:
+                self._next = int(
+                    await self.rpc.request(
+                        "eth_getTransactionCount", [self.address, "pending"]
+                    ),
+                    16,
+                )
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+    async def reset(self) -> None:
+        async with self._lock:
+            self._next = None
+
+
+class Sender:
+    """Signs and sends transactions from one account."""
+
+    def __init__(self, rpc: RpcClient, private_key: str, chain_id: int, gas_limit: int):
+        self.rpc = rpc
+        self.account = Account.from_key(private_key)
+        self.chain_id = chain_id
+        self.gas_limit = gas_limit
+        self.nonces = NonceManager(rpc, self.account.address)
+
+    async def send(
+        self, to: str, data: str, gas_price: int, gas: Optional[int] = None
+    ) -> str:
+        tx = {
+            "to": to,
+            "data": data,
+            "value": 0,
+            "gas": gas or self.gas_limit,
+            "gasPrice": gas_price,
+            "nonce": await self.nonces.next(),
+            "chainId": self.chain_id,
+        }
+        signed = self.account.sign_transaction(tx)
+        try:
+            return await self.rpc.request(
+                "eth_sendRawTransaction", [signed.rawTransaction.hex()]
+            )
+        except CALL_ERRORS:
+            # the nonce we used may or may not have been consumed, ask the node again
+            await self.nonces.reset()
+            raise
+
+
+@dataclass
+class Keeper:
+    rpc: RpcClient
+    sender: Sender
+    strategies: Sequence[str]
+    harvest_gas: int = 2_500_000  # gas we expect a harvest to cost, used for callCost
+    concurrency: int = 64
+    poll_interval: float = 1.0
+    on_cycle: Optional[Callable[[CycleReport], None]] = None
+    # blocks we wait on a sent harvest before we give up on it and may send another
+    pending_blocks: int = 50
+    _pending: Dict[str, str] = field(default_factory=dict)
+    _pending_since: Dict[str, int] = field(default_factory=dict)
+
+    async def evaluate(self, block: int, call_cost: int) -> Dict[str, bool]:
+        """``harvestTrigger(call_cost)`` for every strategy at ``block``."""
+        calldata = encode_function_call(
+            "harvestTrigger(uint256)", ["uint256"], [call_cost]
+        )
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def trigger(strategy: str) -> bool:
+            async with semaphore:
+                try:
+                    (result,) = decode_result(
+                        ["bool"], await self.rpc.eth_call(strategy, calldata, block)
+                    )
+                except CALL_ERRORS as exc:
+                    logger.warning("harvestTrigger failed for %s: %r", strategy, exc)
+                    return False
+                return result
+
+        results = await asyncio.gather(
+            *(trigger(strategy) for strategy in self.strategies)
+        )
+        return dict(zip(self.strategies, results))
+
+    async def _clear_mined(self, block: int) -> None:
+        # a harvest still in the mempool would make its trigger fire again, so don't
+        # resend until it's mined, unless the node dropped it or it has been stuck for
+        # pending_blocks
+        for strategy, tx_hash in list(self._pending.items()):
+            try:
+                if (
+                    await self.rpc.request("eth_getTransactionReceipt", [tx_hash])
+                    is not None
+                ):
+                    done = "mined"
+                elif (
+                    await self.rpc.request("eth_getTransactionByHash", [tx_hash])
+                    is None
+                ):
+                    done = "dropped"
+                elif (
+                    block - self._pending_since.setdefault(strategy, block)
+                    >= self.pending_blocks
+                ):
+                    done = f"not mined after {self.pending_blocks} blocks"
+                else:
+                    continue
+            except CALL_ERRORS as exc:
+                logger.warning(
+                    "couldn't check harvest %s of %s: %r", tx_hash, strategy, exc
+                )
+                continue
+            if done != "mined":
+                logger.warning(
+                    "harvest %s of %s %s, it can be sent again", tx_hash, strategy, done
+                )
+            del self._pending[strategy]
+            self._pending_since.pop(strategy, None)
+
+    async def run_cycle(self, block: Optional[int] = None) -> CycleReport:
+        calls_before = self.rpc.calls
+        if block is None:
+            block = await self.rpc.block_number()
+        await self._clear_mined(block)
+        gas_price = int(await self.rpc.request("eth_gasPrice"), 16)
+
+        call_cost = gas_price * self.harvest_gas
+        start = time.perf_counter()
+        triggers = await self.evaluate(block, call_cost)
+        trigger_latency = time.perf_counter() - start
+
+        triggered = [
+            strategy
+            for strategy, fire in triggers.items()
+            if fire and strategy not in self._pending
+        ]
+        sent, failed = await self.send_harvests(triggered, gas_price, call_cost)
+
+        report = CycleReport(
+            block=block,
+            strategies=len(self.strategies),
+            triggered=triggered,
+            sent=sent,
+            failed=failed,
+            trigger_latency=trigger_latency,
+            rpc_calls=self.rpc.calls - calls_before,
+        )
+        logger.info(
+            "block %d: %d/%d triggered, %d sent, %d failed, triggers took %.3fs, "
+            "%d rpc calls",
+            block,
+            len(triggered),
+            len(self.strategies),
+            len(sent),
+            len(failed),
+            trigger_latency,
+            report.rpc_calls,
+        )
+        if self.on_cycle is not None:
+            self.on_cycle(report)
+        return report
+
+    async def send_harvests(
+        self, triggered: Sequence[str], gas_price: int, call_cost: int
+    ) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """One ``harvest()`` per strategy. Returns the tx hash sent and the error for
+        each that failed.
+        """
+        sent, failed = {}, {}
+
+        async def harvest(strategy: str) -> None:
+            try:
+                sent[strategy] = await self.sender.send(
+                    strategy, HARVEST_CALLDATA, gas_price
+                )
+                self._pending[strategy] = sent[strategy]
+            except CALL_ERRORS as exc:
+                failed[strategy] = str(exc) or repr(exc)
+
+        # sends run concurrently too, our nonce manager keeps them in order
+        await asyncio.gather(*(harvest(strategy) for strategy in triggered))
+        return sent, failed
+
+    async def run(self, max_cycles: Optional[int] = None) -> None:
+        """Poll for new blocks forever (or for ``max_cycles`` blocks)."""
+        last_block = None
+        cycles = 0
+        while max_cycles is None or cycles < max_cycles:
+            block = await self.rpc.block_number()
+            if block != last_block:
+                await self.run_cycle(block)
+                last_block = block
+                cycles += 1
+            else:
+                await asyncio.sleep(self.poll_interval)
+
+
+async def create_keeper(
+    rpc: RpcClient, private_key: str, strategies: Sequence[str], **kwargs
+) -> Keeper:
+    chain_id = int(await rpc.request("eth_chainId"), 16)
+    sender = Sender(rpc, private_key, chain_id, kwargs.pop("gas_limit", 3_000_000))
+    return Keeper(rpc, sender, strategies, **kwargs)
+
+
+async def _main(args: argparse.Namespace) -> None:
+    with open(args.strategies) as f:
+        strategies = [
+            line.strip() for line in f if line.strip() and not line.startswith("#")
+        ]
+    async with RpcClient(args.rpc, max_connections=args.concurrency) as rpc:
+        keeper = await create_keeper(
+            rpc,
+            os.environ["KEEPER_PRIVATE_KEY"],
+            strategies,
+            concurrency=args.concurrency,
+            poll_interval=args.poll_interval,
+            harvest_gas=args.harvest_gas,
+        )
+        await keeper.run()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rpc", required=True, help="node http endpoint")
+    parser.add_argument(
+        "--strategies", required=True, help="file with one strategy address per line"
+    )
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--harvest-gas", type=int, default=2_500_000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
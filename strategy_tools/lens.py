@@ -0,0 +1,161 @@
+"""A whole fleet's state in one ``eth_call`` through our ``StrategyLens``.
+
+The lens is never deployed. We ``eth_call`` its creation code with the
+strategies as constructor arguments, and the constructor returns one packed
+record per strategy instead of runtime code: its vault, ``harvestTrigger``,
+``balanceOfLPStaked``, ``estimatedTotalAssets`` and the boo and xboo behind all
+of its lp (``positionSnapshot()``'s ``totalAssets``, ``booInLp`` and ``xbooInLp``),
+``vault.strategies()`` and ``vault.creditAvailable()``. Big fleets are split
+into chunks sent as one JSON-RPC batch, so a snapshot takes two round-trips:
+one for the block number and one for every chunk, all pinned to that block.
+
+    python -m strategy_tools.lens --rpc http://127.0.0.1:8545 --strategies strategies.txt
+"""
+import argparse
+import asyncio
+import json
+from dataclasses import asdict
+from dataclasses import fields as dataclass_fields
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from eth_abi import encode_abi
+from eth_utils import to_checksum_address
+
+from strategy_tools.multicall import StrategyParams, StrategyState, _chunks
+from strategy_tools.rpc import RpcClient, _block_tag
+
+BUILD_ARTIFACT = Path("build/contracts/StrategyLens.json")
+
+# strategies per eth_call, a harvestTrigger can cost a few hundred thousand gas and nodes cap an eth_call's gas
+CHUNK_SIZE = 25
+
+# (field, bytes) in the order StrategyLens packs them
+RECORD_LAYOUT: Tuple[Tuple[str, int], ...] = (
+    ("strategy", 20),
+    ("vault", 20),
+    ("harvest_trigger", 1),
+    ("failed", 1),
+    ("estimated_total_assets", 32),
+    ("balance_of_lp_staked", 32),
+    ("boo_in_lp", 32),
+    ("xboo_in_lp", 32),
+    ("credit_available", 32),
+    ("performance_fee", 2),
+    ("activation", 8),
+    ("debt_ratio", 2),
+    ("min_debt_per_harvest", 32),
+    ("max_debt_per_harvest", 32),
+    ("last_report", 8),
+    ("total_debt", 32),
+    ("total_gain", 32),
+    ("total_loss", 32),
+)
+RECORD_SIZE = sum(size for _, size in RECORD_LAYOUT)
+
+# bits of a record's failed byte, named after the view that reverted
+FAILED_BITS: Tuple[Tuple[int, str], ...] = (
+    (1, "vault"),
+    (2, "harvestTrigger"),
+    (4, "estimatedTotalAssets"),
+    (8, "balanceOfLPStaked"),
+    (16, "positionSnapshot"),
+    (32, "strategies"),
+    (64, "creditAvailable"),
+)
+
+
+def load_bytecode(artifact: Path = BUILD_ARTIFACT) -> str:
+    """The lens' creation code from brownie's build artifact."""
+    with open(artifact) as f:
+        return json.load(f)["bytecode"]
+
+
+def lens_calldata(bytecode: str, strategies: Sequence[str], call_cost: int = 0) -> str:
+    """Creation code plus constructor arguments, the ``data`` of a ``to``-less ``eth_call``."""
+    encoded = encode_abi(["address[]", "uint256"], [list(strategies), call_cost])
+    return "0x" + bytecode.replace("0x", "", 1) + encoded.hex()
+
+
+def decode_snapshot(data: bytes, block: int) -> List[StrategyState]:
+    """``StrategyState`` records from what the lens returned. Views that reverted stay ``None``."""
+    if len(data) % RECORD_SIZE:
+        raise ValueError(f"snapshot of {len(data)} bytes isn't a whole number of {RECORD_SIZE} byte records")
+    return [_decode_record(data[i : i + RECORD_SIZE], block) for i in range(0, len(data), RECORD_SIZE)]
+
+
+def _decode_record(record: bytes, block: int) -> StrategyState:
+    fields = {}
+    offset = 0
+    for name, size in RECORD_LAYOUT:
+        fields[name] = int.from_bytes(record[offset : offset + size], "big")
+        offset += size
+
+    failed = {view for bit, view in FAILED_BITS if fields["failed"] & bit}
+    state = StrategyState(to_checksum_address(f"0x{fields['strategy']:040x}"), block)
+    state.errors = {view: "reverted" for view in sorted(failed)}
+    if "vault" not in failed:
+        state.vault = to_checksum_address(f"0x{fields['vault']:040x}")
+    if "harvestTrigger" not in failed:
+        state.harvest_trigger = bool(fields["harvest_trigger"])
+    if "estimatedTotalAssets" not in failed:
+        state.estimated_total_assets = fields["estimated_total_assets"]
+    if "balanceOfLPStaked" not in failed:
+        state.balance_of_lp_staked = fields["balance_of_lp_staked"]
+    if "positionSnapshot" not in failed:
+        state.boo_in_lp = fields["boo_in_lp"]
+        state.xboo_in_lp = fields["xboo_in_lp"]
+    if "creditAvailable" not in failed:
+        state.credit_available = fields["credit_available"]
+    if "strategies" not in failed:
+        state.params = StrategyParams(*(fields[param.name] for param in dataclass_fields(StrategyParams)))
+    return state
+
+
+async def read_fleet_lens(
+    rpc: RpcClient,
+    strategies: Sequence[str],
+    bytecode: str,
+    call_cost: int = 0,
+    block: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> List[StrategyState]:
+    """Snapshot every strategy through the lens, all pinned to one block (the latest by default).
+
+    Instead of ``balance_of_constituents`` (behind 1e18 lp) we fill ``boo_in_lp`` and
+    ``xboo_in_lp``, the boo and xboo behind all of each strategy's lp, staked or loose in every pool.
+    """
+    strategies = [to_checksum_address(strategy) for strategy in strategies]
+    if not strategies:
+        return []
+    if block is None:
+        block = await rpc.block_number()
+    results = await rpc.batch(
+        [
+            ("eth_call", [{"data": lens_calldata(bytecode, chunk, call_cost)}, _block_tag(block)])
+            for chunk in _chunks(strategies, chunk_size)
+        ]
+    )
+    return [state for data in results for state in decode_snapshot(bytes.fromhex(data[2:]), block)]
+
+
+async def _main(args: argparse.Namespace) -> None:
+    with open(args.strategies) as f:
+        strategies = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    async with RpcClient(args.rpc) as rpc:
+        states = await read_fleet_lens(rpc, strategies, load_bytecode(args.artifact), args.call_cost, args.block)
+    print(json.dumps([asdict(state) for state in states], indent=2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rpc", required=True, help="node http endpoint")
+    parser.add_argument("--strategies", required=True, help="file with one strategy address per line")
+    parser.add_argument("--artifact", type=Path, default=BUILD_ARTIFACT, help="StrategyLens build artifact")
+    parser.add_argument("--call-cost", type=int, default=0, help="callCostInWei for harvestTrigger")
+    parser.add_argument("--block", type=int, default=None)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
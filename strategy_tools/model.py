@@ -0,0 +1,362 @@
+"""Exact integer model of the maths in ``contracts/Strategy.sol``.
+
+Every function here mirrors a piece of the contract (or of the xBOO and
+Solidly contracts it talks to) operation for operation, using Python ints
+so results match the chain to the wei. SafeMath semantics are kept: ``div``
+truncates, and anything that would revert on-chain (overflow, underflow,
+division by zero) raises :class:`Revert`.
+"""
+from typing import List, NamedTuple, Sequence, Tuple
+
+UINT256_MAX = 2 ** 256 - 1
+BASIS_POINTS = 10_000
+
+
+class Revert(ArithmeticError):
+    """Raised where the contract would revert."""
+
+
+def add(a: int, b: int) -> int:
+    c = a + b
+    if c > UINT256_MAX:
+        raise Revert("SafeMath: addition overflow")
+    return c
+
+
+def sub(a: int, b: int) -> int:
+    if b > a:
+        raise Revert("SafeMath: subtraction overflow")
+    return a - b
+
+
+def mul(a: int, b: int) -> int:
+    c = a * b
+    if c > UINT256_MAX:
+        raise Revert("SafeMath: multiplication overflow")
+    return c
+
+
+def div(a: int, b: int) -> int:
+    if b == 0:
+        raise Revert("SafeMath: division by zero")
+    return a // b
+
+
+class XbooState(NamedTuple):
+    """xBOO's BOO balance and share supply."""
+
+    boo_in_xboo: int
+    xboo_supply: int
+
+
+class PoolState(NamedTuple):
+    """A boo/xboo pair and our lp in it."""
+
+    reserve_boo: int
+    reserve_xboo: int
+    lp_supply: int
+    staked_lp: int = 0
+    loose_lp: int = 0
+    weight: int = BASIS_POINTS
+    stable: bool = False  # x3y+y3x rather than x*y
+
+
+# ---------- xBOO ----------
+
+
+def xboo_to_boo(xboo: XbooState, amount: int) -> int:
+    """``Strategy._xbooToBoo``, which matches xBOO's ``xBOOForBOO`` and ``leave``."""
+    if xboo.xboo_supply == 0:
+        return 0
+    return div(mul(amount, xboo.boo_in_xboo), xboo.xboo_supply)
+
+
+def xboo_rate(xboo: XbooState) -> int:
+    """BOO for 1e18 xBOO."""
+    return xboo_to_boo(xboo, 10 ** 18)
+
+
+def xboo_enter(xboo: XbooState, amount: int) -> Tuple[int, XbooState]:
+    """xBOO minted by ``enter`` and xBOO's state afterwards."""
+    if xboo.xboo_supply == 0 or xboo.boo_in_xboo == 0:
+        minted = amount
+    else:
+        minted = div(mul(amount, xboo.xboo_supply), xboo.boo_in_xboo)
+    return minted, XbooState(add(xboo.boo_in_xboo, amount), add(xboo.xboo_supply, minted))
+
+
+def xboo_leave(xboo: XbooState, shares: int) -> Tuple[int, XbooState]:
+    """BOO returned by ``leave`` and xBOO's state afterwards."""
+    out = xboo_to_boo(xboo, shares)
+    return out, XbooState(sub(xboo.boo_in_xboo, out), sub(xboo.xboo_supply, shares))
+
+
+# ---------- Solidly volatile pair ----------
+
+
+def quote_remove_liquidity(pool: PoolState, liquidity: int) -> Tuple[int, int]:
+    """Router ``quoteRemoveLiquidity``: (boo, xboo) for ``liquidity`` lp."""
+    return (
+        div(mul(liquidity, pool.reserve_boo), pool.lp_supply),
+        div(mul(liquidity, pool.reserve_xboo), pool.lp_supply),
+    )
+
+
+def quote_liquidity(amount_a: int, reserve_a: int, reserve_b: int) -> int:
+    """Router ``quoteLiquidity``."""
+    if amount_a == 0:
+        raise Revert("BaseV1Router: INSUFFICIENT_AMOUNT")
+    if reserve_a == 0 or reserve_b == 0:
+        raise Revert("BaseV1Router: INSUFFICIENT_LIQUIDITY")
+    return amount_a * reserve_b // reserve_a
+
+
+def add_liquidity(pool: PoolState, boo: int, xboo: int) -> Tuple[int, int, int]:
+    """Router ``addLiquidity`` into an existing pair: (boo used, xboo used, lp minted)."""
+    xboo_optimal = quote_liquidity(boo, pool.reserve_boo, pool.reserve_xboo)
+    if xboo_optimal <= xboo:
+        boo_used, xboo_used = boo, xboo_optimal
+    else:
+        boo_used = quote_liquidity(xboo, pool.reserve_xboo, pool.reserve_boo)
+        xboo_used = xboo
+    liquidity = min(
+        boo_used * pool.lp_supply // pool.reserve_boo,
+        xboo_used * pool.lp_supply // pool.reserve_xboo,
+    )
+    return boo_used, xboo_used, liquidity
+
+
+# ---------- Strategy ----------
+
+
+def pool_value(pool: PoolState, xboo: XbooState) -> Tuple[int, int, int]:
+    """(boo, xboo, value in boo) of our staked and loose lp in a pool."""
+    if pool.lp_supply == 0:
+        return 0, 0, 0
+    boo_in_lp, xboo_in_lp = quote_remove_liquidity(pool, add(pool.staked_lp, pool.loose_lp))
+    return boo_in_lp, xboo_in_lp, add(boo_in_lp, xboo_to_boo(xboo, xboo_in_lp))
+
+
+def estimated_total_assets(
+    pools: Sequence[PoolState], xboo: XbooState, loose_boo: int, loose_xboo: int
+) -> int:
+    """``Strategy.estimatedTotalAssets``."""
+    boo_in_lp = 0
+    xboo_in_lp = 0
+    for pool in pools:
+        pool_boo, pool_xboo, _ = pool_value(pool, xboo)
+        boo_in_lp = add(boo_in_lp, pool_boo)
+        xboo_in_lp = add(xboo_in_lp, pool_xboo)
+    return add(add(xboo_to_boo(xboo, add(xboo_in_lp, loose_xboo)), loose_boo), boo_in_lp)
+
+
+def lp_price_in_range(pool: PoolState, xboo: XbooState, lp_slippage: int) -> bool:
+    """The ``lpSlippage`` gate in ``_depositToPool``, True when we'd deposit."""
+    if pool.reserve_boo == 0 or pool.reserve_xboo == 0:
+        return False
+    if pool.stable:
+        # a swap too small to move the curve, see ``Strategy._lpPriceInRange``
+        xboo_in = pool.reserve_xboo // 10 ** 6
+        if xboo_in == 0:
+            return False
+        boo_out = solidly_amount_out(xboo_in, pool.reserve_xboo, pool.reserve_boo, True)
+        ratio_lp = div(mul(boo_out, 10 ** 18), xboo_in)
+    else:
+        ratio_lp = div(mul(pool.reserve_boo, 10 ** 18), pool.reserve_xboo)
+    ratio_xboo = xboo_rate(xboo)
+    if ratio_lp < div(mul(ratio_xboo, lp_slippage), 1000):
+        return False
+    if ratio_xboo < div(mul(ratio_lp, lp_slippage), 1000):
+        return False
+    return True
+
+
+def deposit_split(pool: PoolState, xboo: XbooState, boo: int, loose_xboo: int) -> Tuple[int, int]:
+    """``Strategy._depositSplit``: (boo to enter, xboo to leave)."""
+    boo_side = mul(boo, pool.reserve_xboo)
+    xboo_side = mul(loose_xboo, pool.reserve_boo)
+    if boo_side > xboo_side:
+        return (
+            div(
+                mul(sub(boo_side, xboo_side), xboo.boo_in_xboo),
+                add(mul(pool.reserve_xboo, xboo.boo_in_xboo), mul(pool.reserve_boo, xboo.xboo_supply)),
+            ),
+            0,
+        )
+    return (
+        0,
+        div(
+            mul(sub(xboo_side, boo_side), xboo.xboo_supply),
+            add(mul(pool.reserve_boo, xboo.xboo_supply), mul(pool.reserve_xboo, xboo.boo_in_xboo)),
+        ),
+    )
+
+
+class DepositResult(NamedTuple):
+    lp_minted: int
+    boo_left: int
+    xboo_left: int
+    xboo: XbooState
+
+
+def deposit(pool: PoolState, xboo: XbooState, boo: int, loose_xboo: int) -> DepositResult:
+    """Split, enter/leave and ``addLiquidity`` for one pool, as ``_depositToPool`` does."""
+    boo_to_enter, xboo_to_leave = deposit_split(pool, xboo, boo, loose_xboo)
+    boo_to_lp, xboo_to_lp = boo, loose_xboo
+    if boo_to_enter > 0:
+        minted, xboo = xboo_enter(xboo, boo_to_enter)
+        boo_to_lp = sub(boo_to_lp, boo_to_enter)
+        xboo_to_lp = add(xboo_to_lp, minted)
+    elif xboo_to_leave > 0:
+        out, xboo = xboo_leave(xboo, xboo_to_leave)
+        boo_to_lp = add(boo_to_lp, out)
+        xboo_to_lp = sub(xboo_to_lp, xboo_to_leave)
+    boo_used, xboo_used, liquidity = add_liquidity(pool, boo_to_lp, xboo_to_lp)
+    return DepositResult(liquidity, boo_to_lp - boo_used, xboo_to_lp - xboo_used, xboo)
+
+
+def deposit_allocations(pools: Sequence[PoolState], xboo: XbooState, loose_boo: int) -> List[int]:
+    """``Strategy._depositAllocations``: boo each pool gets so it moves toward its weight."""
+    values = [pool_value(pool, xboo)[2] for pool in pools]
+    total_value = loose_boo
+    for value in values:
+        total_value = add(total_value, value)
+
+    shortfalls = []
+    for pool, value in zip(pools, values):
+        target = div(mul(total_value, pool.weight), BASIS_POINTS)
+        shortfalls.append(sub(target, value) if target > value else 0)
+    total_shortfall = sum(shortfalls)
+    if total_shortfall == 0:
+        return shortfalls
+    return [div(mul(shortfall, loose_boo), total_shortfall) for shortfall in shortfalls]
+
+
+def boo_to_lp_tokens(pool: PoolState, xboo: XbooState, amount: int) -> int:
+    """``Strategy._booToLpTokens``: lp to break for at least ``amount`` boo, rounded up."""
+    denominator = add(mul(pool.reserve_boo, xboo.xboo_supply), mul(pool.reserve_xboo, xboo.boo_in_xboo))
+    if amount == 0 or denominator == 0:
+        return 0
+    numerator = mul(mul(add(add(amount, xboo_to_boo(xboo, 1)), 3), pool.lp_supply), xboo.xboo_supply)
+    return div(sub(add(numerator, denominator), 1), denominator)
+
+
+def lp_to_boo(pool: PoolState, xboo: XbooState, lp_amount: int) -> int:
+    """``Strategy._lpToBoo``: boo from breaking ``lp_amount`` lp and leaving the xboo."""
+    if lp_amount == 0:
+        return 0
+    amount_boo, amount_xboo = quote_remove_liquidity(pool, lp_amount)
+    return add(amount_boo, xboo_to_boo(xboo, amount_xboo))
+
+
+def plan_withdrawal(
+    pools: Sequence[PoolState], xboo: XbooState, loose_boo: int, amount_needed: int
+) -> Tuple[List[int], List[int]]:
+    """``Strategy._planWithdrawal``: (lp to remove, lp to unstake) per pool.
+
+    Assumes loose xboo has already been left, like the contract does.
+    """
+    lp_to_remove = [0] * len(pools)
+    lp_to_unstake = [0] * len(pools)
+    if loose_boo >= amount_needed:
+        return lp_to_remove, lp_to_unstake
+    amount_to_free = sub(amount_needed, loose_boo)
+
+    values = [pool_value(pool, xboo)[2] for pool in pools]
+    total_value = sum(values)
+    if total_value == 0:
+        return lp_to_remove, lp_to_unstake
+
+    for i, (pool, value) in enumerate(zip(pools, values)):
+        boo_from_pool = add(div(mul(amount_to_free, value), total_value), 1)
+        lp_to_remove[i] = min(boo_to_lp_tokens(pool, xboo, boo_from_pool), add(pool.loose_lp, pool.staked_lp))
+        if lp_to_remove[i] > pool.loose_lp:
+            lp_to_unstake[i] = sub(lp_to_remove[i], pool.loose_lp)
+    return lp_to_remove, lp_to_unstake
+
+
+# ---------- swaps ----------
+
+
+def uniswap_v2_amount_out(amount_in: int, reserve_in: int, reserve_out: int, fee_per_mille: int = 2) -> int:
+    """``UniswapV2Library.getAmountOut``, Spooky takes 2 per mille."""
+    if amount_in == 0:
+        raise Revert("UniswapV2Library: INSUFFICIENT_INPUT_AMOUNT")
+    if reserve_in == 0 or reserve_out == 0:
+        raise Revert("UniswapV2Library: INSUFFICIENT_LIQUIDITY")
+    amount_in_with_fee = mul(amount_in, 1000 - fee_per_mille)
+    return div(mul(amount_in_with_fee, reserve_out), add(mul(reserve_in, 1000), amount_in_with_fee))
+
+
+def _solidly_k(x: int, y: int, decimals_x: int, decimals_y: int) -> int:
+    _x = div(mul(x, 10 ** 18), decimals_x)
+    _y = div(mul(y, 10 ** 18), decimals_y)
+    _a = div(mul(_x, _y), 10 ** 18)
+    _b = add(div(mul(_x, _x), 10 ** 18), div(mul(_y, _y), 10 ** 18))
+    return div(mul(_a, _b), 10 ** 18)
+
+
+def _solidly_f(x0: int, y: int) -> int:
+    return add(
+        div(mul(x0, div(mul(div(mul(y, y), 10 ** 18), y), 10 ** 18)), 10 ** 18),
+        div(mul(div(mul(div(mul(x0, x0), 10 ** 18), x0), 10 ** 18), y), 10 ** 18),
+    )
+
+
+def _solidly_d(x0: int, y: int) -> int:
+    return add(
+        div(mul(mul(3, x0), div(mul(y, y), 10 ** 18)), 10 ** 18),
+        div(mul(div(mul(x0, x0), 10 ** 18), x0), 10 ** 18),
+    )
+
+
+def _solidly_get_y(x0: int, xy: int, y: int) -> int:
+    for _ in range(255):
+        y_prev = y
+        k = _solidly_f(x0, y)
+        if k < xy:
+            y = add(y, div(mul(sub(xy, k), 10 ** 18), _solidly_d(x0, y)))
+        else:
+            y = sub(y, div(mul(sub(k, xy), 10 ** 18), _solidly_d(x0, y)))
+        if abs(y - y_prev) <= 1:
+            return y
+    return y
+
+
+def solidly_amount_out(
+    amount_in: int,
+    reserve_in: int,
+    reserve_out: int,
+    stable: bool,
+    decimals_in: int = 10 ** 18,
+    decimals_out: int = 10 ** 18,
+) -> int:
+    """Solidly ``BaseV1Pair.getAmountOut``: x*y=k or x3y+y3x=k after a 0.01% fee.
+
+    ``decimals_in`` and ``decimals_out`` are ``10 ** decimals`` of each token.
+    """
+    amount_in = sub(amount_in, amount_in // 10_000)
+    if not stable:
+        return div(mul(amount_in, reserve_out), add(reserve_in, amount_in))
+    xy = _solidly_k(reserve_in, reserve_out, decimals_in, decimals_out)
+    reserve_a = div(mul(reserve_in, 10 ** 18), decimals_in)
+    reserve_b = div(mul(reserve_out, 10 ** 18), decimals_out)
+    amount_in = div(mul(amount_in, 10 ** 18), decimals_in)
+    y = sub(reserve_b, _solidly_get_y(add(amount_in, reserve_a), xy, reserve_b))
+    return div(mul(y, decimals_out), 10 ** 18)
+
+
+def stable_reserve_ratio(price: int) -> int:
+    """Boo reserves per xboo (1e18 = 1:1) at which a stable pair prices xboo at ``price`` boo (1e18 = 1:1).
+
+    x3y+y3x=k prices x in y at (r^3 + 3r) / (3r^2 + 1) for r = x / y, which we solve for r.
+    """
+    scale = 10 ** 18
+    low, high = 0, 3 * (price + scale)
+    while high - low > 1:
+        ratio = (low + high) // 2
+        if ratio ** 3 + 3 * ratio * scale ** 2 >= price * (3 * ratio ** 2 + scale ** 2):
+            high = ratio
+        else:
+            low = ratio
+    return high
@@ -0,0 +1,363 @@
+"""Batched reads of strategy and vault views through Multicall3.
+
+``read_fleet`` encodes every requested view of every strategy into ``aggregate3`` calls,
+sends them as one JSON-RPC batch pinned to a single block and decodes the results into
+``StrategyState`` records. A fleet's state comes back in two round-trips: one for the
+block number (and each strategy's vault, if vault views are wanted) and one for
+everything else.
+
+    python -m strategy_tools.multicall \\
+        --rpc http://127.0.0.1:8545 --strategies strategies.txt
+"""
+import argparse
+import asyncio
+import json
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from eth_abi import decode_abi, encode_abi
+from eth_abi.exceptions import DecodingError
+from eth_utils import to_checksum_address
+
+from strategy_tools.rpc import RpcClient, RpcError, decode_result, encode_function_call
+
+# Multicall3 has the same address on every chain we use, Fantom included
+MULTICALL3 = "0xcA11bde05977b3631167028862bE2a173976CA11"
+AGGREGATE3 = "aggregate3((address,bool,bytes)[])"
+
+# calls per aggregate3, and aggregate3 calls per JSON-RPC batch
+MAX_CALLS = 500
+
+
+@dataclass
+class StrategyParams:
+    """``vault.strategies(strategy)``"""
+
+    performance_fee: int
+    activation: int
+    debt_ratio: int
+    min_debt_per_harvest: int
+    max_debt_per_harvest: int
+    last_report: int
+    total_debt: int
+    total_gain: int
+    total_loss: int
+
+
+@dataclass
+class StrategyState:
+    """Everything we read for one strategy, at one block. Views we didn't ask for stay
+    ``None``.
+    """
+
+    address: str
+    block: int
+    vault: Optional[str] = None
+    estimated_total_assets: Optional[int] = None
+    balance_of_lp_staked: Optional[int] = None
+    # behind 1e18 lp of our first pool
+    balance_of_constituents: Optional[Tuple[int, int]] = None
+    lp_slippage: Optional[int] = None
+    min_harvest_credit: Optional[int] = None
+    trades_enabled: Optional[bool] = None
+    params: Optional[StrategyParams] = None
+    harvest_trigger: Optional[bool] = None
+    credit_available: Optional[int] = None
+    boo_in_lp: Optional[int] = None  # behind all of our lp, in every pool
+    xboo_in_lp: Optional[int] = None
+    errors: Dict[str, str] = field(default_factory=dict)
+
+
+class View(NamedTuple):
+    signature: str
+    arg_types: Tuple[str, ...]
+    result_types: Tuple[str, ...]
+    field: str
+    on_vault: bool = False
+    default_args: Tuple[Any, ...] = ()
+    convert: Callable[[Tuple[Any, ...]], Any] = lambda result: result[0]
+
+
+VIEWS: Dict[str, View] = {
+    "estimatedTotalAssets": View(
+        "estimatedTotalAssets()", (), ("uint256",), "estimated_total_assets"
+    ),
+    "balanceOfLPStaked": View(
+        "balanceOfLPStaked()", (), ("uint256",), "balance_of_lp_staked"
+    ),
+    # the boo and xboo behind 1e18 lp unless told otherwise
+    "balanceOfConstituents": View(
+        "balanceOfConstituents(uint256)",
+        ("uint256",),
+        ("uint256", "uint256"),
+        "balance_of_constituents",
+        default_args=(10 ** 18,),
+        convert=tuple,
+    ),
+    "lpSlippage": View("lpSlippage()", (), ("uint16",), "lp_slippage"),
+    "minHarvestCredit": View(
+        "minHarvestCredit()", (), ("uint256",), "min_harvest_credit"
+    ),
+    "tradesEnabled": View("tradesEnabled()", (), ("bool",), "trades_enabled"),
+    # called on the strategy's vault with the strategy as argument
+    "strategies": View(
+        "strategies(address)",
+        ("address",),
+        ("uint256",) * 9,
+        "params",
+        on_vault=True,
+        convert=lambda result: StrategyParams(*result),
+    ),
+}
+
+DEFAULT_VIEWS = tuple(VIEWS)
+
+
+class _Call(NamedTuple):
+    strategy: str
+    view: str
+    target: str
+    calldata: bytes
+
+
+def _plan(
+    states: Dict[str, StrategyState],
+    views: Sequence[str],
+    view_args: Dict[str, Sequence[Any]],
+) -> List[_Call]:
+    calls = []
+    for strategy, state in states.items():
+        for name in views:
+            view = VIEWS[name]
+            if view.on_vault:
+                target, args = state.vault, [strategy]
+            else:
+                target, args = strategy, list(view_args.get(name, view.default_args))
+            calldata = encode_function_call(view.signature, view.arg_types, args)
+            calls.append(_Call(strategy, name, target, bytes.fromhex(calldata[2:])))
+    return calls
+
+
+def _aggregate3_calldata(calls: Sequence[_Call]) -> str:
+    encoded = encode_abi(
+        ["(address,bool,bytes)[]"],
+        [[(call.target, True, call.calldata) for call in calls]],
+    )
+    return encode_function_call(AGGREGATE3)[:10] + encoded.hex()
+
+
+def _chunks(items: Sequence[Any], size: int) -> List[Sequence[Any]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+async def _resolve(
+    rpc: RpcClient,
+    strategies: Sequence[str],
+    block: Optional[int],
+    need_vaults: bool,
+    multicall: str,
+) -> Tuple[int, List[Optional[str]]]:
+    """The block we read at and, if needed, each strategy's vault, in one round-trip."""
+    requests = []
+    if block is None:
+        requests.append(("eth_blockNumber", []))
+    if need_vaults:
+        vault_call = bytes.fromhex(encode_function_call("vault()")[2:])
+        # vault() never changes so reading it at latest is fine
+        calls = [
+            _Call(strategy, "vault", strategy, vault_call) for strategy in strategies
+        ]
+        requests += [
+            (
+                "eth_call",
+                [{"to": multicall, "data": _aggregate3_calldata(chunk)}, "latest"],
+            )
+            for chunk in _chunks(calls, MAX_CALLS)
+        ]
+    results = await rpc.batch(requests) if requests else []
+    if block is None:
+        block = int(results.pop(0), 16)
+    vaults: List[Optional[str]] = [None] * len(strategies)
+    if need_vaults:
+        returned = [
+            item
+            for data in results
+            for item in decode_result(["(bool,bytes)[]"], data)[0]
+        ]
+        for i, (success, data) in enumerate(returned):
+            # a call to an address without code succeeds with nothing returned
+            vault = _decode(["address"], data) if success else None
+            if vault is not None:
+                vaults[i] = to_checksum_address(vault[0])
+    return block, vaults
+
+
+def _decode(types: Sequence[str], data: bytes) -> Optional[Tuple[Any, ...]]:
+    """``data`` decoded as ``types``, ``None`` if it's empty or too short to be that."""
+    if not data:
+        return None
+    try:
+        return decode_abi(list(types), data)
+    except DecodingError:
+        return None
+
+
+async def read_fleet(
+    rpc: RpcClient,
+    strategies: Sequence[str],
+    views: Sequence[str] = DEFAULT_VIEWS,
+    block: Optional[int] = None,
+    view_args: Optional[Dict[str, Sequence[Any]]] = None,
+    multicall: str = MULTICALL3,
+    max_calls: int = MAX_CALLS,
+) -> List[StrategyState]:
+    """Read ``views`` for every strategy through Multicall3, all pinned to one block.
+
+    ``block`` defaults to the latest one. A view that reverts for a strategy is
+    left as ``None`` and noted in that record's ``errors``.
+    """
+    unknown = set(views) - set(VIEWS)
+    if unknown:
+        raise ValueError(f"unknown views: {sorted(unknown)}")
+    strategies = [to_checksum_address(strategy) for strategy in strategies]
+    need_vaults = any(VIEWS[name].on_vault for name in views)
+    block, vaults = await _resolve(rpc, strategies, block, need_vaults, multicall)
+
+    states = {
+        strategy: StrategyState(strategy, block, vault)
+        for strategy, vault in zip(strategies, vaults)
+    }
+    for state in states.values():
+        if need_vaults and state.vault is None:
+            state.errors["vault"] = "vault() reverted"
+    runnable = {
+        strategy: state
+        for strategy, state in states.items()
+        if not (need_vaults and state.vault is None)
+    }
+    calls = _plan(runnable, views, view_args or {})
+    if not calls:
+        return list(states.values())
+
+    returned = await aggregate3(
+        rpc,
+        [(call.target, call.calldata) for call in calls],
+        block,
+        multicall,
+        max_calls,
+    )
+    for call, (success, output) in zip(calls, returned):
+        _store(states[call.strategy], call.view, success, output)
+    return list(states.values())
+
+
+async def aggregate3(
+    rpc: RpcClient,
+    calls: Sequence[Tuple[str, bytes]],
+    block: Any = "latest",
+    multicall: str = MULTICALL3,
+    max_calls: int = MAX_CALLS,
+) -> List[Tuple[bool, bytes]]:
+    """Run ``(target, calldata)`` calls through Multicall3 in one round-trip, failures
+    allowed.
+
+    Calls are split into ``aggregate3`` chunks of ``max_calls`` and the chunks sent as
+    one JSON-RPC batch.
+    """
+    if not calls:
+        return []
+    chunks = _chunks(
+        [_Call("", "", target, calldata) for target, calldata in calls], max_calls
+    )
+    block_tag = hex(block) if isinstance(block, int) else block
+    results = await rpc.batch(
+        [
+            (
+                "eth_call",
+                [{"to": multicall, "data": _aggregate3_calldata(chunk)}, block_tag],
+            )
+            for chunk in chunks
+        ]
+    )
+    return [
+        tuple(item)
+        for data in results
+        for item in decode_result(["(bool,bytes)[]"], data)[0]
+    ]
+
+
+async def read_fleet_unbatched(
+    rpc: RpcClient,
+    strategies: Sequence[str],
+    views: Sequence[str] = DEFAULT_VIEWS,
+    block: Optional[int] = None,
+    view_args: Optional[Dict[str, Sequence[Any]]] = None,
+) -> List[StrategyState]:
+    """Same as ``read_fleet`` but one ``eth_call`` per view, what our monitoring did
+    before.
+    """
+    strategies = [to_checksum_address(strategy) for strategy in strategies]
+    if block is None:
+        block = await rpc.block_number()
+    states = {strategy: StrategyState(strategy, block) for strategy in strategies}
+    if any(VIEWS[name].on_vault for name in views):
+        for strategy, state in states.items():
+            try:
+                output = await rpc.eth_call(strategy, encode_function_call("vault()"))
+                vault = _decode(["address"], bytes.fromhex(output[2:]))
+            except RpcError:
+                vault = None
+            if vault is None:
+                state.errors["vault"] = "vault() reverted"
+            else:
+                state.vault = to_checksum_address(vault[0])
+    runnable = {
+        strategy: state
+        for strategy, state in states.items()
+        if "vault" not in state.errors
+    }
+    for call in _plan(runnable, views, view_args or {}):
+        try:
+            output = await rpc.eth_call(call.target, "0x" + call.calldata.hex(), block)
+            _store(states[call.strategy], call.view, True, bytes.fromhex(output[2:]))
+        except RpcError:
+            _store(states[call.strategy], call.view, False, b"")
+    return list(states.values())
+
+
+def _store(state: StrategyState, name: str, success: bool, output: bytes) -> None:
+    view = VIEWS[name]
+    result = _decode(view.result_types, output) if success else None
+    if result is None:
+        state.errors[name] = "reverted"
+        return
+    setattr(state, view.field, view.convert(result))
+
+
+async def _main(args: argparse.Namespace) -> None:
+    with open(args.strategies) as f:
+        strategies = [
+            line.strip() for line in f if line.strip() and not line.startswith("#")
+        ]
+    async with RpcClient(args.rpc) as rpc:
+        states = await read_fleet(rpc, strategies, args.views, args.block)
+    print(json.dumps([asdict(state) for state in states], indent=2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rpc", required=True, help="node http endpoint")
+    parser.add_argument(
+        "--strategies", required=True, help="file with one strategy address per line"
+    )
+    parser.add_argument(
+        "--views", nargs="+", default=list(DEFAULT_VIEWS), choices=list(VIEWS)
+    )
+    parser.add_argument("--block", type=int, default=None)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Minimal async JSON-RPC client shared by our off-chain tooling."""
+import itertools
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+from eth_abi import decode_abi, encode_abi
+from eth_utils import function_signature_to_4byte_selector
+
+
+class RpcError(Exception):
+    """An error returned by the node."""
+
+
+class RpcClient:
+    """One pooled HTTP connection to a node, counting every request we make.
+
+    Use it as an async context manager so the underlying session is closed.
+    """
+
+    def __init__(self, endpoint: str, max_connections: int = 32, timeout: float = 30):
+        self.endpoint = endpoint
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.calls = 0
+        self._ids = itertools.count(1)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "RpcClient":
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_connections),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self._session.close()
+        self._session = None
+
+    async def request(self, method: str, params: Sequence[Any] = ()) -> Any:
+        self.calls += 1
+        payload = {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": list(params)}
+        async with self._session.post(self.endpoint, json=payload) as response:
+            body = await response.json(content_type=None)
+        if "error" in body:
+            raise RpcError(body["error"])
+        return body["result"]
+
+    async def batch(self, requests: Sequence[Tuple[str, Sequence[Any]]]) -> List[Any]:
+        """Send several requests in one round-trip, results come back in order."""
+        self.calls += 1
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": list(params)}
+            for i, (method, params) in enumerate(requests)
+        ]
+        async with self._session.post(self.endpoint, json=payload) as response:
+            body = await response.json(content_type=None)
+        results = {item["id"]: item for item in body}
+        out = []
+        for i in range(len(requests)):
+            if "error" in results[i]:
+                raise RpcError(results[i]["error"])
+            out.append(results[i]["result"])
+        return out
+
+    async def eth_call(self, to: str, data: str, block: Any = "latest") -> str:
+        return await self.request("eth_call", [{"to": to, "data": data}, _block_tag(block)])
+
+    async def eth_estimate_gas(self, tx: Dict[str, Any], block: Any = "latest") -> int:
+        return int(await self.request("eth_estimateGas", [tx, _block_tag(block)]), 16)
+
+    async def block_number(self) -> int:
+        return int(await self.request("eth_blockNumber"), 16)
+
+
+def _block_tag(block: Any) -> str:
+    return hex(block) if isinstance(block, int) else block
+
+
+def encode_function_call(signature: str, arg_types: Sequence[str] = (), args: Sequence[Any] = ()) -> str:
+    """Calldata for ``signature`` (e.g. ``"harvestTrigger(uint256)"``) as a hex string."""
+    selector = function_signature_to_4byte_selector(signature)
+    return "0x" + (selector + encode_abi(list(arg_types), list(args))).hex()
+
+
+def decode_result(result_types: Sequence[str], data: str) -> Tuple[Any, ...]:
+    return decode_abi(list(result_types), bytes.fromhex(data[2:] if data.startswith("0x") else data))
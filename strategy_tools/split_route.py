@@ -0,0 +1,105 @@
+"""Split one token sale across several routes to cut price impact.
+
+Candidate routes are laid out as NumPy arrays of hops over a reserve snapshot
+and evaluated all at once in float64, whole-token units. The sale is handed
+out in ``steps`` equal chunks, each going to whichever route pays the most for
+it right now (the curves are concave, so this converges on equal marginal
+prices). Routes in a split never share a pool, so each route's curve is
+evaluated once over the whole grid of chunks, and every route can be
+re-quoted on its own with the exact integer maths to match the chain.
+
+Unlike :mod:`strategy_tools.vectorized` these are floats: they pick amounts,
+they don't quote them.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+NEWTON_ITERATIONS = 16
+
+
+class RouteCurves(NamedTuple):
+    pool: np.ndarray  # (routes, hops) index into the pool arrays, -1 past the end of a route
+    zero_for_one: np.ndarray  # (routes, hops) True where a hop sells the pool's token0
+    reserves: np.ndarray  # (pools, 2) reserves in whole tokens
+    stable: np.ndarray  # (pools,) solidly x3y+y3x pools
+    fee: np.ndarray  # (pools,) share of the amount in that's swapped, 0.998 on spooky
+
+
+def _stable_y(x, y, k):
+    """Solve x3y+y3x = k for y by Newton from above, like the pair's ``_get_y``."""
+    for _ in range(NEWTON_ITERATIONS):
+        f = x * y ** 3 + x ** 3 * y - k
+        y = y - f / (3 * x * y ** 2 + x ** 3)
+    return y
+
+
+def route_outputs(curves: RouteCurves, amounts: np.ndarray) -> np.ndarray:
+    """What each route pays for its amounts in, whole tokens in and out.
+
+    ``amounts`` has one row per route, with as many amounts in each row as you like.
+    """
+    amounts = np.asarray(amounts, dtype=float)
+    column = (-1,) + (1,) * (amounts.ndim - 1)
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for hop in range(curves.pool.shape[1]):
+            index = curves.pool[:, hop]
+            active = (index >= 0).reshape(column)
+            index = np.where(index >= 0, index, 0)
+            zero_for_one = curves.zero_for_one[:, hop]
+            reserve_in = np.where(zero_for_one, curves.reserves[index, 0], curves.reserves[index, 1]).reshape(column)
+            reserve_out = np.where(zero_for_one, curves.reserves[index, 1], curves.reserves[index, 0]).reshape(column)
+            amount_in = amounts * curves.fee[index].reshape(column)
+
+            out = amount_in * reserve_out / (reserve_in + amount_in)
+            stable = curves.stable[index]
+            if stable.any():
+                k = reserve_in ** 3 * reserve_out + reserve_out ** 3 * reserve_in
+                y = _stable_y(reserve_in + amount_in, reserve_out, k)
+                out = np.where(stable.reshape(column), reserve_out - y, out)
+            out = np.where((reserve_in > 0) & (reserve_out > 0) & np.isfinite(out), np.maximum(out, 0), 0)
+            amounts = np.where(active, out, amounts)
+    return amounts
+
+
+def shared_pools(curves: RouteCurves) -> np.ndarray:
+    """(routes, routes) True where two different routes go through the same pool."""
+    pools = curves.pool
+    shared = ((pools[:, None, :, None] == pools[None, :, None, :]) & (pools[:, None, :, None] >= 0)).any(axis=(2, 3))
+    np.fill_diagonal(shared, False)
+    return shared
+
+
+def split_amount(curves: RouteCurves, amount: int, scale: int = 10 ** 18, steps: int = 64) -> np.ndarray:
+    """How much of ``amount`` (base units, ``scale`` per whole token) each route should take.
+
+    Allocations are ints summing to ``amount``; routes we don't use get zero.
+    """
+    routes = curves.pool.shape[0]
+    allocations = np.zeros(routes, dtype=object)
+    if routes == 0 or amount == 0:
+        return allocations
+
+    # routes in a split don't share pools, so each one's curve only depends on its own amount
+    grid = np.arange(steps + 1) * (amount / scale / steps)
+    outputs = route_outputs(curves, np.broadcast_to(grid, (routes, steps + 1)))
+    marginal = np.diff(outputs, axis=1)
+
+    shared = shared_pools(curves)
+    chunks = np.zeros(routes, dtype=int)
+    allowed = np.ones(routes, dtype=bool)
+    rows = np.arange(routes)
+    for _ in range(steps):
+        gains = np.where(allowed, marginal[rows, np.minimum(chunks, steps - 1)], -np.inf)
+        best = int(np.argmax(gains))
+        if gains[best] <= 0:
+            break
+        chunks[best] += 1
+        allowed &= ~shared[best]
+        allowed[chunks >= steps] = False
+
+    if chunks.sum() == 0:
+        return allocations
+    allocations[:] = [amount * int(c) // steps for c in chunks]
+    allocations[int(np.argmax(chunks))] += amount - allocations.sum()
+    return allocations
@@ -0,0 +1,273 @@
+"""NumPy versions of :mod:`strategy_tools.model` over arrays of states.
+
+Arrays use ``dtype=object`` so every element stays an exact Python int and
+results match the scalar model (and the chain) to the wei; 256-bit products
+don't fit in any fixed-width NumPy dtype. Overflow and division by zero are
+checked across the whole array and raise :class:`~strategy_tools.model.Revert`,
+so callers should filter out states the contract would revert on first.
+
+The ``*_float`` functions at the bottom run the same maths in float64 for
+sweeps over millions of states, with exact rechecks wherever a decision is too
+close to call in floating point.
+"""
+import numpy as np
+
+from strategy_tools.model import BASIS_POINTS, UINT256_MAX, Revert
+
+
+def as_uint(values):
+    """Turn ints, sequences or arrays into an exact object array."""
+    array = np.asarray(values, dtype=object)
+    if array.ndim == 0:
+        array = array.reshape(1)
+    return array
+
+
+def _check(result):
+    if (result > UINT256_MAX).any():
+        raise Revert("SafeMath: overflow")
+    if (result < 0).any():
+        raise Revert("SafeMath: subtraction overflow")
+    return result
+
+
+def add(a, b):
+    return _check(a + b)
+
+
+def sub(a, b):
+    return _check(a - b)
+
+
+def mul(a, b):
+    return _check(a * b)
+
+
+def div(a, b):
+    if (np.asarray(b) == 0).any():
+        raise Revert("SafeMath: division by zero")
+    return a // b
+
+
+def xboo_to_boo(boo_in_xboo, xboo_supply, amount):
+    """Vectorized ``_xbooToBoo``, zero where xboo has no supply."""
+    safe_supply = np.where(xboo_supply == 0, 1, xboo_supply)
+    return np.where(xboo_supply == 0, 0, div(mul(amount, boo_in_xboo), safe_supply))
+
+
+def quote_remove_liquidity(reserve_boo, reserve_xboo, lp_supply, liquidity):
+    return (
+        div(mul(liquidity, reserve_boo), lp_supply),
+        div(mul(liquidity, reserve_xboo), lp_supply),
+    )
+
+
+def estimated_total_assets(
+    reserve_boo,
+    reserve_xboo,
+    lp_supply,
+    our_lp,
+    boo_in_xboo,
+    xboo_supply,
+    loose_boo,
+    loose_xboo,
+):
+    """Vectorized ``estimatedTotalAssets`` for a single pool, whose lp counts for
+    nothing while it has no supply.
+    """
+    empty = lp_supply == 0
+    boo_in_lp, xboo_in_lp = quote_remove_liquidity(
+        reserve_boo,
+        reserve_xboo,
+        np.where(empty, 1, lp_supply),
+        np.where(empty, 0, our_lp),
+    )
+    return add(
+        add(
+            xboo_to_boo(boo_in_xboo, xboo_supply, add(xboo_in_lp, loose_xboo)),
+            loose_boo,
+        ),
+        boo_in_lp,
+    )
+
+
+def lp_price_in_range(reserve_boo, reserve_xboo, boo_in_xboo, xboo_supply, lp_slippage):
+    """Vectorized ``lpSlippage`` gate for volatile pools, True where we'd deposit."""
+    empty = (reserve_boo == 0) | (reserve_xboo == 0)
+    ratio_lp = div(mul(reserve_boo, 10 ** 18), np.where(empty, 1, reserve_xboo))
+    ratio_xboo = xboo_to_boo(boo_in_xboo, xboo_supply, 10 ** 18)
+    too_low = ratio_lp < div(mul(ratio_xboo, lp_slippage), 1000)
+    too_high = ratio_xboo < div(mul(ratio_lp, lp_slippage), 1000)
+    return ~(empty | too_low | too_high)
+
+
+def deposit_split(reserve_boo, reserve_xboo, boo_in_xboo, xboo_supply, boo, loose_xboo):
+    """Vectorized ``_depositSplit``: arrays of (boo to enter, xboo to leave)."""
+    boo_side = mul(boo, reserve_xboo)
+    xboo_side = mul(loose_xboo, reserve_boo)
+    entering = boo_side > xboo_side
+
+    boo_to_enter = div(
+        mul(np.where(entering, boo_side - xboo_side, 0), boo_in_xboo),
+        add(mul(reserve_xboo, boo_in_xboo), mul(reserve_boo, xboo_supply)),
+    )
+    xboo_to_leave = div(
+        mul(np.where(entering, 0, xboo_side - boo_side), xboo_supply),
+        add(mul(reserve_boo, xboo_supply), mul(reserve_xboo, boo_in_xboo)),
+    )
+    return boo_to_enter, xboo_to_leave
+
+
+def boo_to_lp_tokens(
+    reserve_boo, reserve_xboo, lp_supply, boo_in_xboo, xboo_supply, amount
+):
+    """Vectorized ``_booToLpTokens``."""
+    denominator = add(mul(reserve_boo, xboo_supply), mul(reserve_xboo, boo_in_xboo))
+    zero = (amount == 0) | (denominator == 0)
+    safe_denominator = np.where(zero, 1, denominator)
+    pad = xboo_to_boo(boo_in_xboo, xboo_supply, 1)
+    numerator = mul(mul(add(add(amount, pad), 3), lp_supply), xboo_supply)
+    return np.where(zero, 0, div(numerator + safe_denominator - 1, safe_denominator))
+
+
+def lp_to_boo(
+    reserve_boo, reserve_xboo, lp_supply, boo_in_xboo, xboo_supply, lp_amount
+):
+    """Vectorized ``_lpToBoo``."""
+    amount_boo, amount_xboo = quote_remove_liquidity(
+        reserve_boo, reserve_xboo, lp_supply, lp_amount
+    )
+    return add(amount_boo, xboo_to_boo(boo_in_xboo, xboo_supply, amount_xboo))
+
+
+def target_weight_shortfalls(values, weights, loose_boo):
+    """``_depositAllocations`` over a 2d array of pool values (states x pools)."""
+    values = np.atleast_2d(values)
+    weights = np.atleast_2d(weights)
+    total_value = loose_boo + values.sum(axis=1)
+    targets = div(mul(total_value[:, None], weights), BASIS_POINTS)
+    shortfalls = np.where(targets > values, targets - values, 0)
+    total_shortfall = shortfalls.sum(axis=1)
+    safe_total = np.where(total_shortfall == 0, 1, total_shortfall)
+    return np.where(
+        (total_shortfall == 0)[:, None],
+        shortfalls,
+        div(
+            mul(shortfalls, np.asarray(loose_boo, dtype=object).reshape(-1, 1)),
+            safe_total[:, None],
+        ),
+    )
+
+
+# ---------- float64 ----------
+#
+# Sweeps over millions of states don't need every amount to the wei, so the functions
+# below run the same maths in float64. Amounts come out within FLOAT_TOLERANCE of the
+# exact result, relatively. Decisions stay exact: states whose float margin is within
+# FLOAT_TOLERANCE of the threshold are rechecked with the object arrays above, and on
+# realistic states that's a handful per million.
+
+# a few roundings at float64's 2 ** -53 each, with plenty of room for the contract's
+# truncating divs
+FLOAT_TOLERANCE = 1e-12
+
+
+def as_float(values):
+    """Turn ints, sequences or arrays into float64 for the functions below."""
+    array = np.asarray(values)
+    if array.dtype == object:
+        array = array.astype(np.float64)
+    return np.atleast_1d(np.asarray(array, dtype=np.float64))
+
+
+# the contract's ratios are in 1e18ths and truncated, so they can also be a few 1e-18
+# off ours
+def _near(a, b):
+    return np.abs(a - b) <= FLOAT_TOLERANCE * np.maximum(np.abs(a), np.abs(b)) + 1e-17
+
+
+def _safe(denominator):
+    return np.where(denominator == 0, 1.0, denominator)
+
+
+def xboo_to_boo_float(boo_in_xboo, xboo_supply, amount):
+    return np.where(xboo_supply == 0, 0.0, amount * (boo_in_xboo / _safe(xboo_supply)))
+
+
+def estimated_total_assets_float(
+    reserve_boo,
+    reserve_xboo,
+    lp_supply,
+    our_lp,
+    boo_in_xboo,
+    xboo_supply,
+    loose_boo,
+    loose_xboo,
+):
+    """``estimated_total_assets`` in float64."""
+    share = np.where(lp_supply == 0, 0.0, our_lp / _safe(lp_supply))
+    return (
+        xboo_to_boo_float(boo_in_xboo, xboo_supply, share * reserve_xboo + loose_xboo)
+        + loose_boo
+        + share * reserve_boo
+    )
+
+
+def deposit_split_float(
+    reserve_boo, reserve_xboo, boo_in_xboo, xboo_supply, boo, loose_xboo
+):
+    """``deposit_split`` in float64: arrays of (boo to enter, xboo to leave)."""
+    boo_side = boo * reserve_xboo
+    xboo_side = loose_xboo * reserve_boo
+    excess = boo_side - xboo_side
+    boo_to_enter = (
+        np.maximum(excess, 0.0)
+        * boo_in_xboo
+        / _safe(reserve_xboo * boo_in_xboo + reserve_boo * xboo_supply)
+    )
+    xboo_to_leave = (
+        np.maximum(-excess, 0.0)
+        * xboo_supply
+        / _safe(reserve_boo * xboo_supply + reserve_xboo * boo_in_xboo)
+    )
+    return boo_to_enter, xboo_to_leave
+
+
+def boo_to_lp_tokens_float(
+    reserve_boo, reserve_xboo, lp_supply, boo_in_xboo, xboo_supply, amount
+):
+    """``boo_to_lp_tokens`` in float64, without the few wei of padding the contract
+    rounds up by.
+    """
+    denominator = reserve_boo * xboo_supply + reserve_xboo * boo_in_xboo
+    zero = (amount == 0) | (denominator == 0)
+    return np.where(zero, 0.0, amount * lp_supply * (xboo_supply / _safe(denominator)))
+
+
+def lp_price_in_range_float(approx, exact, lp_slippage):
+    """``lp_price_in_range``, exact, screened in float64.
+
+    ``approx`` is ``(reserve_boo, reserve_xboo, boo_in_xboo, xboo_supply)``
+    through ``as_float`` and ``exact`` the same arrays through ``as_uint``.
+    States near either edge of the gate are decided by ``lp_price_in_range``.
+    """
+    (reserve_boo, reserve_xboo, boo_in_xboo, xboo_supply) = approx
+    slippage = np.asarray(lp_slippage, dtype=np.float64) / 1000
+    empty = (reserve_boo == 0) | (reserve_xboo == 0)
+    ratio_lp = reserve_boo / _safe(reserve_xboo)
+    ratio_xboo = np.where(xboo_supply == 0, 0.0, boo_in_xboo / _safe(xboo_supply))
+    low_edge = ratio_xboo * slippage
+    high_edge = ratio_lp * slippage
+    in_range = ~empty & (ratio_lp >= low_edge) & (ratio_xboo >= high_edge)
+
+    unsure = np.flatnonzero(
+        ~empty & (_near(ratio_lp, low_edge) | _near(ratio_xboo, high_edge))
+    )
+    if len(unsure):
+        slippages = np.broadcast_to(
+            np.asarray(lp_slippage, dtype=object), in_range.shape
+        )
+        in_range[unsure] = lp_price_in_range(
+            *(column[unsure] for column in exact), slippages[unsure]
+        )
+    return in_range
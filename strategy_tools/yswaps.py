@@ -0,0 +1,571 @@
+"""Build ySwaps ``execute`` payloads for selling our strategies' rewards.
+
+Give it ``Trade(strategy, token_in, token_out, amount)`` and it returns the
+calldata a mechanic sends to the trade factory: the best route across the
+Spooky and Solidly routers (direct or through a connector like WFTM, mixing
+venues hop by hop), encoded for the multicall swapper with a min out.
+
+Pools are discovered once and their reserves are read once per block for a
+whole batch of trades, through Multicall3. Routes are then quoted off-chain
+with the exact integer maths in ``strategy_tools.model``, so the quotes match
+the routers to the wei at the block they were read.
+
+    async with RpcClient(endpoint) as rpc:
+        cache = QuoteCache(rpc)
+        payloads = await build_payloads(cache, [Trade(strategy, sex, boo, amount)])
+"""
+import itertools
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from eth_abi import decode_abi, encode_abi
+from eth_utils import function_signature_to_4byte_selector, to_checksum_address
+
+from strategy_tools import model, split_route
+from strategy_tools.multicall import MULTICALL3, aggregate3
+from strategy_tools.rpc import RpcClient
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+MAX_UINT = 2 ** 256 - 1
+WFTM = "0x21be370D5312f44cB42ce377BC9b8a0cEF1A4C83"
+TRADE_FACTORY = "0xD3f89C21719Ec5961a3E6B0f9bBf9F9b4180E9e9"
+MULTICALL_SWAPPER = "0x590B3e12Ded77dE66CBF45050cD07a65d1F51dDD"
+CALL_ONLY_NO_VALUE = 5  # the multicall swapper's optimization flag for plain calls
+SPOOKY_FEE = 0.998
+SOLIDLY_FEE = 0.9999
+# a route that changes venue only passes on this much less than quoted, so the next
+# venue's swap still has its tokens when reserves move between our quote and the trade
+HOP_SLIPPAGE_BPS = 10
+
+
+class Venue(NamedTuple):
+    name: str
+    router: str
+    factory: str
+    # solidly style pairs (stable and volatile, route structs) or uniswap v2 style
+    solidly: bool
+
+
+SPOOKY = Venue(
+    "spooky",
+    "0xF491e7B69E4244ad4002BC14e878a34207E38c29",
+    "0x152eE697f2E276fA89E96742e9bB9aB1F2E61bE3",
+    False,
+)
+SOLIDLY = Venue(
+    "solidly",
+    "0xa38cd27185a464914D3046f0AB9d43356B34829D",
+    "0x3fAaB499b519fdC5819e3D7ed0C26111904cbc28",
+    True,
+)
+DEFAULT_VENUES = (SPOOKY, SOLIDLY)
+
+
+def _selector(signature: str) -> bytes:
+    return function_signature_to_4byte_selector(signature)
+
+
+GET_PAIR_V2 = _selector("getPair(address,address)")
+GET_PAIR_SOLIDLY = _selector("getPair(address,address,bool)")
+GET_RESERVES = _selector("getReserves()")
+DECIMALS = _selector("decimals()")
+APPROVE = _selector("approve(address,uint256)")
+SWAP_V2 = _selector(
+    "swapExactTokensForTokens(uint256,uint256,address[],address,uint256)"
+)
+SWAP_SOLIDLY = _selector(
+    "swapExactTokensForTokens(uint256,uint256,(address,address,bool)[],address,uint256)"
+)
+EXECUTE = _selector("execute((address,address,address,uint256,uint256),address,bytes)")
+
+
+class Trade(NamedTuple):
+    strategy: str
+    token_in: str
+    token_out: str
+    amount: int
+
+
+class Pool(NamedTuple):
+    venue: Venue
+    address: str
+    token0: str
+    token1: str
+    stable: bool = False
+
+
+class Hop(NamedTuple):
+    pool: Pool
+    token_in: str
+    token_out: str
+    amount_in: int
+    amount_out: int
+
+
+class Route(NamedTuple):
+    hops: Tuple[Hop, ...]
+
+    @property
+    def amount_out(self) -> int:
+        return self.hops[-1].amount_out
+
+    @property
+    def venues(self) -> List[str]:
+        return [hop.pool.venue.name for hop in self.hops]
+
+
+class Payload(NamedTuple):
+    trade: Trade
+    # one route, or a split across routes that don't share a pool
+    routes: Tuple[Route, ...]
+    amount_out: int
+    min_amount_out: int
+    block: int
+    swapper_data: bytes  # what the multicall swapper runs
+    calldata: str  # trade factory execute(...) calldata
+
+    @property
+    def route(self) -> Route:
+        return self.routes[0]
+
+
+def _sorted(token_a: str, token_b: str) -> Tuple[str, str]:
+    return (
+        (token_a, token_b)
+        if int(token_a, 16) < int(token_b, 16)
+        else (token_b, token_a)
+    )
+
+
+class QuoteCache:
+    """Pools between our tokens (found once) and their reserves (read once per block).
+    """
+
+    def __init__(
+        self,
+        rpc: RpcClient,
+        venues: Sequence[Venue] = DEFAULT_VENUES,
+        connectors: Sequence[str] = (WFTM,),
+        multicall: str = MULTICALL3,
+        hop_slippage_bps: int = HOP_SLIPPAGE_BPS,
+    ):
+        self.rpc = rpc
+        self.venues = venues
+        self.connectors = [to_checksum_address(connector) for connector in connectors]
+        self.multicall = multicall
+        self.hop_slippage_bps = hop_slippage_bps
+        self.pools: Dict[Tuple[str, str], List[Pool]] = {}
+        self.decimals: Dict[str, int] = {}
+        self.block: Optional[int] = None
+        self.reserves: Dict[str, Tuple[int, int]] = {}
+
+    def _hop_pairs(
+        self, token_in: str, token_out: str, max_hops: int
+    ) -> Iterable[Tuple[str, str]]:
+        for path in self._paths(token_in, token_out, max_hops):
+            yield from zip(path, path[1:])
+
+    def _paths(
+        self, token_in: str, token_out: str, max_hops: int
+    ) -> Iterable[Tuple[str, ...]]:
+        middle = [
+            connector
+            for connector in self.connectors
+            if connector not in (token_in, token_out)
+        ]
+        for hops in range(1, max_hops + 1):
+            for connectors in itertools.permutations(middle, hops - 1):
+                yield (token_in, *connectors, token_out)
+
+    async def prepare(
+        self, token_pairs: Iterable[Tuple[str, str]], block: int, max_hops: int = 2
+    ) -> None:
+        """Make sure we know every pool and its reserves at ``block`` for these trades.
+        """
+        if block != self.block:
+            # reserves added by hand before the first block stand for that block
+            if self.block is not None:
+                self.reserves = {}
+            self.block = block
+
+        # pools and decimals never change, one round-trip for anything we haven't seen
+        wanted = set()
+        for token_in, token_out in token_pairs:
+            for pair in self._hop_pairs(
+                to_checksum_address(token_in), to_checksum_address(token_out), max_hops
+            ):
+                wanted.add(_sorted(*pair))
+        unknown = sorted(pair for pair in wanted if pair not in self.pools)
+        tokens = sorted(
+            {token for pair in unknown for token in pair if token not in self.decimals}
+        )
+        calls, keys = [], []
+        for token0, token1 in unknown:
+            for venue in self.venues:
+                for stable in (False, True) if venue.solidly else (False,):
+                    if venue.solidly:
+                        data = GET_PAIR_SOLIDLY + encode_abi(
+                            ["address", "address", "bool"], [token0, token1, stable]
+                        )
+                    else:
+                        data = GET_PAIR_V2 + encode_abi(
+                            ["address", "address"], [token0, token1]
+                        )
+                    calls.append((venue.factory, data))
+                    keys.append(("pool", (token0, token1), venue, stable))
+        for token in tokens:
+            calls.append((token, DECIMALS))
+            keys.append(("decimals", token, None, None))
+        for pair in unknown:
+            self.pools[pair] = []
+        for (kind, key, venue, stable), (success, output) in zip(
+            keys, await self._aggregate(calls, "latest")
+        ):
+            if not success or not output:
+                continue
+            if kind == "decimals":
+                self.decimals[key] = 10 ** decode_abi(["uint256"], output)[0]
+                continue
+            address = to_checksum_address(decode_abi(["address"], output)[0])
+            if address != ZERO_ADDRESS:
+                self.pools[key].append(Pool(venue, address, key[0], key[1], stable))
+
+        # reserves, once per block
+        pools = [
+            pool
+            for pair in wanted
+            for pool in self.pools[pair]
+            if pool.address not in self.reserves
+        ]
+        results = await self._aggregate(
+            [(pool.address, GET_RESERVES) for pool in pools], block
+        )
+        for pool, (success, output) in zip(pools, results):
+            # uniswap v2 returns uint112s and a uint32, solidly uint256s; both decode as
+            # uint256
+            self.reserves[pool.address] = (
+                decode_abi(["uint256", "uint256", "uint256"], output)[:2]
+                if success
+                else (0, 0)
+            )
+
+    async def _aggregate(self, calls, block):
+        return await aggregate3(self.rpc, calls, block, self.multicall)
+
+    def add_pool(
+        self,
+        pool: Pool,
+        reserves: Tuple[int, int],
+        decimals: Tuple[int, int] = (10 ** 18, 10 ** 18),
+    ):
+        """Put a pool in the cache by hand, for quoting off a snapshot of reserves."""
+        self.pools.setdefault((pool.token0, pool.token1), []).append(pool)
+        self.reserves[pool.address] = tuple(reserves)
+        self.decimals.setdefault(pool.token0, decimals[0])
+        self.decimals.setdefault(pool.token1, decimals[1])
+
+    def amount_out(self, pool: Pool, token_in: str, amount_in: int) -> int:
+        """What ``pool`` pays out for ``amount_in`` of ``token_in`` at our block,
+        exactly like the pair.
+        """
+        (reserve0, reserve1) = self.reserves[pool.address]
+        if token_in == pool.token0:
+            (reserve_in, reserve_out, token_out) = (reserve0, reserve1, pool.token1)
+        else:
+            (reserve_in, reserve_out, token_out) = (reserve1, reserve0, pool.token0)
+        if pool.venue.solidly:
+            return model.solidly_amount_out(
+                amount_in,
+                reserve_in,
+                reserve_out,
+                pool.stable,
+                self.decimals.get(token_in, 10 ** 18),
+                self.decimals.get(token_out, 10 ** 18),
+            )
+        return model.uniswap_v2_amount_out(amount_in, reserve_in, reserve_out)
+
+    def candidates(
+        self, token_in: str, token_out: str, max_hops: int = 2
+    ) -> List[Tuple[Tuple[Pool, str, str], ...]]:
+        """Every path and every pool on each hop, as ``(pool, token_in, token_out)``
+        hops.
+        """
+        token_in, token_out = (
+            to_checksum_address(token_in),
+            to_checksum_address(token_out),
+        )
+        routes = []
+        for path in self._paths(token_in, token_out, max_hops):
+            steps = list(zip(path, path[1:]))
+            for pools in itertools.product(
+                *[self.pools.get(_sorted(a, b), []) for a, b in steps]
+            ):
+                routes.append(tuple((pool, a, b) for pool, (a, b) in zip(pools, steps)))
+        return routes
+
+    def quote(
+        self, candidate: Sequence[Tuple[Pool, str, str]], amount: int
+    ) -> Optional[Route]:
+        """Exact quote of ``amount`` down one candidate, ``None`` if a pair would revert
+        or pay nothing.
+
+        Where the route changes venue the next hop only swaps ``hop_slippage_bps`` less
+        than the last one paid out, that's the previous venue's min out. The rest is
+        left with the swapper.
+        """
+        hops = []
+        try:
+            for pool, token_in, token_out in candidate:
+                if hops and hops[-1].pool.venue != pool.venue:
+                    amount = (
+                        amount
+                        * (model.BASIS_POINTS - self.hop_slippage_bps)
+                        // model.BASIS_POINTS
+                    )
+                amount_out = self.amount_out(pool, token_in, amount)
+                hops.append(Hop(pool, token_in, token_out, amount, amount_out))
+                amount = amount_out
+        except model.Revert:
+            return None
+        return Route(tuple(hops)) if amount > 0 else None
+
+    def best_route(
+        self, token_in: str, token_out: str, amount: int, max_hops: int = 2
+    ) -> Optional[Route]:
+        """The route paying the most ``token_out``, trying every path and every pool on
+        each hop.
+        """
+        best = None
+        for candidate in self.candidates(token_in, token_out, max_hops):
+            route = self.quote(candidate, amount)
+            if route is not None and (
+                best is None or route.amount_out > best.amount_out
+            ):
+                best = route
+        return best
+
+    def curves(
+        self, candidates: Sequence[Sequence[Tuple[Pool, str, str]]]
+    ) -> split_route.RouteCurves:
+        """The candidates and their pools' reserves as arrays for
+        :mod:`strategy_tools.split_route`.
+        """
+        pools: Dict[str, int] = {}
+        depth = max((len(candidate) for candidate in candidates), default=1)
+        index = np.full((len(candidates), depth), -1, dtype=int)
+        zero_for_one = np.zeros((len(candidates), depth), dtype=bool)
+        for r, candidate in enumerate(candidates):
+            for h, (pool, token_in, _) in enumerate(candidate):
+                index[r, h] = pools.setdefault(pool.address, len(pools))
+                zero_for_one[r, h] = token_in == pool.token0
+        by_address = {
+            pool.address: pool for candidate in candidates for pool, _, _ in candidate
+        }
+        ordered = [by_address[address] for address in pools]
+        reserves = np.array(
+            [
+                [
+                    self.reserves[pool.address][0]
+                    / self.decimals.get(pool.token0, 10 ** 18),
+                    self.reserves[pool.address][1]
+                    / self.decimals.get(pool.token1, 10 ** 18),
+                ]
+                for pool in ordered
+            ],
+            dtype=float,
+        ).reshape(-1, 2)
+        stable = np.array([pool.stable for pool in ordered], dtype=bool)
+        fee = np.array(
+            [SOLIDLY_FEE if pool.venue.solidly else SPOOKY_FEE for pool in ordered],
+            dtype=float,
+        )
+        return split_route.RouteCurves(index, zero_for_one, reserves, stable, fee)
+
+    def split_routes(
+        self,
+        token_in: str,
+        token_out: str,
+        amount: int,
+        max_hops: int = 2,
+        steps: int = 64,
+    ) -> Tuple[Route, ...]:
+        """Best split of ``amount`` across routes that don't share a pool, each quoted
+        exactly.
+
+        Falls back to the single best route whenever that pays more.
+        """
+        candidates = self.candidates(token_in, token_out, max_hops)
+        single = self.best_route(token_in, token_out, amount, max_hops)
+        if single is None:
+            return ()
+        scale = self.decimals.get(to_checksum_address(token_in), 10 ** 18)
+        allocations = split_route.split_amount(
+            self.curves(candidates), amount, scale, steps
+        )
+        routes = [
+            self.quote(candidate, int(a))
+            for candidate, a in zip(candidates, allocations)
+            if a > 0
+        ]
+        if (
+            None in routes
+            or sum(route.amount_out for route in routes) <= single.amount_out
+        ):
+            return (single,)
+        return tuple(
+            sorted(routes, key=lambda route: route.hops[0].amount_in, reverse=True)
+        )
+
+
+def _segments(route: Route) -> List[List[Hop]]:
+    """Consecutive hops on the same venue go through its router in one call."""
+    segments: List[List[Hop]] = []
+    for hop in route.hops:
+        if segments and segments[-1][-1].pool.venue == hop.pool.venue:
+            segments[-1].append(hop)
+        else:
+            segments.append([hop])
+    return segments
+
+
+def _route_calls(
+    route: Route, receiver: str, min_amount_out: int, swapper: str
+) -> List[Tuple[str, bytes]]:
+    calls = []
+    segments = _segments(route)
+    for i, segment in enumerate(segments):
+        last = i == len(segments) - 1
+        venue = segment[0].pool.venue
+        amount_in = segment[0].amount_in
+        # a venue's min out is what the next venue swaps, so it's always there to swap
+        (to, amount_out_min) = (
+            (receiver, min_amount_out)
+            if last
+            else (swapper, segments[i + 1][0].amount_in)
+        )
+        calls.append(
+            (
+                segment[0].token_in,
+                APPROVE + encode_abi(["address", "uint256"], [venue.router, amount_in]),
+            )
+        )
+        if venue.solidly:
+            steps = [(hop.token_in, hop.token_out, hop.pool.stable) for hop in segment]
+            data = SWAP_SOLIDLY + encode_abi(
+                [
+                    "uint256",
+                    "uint256",
+                    "(address,address,bool)[]",
+                    "address",
+                    "uint256",
+                ],
+                [amount_in, amount_out_min, steps, to, MAX_UINT],
+            )
+        else:
+            path = [segment[0].token_in] + [hop.token_out for hop in segment]
+            data = SWAP_V2 + encode_abi(
+                ["uint256", "uint256", "address[]", "address", "uint256"],
+                [amount_in, amount_out_min, path, to, MAX_UINT],
+            )
+        calls.append((venue.router, data))
+    return calls
+
+
+def encode_swapper_data(
+    routes: Sequence[Route],
+    receiver: str,
+    min_amounts_out: Sequence[int],
+    swapper: str = MULTICALL_SWAPPER,
+) -> bytes:
+    """The multicall swapper's packed calls: approve and swap on each venue in turn,
+    route after route.
+
+    Each venue's swap has a min out of what the next one swaps, ``hop_slippage_bps``
+    under its quote, so a payload survives reserves moving that much on the way. The
+    final min out covers the whole route.
+    """
+    packed = bytes([CALL_ONLY_NO_VALUE])
+    for route, min_amount_out in zip(routes, min_amounts_out):
+        for to, data in _route_calls(route, receiver, min_amount_out, swapper):
+            packed += bytes.fromhex(to[2:]) + len(data).to_bytes(32, "big") + data
+    return packed
+
+
+def encode_execute(
+    trade: Trade, min_amount_out: int, swapper: str, swapper_data: bytes
+) -> str:
+    """Trade factory ``execute(AsyncTradeExecutionDetails, swapper, data)`` calldata."""
+    details = (
+        trade.strategy,
+        trade.token_in,
+        trade.token_out,
+        trade.amount,
+        min_amount_out,
+    )
+    encoded = encode_abi(
+        ["(address,address,address,uint256,uint256)", "address", "bytes"],
+        [details, swapper, swapper_data],
+    )
+    return "0x" + (EXECUTE + encoded).hex()
+
+
+async def build_payloads(
+    cache: QuoteCache,
+    trades: Sequence[Trade],
+    block: Optional[int] = None,
+    slippage_bps: int = 50,
+    swapper: str = MULTICALL_SWAPPER,
+    max_hops: int = 2,
+    split_steps: Optional[int] = None,
+) -> List[Optional[Payload]]:
+    """Payloads for many trades at once, ``None`` for a trade with no route.
+
+    All quotes come from one block, the latest unless ``block`` is given. With
+    ``split_steps`` each sale is split across routes in that many chunks by
+    :mod:`strategy_tools.split_route`.
+    """
+    trades = [
+        Trade(
+            to_checksum_address(t.strategy),
+            to_checksum_address(t.token_in),
+            to_checksum_address(t.token_out),
+            t.amount,
+        )
+        for t in trades
+    ]
+    if block is None:
+        block = await cache.rpc.block_number()
+    await cache.prepare([(t.token_in, t.token_out) for t in trades], block, max_hops)
+
+    payloads: List[Optional[Payload]] = []
+    for trade in trades:
+        if not trade.amount:
+            routes = ()
+        elif split_steps:
+            routes = cache.split_routes(
+                trade.token_in, trade.token_out, trade.amount, max_hops, split_steps
+            )
+        else:
+            route = cache.best_route(
+                trade.token_in, trade.token_out, trade.amount, max_hops
+            )
+            routes = (route,) if route else ()
+        if not routes:
+            payloads.append(None)
+            continue
+        amount_out = sum(route.amount_out for route in routes)
+        min_amounts_out = [
+            route.amount_out * (model.BASIS_POINTS - slippage_bps) // model.BASIS_POINTS
+            for route in routes
+        ]
+        min_amount_out = sum(min_amounts_out)
+        swapper_data = encode_swapper_data(
+            routes, trade.strategy, min_amounts_out, swapper
+        )
+        calldata = encode_execute(trade, min_amount_out, swapper, swapper_data)
+        payloads.append(
+            Payload(
+                trade, routes, amount_out, min_amount_out, block, swapper_data, calldata
+            )
+        )
+    return payloads
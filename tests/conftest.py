@@ -1,5 +1,15 @@
+import json
+import os
+from collections import defaultdict
+from pathlib import Path
+
 import pytest
-from brownie import config, Wei, Contract
+from brownie import config, network, project, Wei, Contract
+
+from strategy_tools import model
+from strategy_tools.gas_profiler import profile_transaction
+
+from mock_ecosystem import deploy_mock_ecosystem, fund
 
 # Snapshots the chain before each test and reverts after test completion.
 
@@ -9,6 +19,40 @@ def isolation(fn_isolation):
     pass
 
 
+# on a development chain (brownie test --network development) we run against local mocks
+@pytest.fixture(scope="session")
+def offline():
+    yield "fork" not in network.show_active()
+
+
+# our mocks, written to the fantom addresses below so the suite runs without an RPC, or
+# None on a fork. module_isolation resets the chain at the start of every module, so we
+# etch right after it
+@pytest.fixture(scope="module", autouse=True)
+def mock_ecosystem(offline, module_isolation):
+    if not offline:
+        yield None
+        return
+    ecosystem = deploy_mock_ecosystem(project.get_loaded_projects()[0])
+    fund(
+        [
+            "0x95478C4F7D22D1048F46100001c2C69D2BA57380",  # whale
+            "0xC0E2830724C946a6748dDFE09753613cd38f6767",  # gov
+            "0x72a34AbafAB09b15E7191822A679f28E067C4a16",  # strategist_ms
+            "0xBedf3Cf16ba1FcE6c3B751903Cf77E51d51E05b8",  # strategist, keeper, rewards
+            "0x9f2A061d6fEF20ad3A656e23fd9C814b75fd5803",  # ymechs_safe
+        ]
+    )
+    yield ecosystem
+
+
+# our mock when offline, the live contract otherwise
+def live_or_mock(mock_ecosystem, name, address):
+    if mock_ecosystem is not None:
+        return getattr(mock_ecosystem, name)
+    return Contract(address)
+
+
 # this is the name we want to give our strategy
 @pytest.fixture(scope="module")
 def strategy_name():
@@ -17,8 +61,10 @@ def strategy_name():
 
 
 @pytest.fixture(scope="module")
-def wftm():
-    yield Contract("0x21be370D5312f44cB42ce377BC9b8a0cEF1A4C83")
+def wftm(mock_ecosystem):
+    yield live_or_mock(
+        mock_ecosystem, "wftm", "0x21be370D5312f44cB42ce377BC9b8a0cEF1A4C83"
+    )
 
 
 @pytest.fixture(scope="module")
@@ -27,13 +73,17 @@ def weth():
 
 
 @pytest.fixture(scope="module")
-def sex():
-    yield Contract("0xD31Fcd1f7Ba190dBc75354046F6024A9b86014d7")
+def sex(mock_ecosystem):
+    yield live_or_mock(
+        mock_ecosystem, "sex", "0xD31Fcd1f7Ba190dBc75354046F6024A9b86014d7"
+    )
 
 
 @pytest.fixture(scope="module")
-def solid():
-    yield Contract("0x888EF71766ca594DED1F0FA3AE64eD2941740A20")
+def solid(mock_ecosystem):
+    yield live_or_mock(
+        mock_ecosystem, "solid", "0x888EF71766ca594DED1F0FA3AE64eD2941740A20"
+    )
 
 
 @pytest.fixture(scope="module")
@@ -57,18 +107,24 @@ def mim():
 
 
 @pytest.fixture(scope="module")
-def boo():
-    yield Contract("0x841FAD6EAe12c286d1Fd18d1d525DFfA75C7EFFE")
+def boo(mock_ecosystem):
+    yield live_or_mock(
+        mock_ecosystem, "boo", "0x841FAD6EAe12c286d1Fd18d1d525DFfA75C7EFFE"
+    )
 
 
 @pytest.fixture(scope="module")
-def xboo():
-    yield Contract("0xa48d959AE2E88f1dAA7D5F611E01908106dE7598")
+def xboo(mock_ecosystem):
+    yield live_or_mock(
+        mock_ecosystem, "xboo", "0xa48d959AE2E88f1dAA7D5F611E01908106dE7598"
+    )
 
 
 @pytest.fixture(scope="module")
-def lpdepositer():
-    yield Contract("0x26E1A0d851CF28E697870e1b7F053B605C8b060F")
+def lpdepositer(mock_ecosystem):
+    yield live_or_mock(
+        mock_ecosystem, "lpdepositer", "0x26E1A0d851CF28E697870e1b7F053B605C8b060F"
+    )
 
 
 # Define relevant tokens and contracts in this section
@@ -80,8 +136,7 @@ def token(boo):
 @pytest.fixture(scope="module")
 def whale(accounts):
     # Update this with a large holder of your want token (the largest EOA holder of LP)
-    whale = accounts.at(
-        "0x95478C4F7D22D1048F46100001c2C69D2BA57380", force=True)
+    whale = accounts.at("0x95478C4F7D22D1048F46100001c2C69D2BA57380", force=True)
     yield whale
 
 
@@ -97,34 +152,61 @@ def amount(token):  # use today's exchange rates to have similar $$ amounts
 
 
 @pytest.fixture(scope="module")
-def reward_token(accounts):
-    reward_token = Contract("0xc165d941481e68696f43EE6E99BFB2B23E0E3114")
-    yield reward_token
+def reward_token(mock_ecosystem):
+    yield live_or_mock(
+        mock_ecosystem, "reward_token", "0xc165d941481e68696f43EE6E99BFB2B23E0E3114"
+    )
 
 
 @pytest.fixture(scope="module")
-def healthCheck():
-    yield Contract("0xf13Cd6887C62B5beC145e30c38c4938c5E627fe0")
+def healthCheck(mock_ecosystem):
+    yield live_or_mock(
+        mock_ecosystem, "health_check", "0xf13Cd6887C62B5beC145e30c38c4938c5E627fe0"
+    )
 
 
 @pytest.fixture(scope="module")
-def liveBooStrat():
+def liveBooStrat(offline):
+    if offline:
+        pytest.skip("needs the live strategy, run this on a fork")
     yield Contract("0xADE3BaC94177295329474aAd6A253Bae979BFA68")
 
 
 @pytest.fixture(scope="module")
-def multicall_swapper():
-    yield Contract("0x590B3e12Ded77dE66CBF45050cD07a65d1F51dDD")
+def multicall_swapper(mock_ecosystem):
+    yield live_or_mock(
+        mock_ecosystem,
+        "multicall_swapper",
+        "0x590B3e12Ded77dE66CBF45050cD07a65d1F51dDD",
+    )
+
+
+@pytest.fixture(scope="module")
+def spooky_router(mock_ecosystem):
+    yield live_or_mock(
+        mock_ecosystem, "spooky_router", "0xF491e7B69E4244ad4002BC14e878a34207E38c29"
+    )
+
+
+@pytest.fixture(scope="module")
+def solidex_router(mock_ecosystem):
+    yield live_or_mock(
+        mock_ecosystem, "solidly_router", "0xa38cd27185a464914D3046f0AB9d43356B34829D"
+    )
 
 
 @pytest.fixture(scope="module")
-def spooky_router():
-    yield Contract("0xF491e7B69E4244ad4002BC14e878a34207E38c29")
+def solidly_factory(mock_ecosystem):
+    yield live_or_mock(
+        mock_ecosystem, "solidly_factory", "0x3fAaB499b519fdC5819e3D7ed0C26111904cbc28"
+    )
 
 
 @pytest.fixture(scope="module")
-def solidex_router():
-    yield Contract("0xa38cd27185a464914D3046f0AB9d43356B34829D")
+def solidly_voter(mock_ecosystem):
+    yield live_or_mock(
+        mock_ecosystem, "solidly_voter", "0xdC819F5d05a6859D2faCbB4A44E5aB105762dbaE"
+    )
 
 
 # zero address
@@ -165,10 +247,12 @@ def guardian(accounts):
     yield accounts[2]
 
 
-@pytest.fixture
-def trade_factory():
+@pytest.fixture(scope="module")
+def trade_factory(mock_ecosystem):
     # yield Contract("0xBf26Ff7C7367ee7075443c4F95dEeeE77432614d")
-    yield Contract("0xD3f89C21719Ec5961a3E6B0f9bBf9F9b4180E9e9")
+    yield live_or_mock(
+        mock_ecosystem, "trade_factory", "0xD3f89C21719Ec5961a3E6B0f9bBf9F9b4180E9e9"
+    )
 
 
 @pytest.fixture(scope="module")
@@ -176,7 +260,7 @@ def management(accounts):
     yield accounts[3]
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def ymechs_safe(accounts):
     yield accounts.at("0x9f2A061d6fEF20ad3A656e23fd9C814b75fd5803", force=True)
 
@@ -192,8 +276,9 @@ def strategist(accounts):
 #     yield Contract("0xC1810aa7F733269C39D640f240555d0A4ebF4264")
 
 
-# use this if you need to deploy the vault
-@pytest.fixture(scope="function")
+# use this if you need to deploy the vault. vault and strategy are deployed once per
+# module, fn_isolation's snapshot hands every test a fresh copy of them
+@pytest.fixture(scope="module")
 def vault(pm, gov, rewards, guardian, management, token, chain):
     Vault = pm(config["dependencies"][0]).Vault
     vault = guardian.deploy(Vault)
@@ -212,27 +297,14 @@ def vault(pm, gov, rewards, guardian, management, token, chain):
 
 
 # replace the first value with the name of your strategy
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="module")
 def strategy(
-    Strategy,
-    strategist,
-    keeper,
-    vault,
-    gov,
-    strategy_name,
-    trade_factory,
-    ymechs_safe
+    Strategy, strategist, keeper, vault, gov, strategy_name, trade_factory, ymechs_safe
 ):
     # make sure to include all constructor parameters needed here
-    strategy = strategist.deploy(
-        Strategy,
-        vault,
-        strategy_name
-
-    )
+    strategy = strategist.deploy(Strategy, vault, strategy_name)
     trade_factory.grantRole(
-        trade_factory.STRATEGY(), strategy, {
-            "from": ymechs_safe, "gas_price": "0 gwei"}
+        trade_factory.STRATEGY(), strategy, {"from": ymechs_safe, "gas_price": "0 gwei"}
     )
     strategy.setKeeper(keeper, {"from": gov})
     # set our management fee to zero so it doesn't mess with our profit checking
@@ -249,3 +321,164 @@ def strategy(
 #     # parameters for this are: strategy, vault, max deposit, minTimePerInvest, slippage protection (10000 = 100% slippage allowed),
 #     strategy = Contract("0xC1810aa7F733269C39D640f240555d0A4ebF4264")
 #     yield strategy
+
+
+# a stable boo/xboo pair with a gauge, seeded so our lpSlippage check passes
+@pytest.fixture
+def stable_pool(
+    solidly_factory, solidly_voter, solidex_router, boo, xboo, whale, strategy
+):
+    zero = "0x0000000000000000000000000000000000000000"
+    if solidly_factory.getPair(boo, xboo, True) == zero:
+        solidly_factory.createPair(boo, xboo, True, {"from": whale})
+    pair = solidly_factory.getPair(boo, xboo, True)
+    if solidly_voter.gauges(pair) == zero:
+        solidly_voter.createGauge(pair, {"from": whale})
+
+    # seed at parity: the stable curve prices xboo at xboo's own rate, not at our
+    # reserve ratio
+    seed = 100 * 10 ** 18
+    boo.approve(xboo, 2 ** 256 - 1, {"from": whale})
+    xboo.enter(seed, {"from": whale})
+    xboo_seed = xboo.BOOForxBOO(seed)
+    boo_seed = (
+        xboo_seed * model.stable_reserve_ratio(xboo.xBOOForBOO(10 ** 18)) // 10 ** 18
+    )
+    boo.approve(solidex_router, 2 ** 256 - 1, {"from": whale})
+    xboo.approve(solidex_router, 2 ** 256 - 1, {"from": whale})
+    solidex_router.addLiquidity(
+        boo,
+        xboo,
+        True,
+        boo_seed,
+        xboo_seed,
+        0,
+        0,
+        whale,
+        2 ** 256 - 1,
+        {"from": whale},
+    )
+    # same abi as our volatile pair, this also works for pairs our mock factory deploys
+    # offline
+    yield Contract.from_abi("SolidlyPair", pair, Contract(strategy.pools(0)[0]).abi)
+
+
+# gas snapshot of our local contracts on a development chain. a path that costs
+# GAS_REGRESSION_PCT more than its snapshot fails. one missing from it is recorded on
+# its first run, --update-gas-snapshot re-records all
+class GasSnapshot:
+    def __init__(self, path, regression_pct, update, profile_dir=None):
+        self.path = None if path is None else Path(path)
+        self.regression_pct = regression_pct
+        self.update = update
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.recorded = (
+            json.loads(self.path.read_text())
+            if self.path is not None and self.path.exists()
+            else {}
+        )
+        self.dirty = False
+
+    # pass the receipt too and GAS_PROFILE_DIR gets a per-function profile of it
+    def check(self, name, gas_used, tx=None):
+        if tx is not None and self.profile_dir is not None:
+            profile_transaction(tx).write(self.profile_dir / name)
+        previous = self.recorded.get(name)
+        change = (
+            ""
+            if previous is None
+            else f" ({(gas_used - previous) / previous:+.1%} vs {previous} in snapshot)"
+        )
+        print(f"\n{name}: {gas_used} gas{change}")
+        # on a fork we run against live contracts whose state keeps moving, so we only
+        # print there
+        if self.path is None:
+            return
+        # a path we haven't recorded yet is recorded on its first run, and checked from
+        # then on
+        if self.update or previous is None:
+            self.dirty = self.dirty or previous != gas_used
+            self.recorded[name] = gas_used
+            return
+        limit = previous * (100 + self.regression_pct) / 100
+        assert gas_used <= limit, (
+            f"{name} regressed: {gas_used} gas vs {previous} in snapshot "
+            f"(+{self.regression_pct}% allowed)"
+        )
+
+    def save(self):
+        if self.dirty:
+            self.path.write_text(
+                json.dumps(self.recorded, indent=2, sort_keys=True) + "\n"
+            )
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-gas-snapshot",
+        action="store_true",
+        help="record our gas benchmarks in tests/gas_snapshot.json, don't check them",
+    )
+
+
+@pytest.fixture(scope="session")
+def gas_snapshot(offline, request):
+    snapshot = GasSnapshot(
+        Path(__file__).parent / "gas_snapshot.json" if offline else None,
+        float(os.environ.get("GAS_REGRESSION_PCT", 5)),
+        request.config.getoption("--update-gas-snapshot"),
+        os.environ.get("GAS_PROFILE_DIR"),
+    )
+    yield snapshot
+    snapshot.save()
+
+
+# test durations, recorded on every run and used to schedule the slowest modules first.
+# run the suite in parallel with one chain per worker using pytest-xdist:
+#   brownie test -n 16 --dist loadfile
+# durations are kept in pytest's cache (.pytest_cache), not in our tree
+DURATIONS_KEY = "solidex/test_durations"
+recorded_durations = defaultdict(float)
+
+
+def load_durations(config):
+    cache = getattr(config, "cache", None)
+    return cache.get(DURATIONS_KEY, {}) if cache is not None else {}
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    durations = load_durations(config)
+    if not durations:
+        return
+    # tests we haven't timed yet go first, they could be long
+    unknown = max(durations.values())
+
+    def duration(item):
+        return durations.get(item.nodeid, unknown)
+
+    # keep each module's tests together so module fixtures are only set up once, slowest
+    # modules first. every xdist worker sorts the same way, so they all agree on the
+    # collection order
+    module_totals = defaultdict(float)
+    for item in items:
+        module_totals[item.fspath] += duration(item)
+    items.sort(key=lambda item: module_totals[item.fspath], reverse=True)
+
+
+# on xdist this runs on the controller too, which sees every worker's reports
+def pytest_runtest_logreport(report):
+    recorded_durations[report.nodeid] += report.duration
+
+
+def pytest_sessionfinish(session):
+    cache = getattr(session.config, "cache", None)
+    if (
+        hasattr(session.config, "workerinput")
+        or cache is None
+        or not recorded_durations
+    ):
+        return
+    durations = load_durations(session.config)
+    durations.update(recorded_durations)
+    cache.set(DURATIONS_KEY, durations)
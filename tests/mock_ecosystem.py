@@ -0,0 +1,199 @@
+"""Local stand-ins for everything our strategy touches on Fantom.
+
+``deploy_mock_ecosystem`` writes the runtime code of our mocks (see
+``contracts/mocks``) straight to the live addresses the strategy hardcodes,
+initializes them and seeds liquidity, so the test suite runs on a plain
+development chain with no RPC, archive node or explorer.
+
+Writing code needs ``evm_setAccountCode`` (ganache 7), ``hardhat_setCode`` or
+``anvil_setCode``.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+from brownie import accounts, chain, web3
+
+MAX_UINT = 2 ** 256 - 1
+PERIOD_SIZE = 1800  # solidly pairs take a twap observation at most this often
+
+# the live Fantom addresses we write our mocks to
+ADDRESSES = {
+    "boo": "0x841FAD6EAe12c286d1Fd18d1d525DFfA75C7EFFE",
+    "xboo": "0xa48d959AE2E88f1dAA7D5F611E01908106dE7598",
+    "sex": "0xD31Fcd1f7Ba190dBc75354046F6024A9b86014d7",
+    "solid": "0x888EF71766ca594DED1F0FA3AE64eD2941740A20",
+    "wftm": "0x21be370D5312f44cB42ce377BC9b8a0cEF1A4C83",
+    "reward_token": "0xc165d941481e68696f43EE6E99BFB2B23E0E3114",
+    "solidly_factory": "0x3fAaB499b519fdC5819e3D7ed0C26111904cbc28",
+    "solidly_router": "0xa38cd27185a464914D3046f0AB9d43356B34829D",
+    "solidly_voter": "0xdC819F5d05a6859D2faCbB4A44E5aB105762dbaE",
+    "boo_xboo_pair": "0x5804F6C40f44cF7593F73cf3aa16F7037213A623",
+    "lpdepositer": "0x26E1A0d851CF28E697870e1b7F053B605C8b060F",
+    "trade_factory": "0xD3f89C21719Ec5961a3E6B0f9bBf9F9b4180E9e9",
+    "multicall_swapper": "0x590B3e12Ded77dE66CBF45050cD07a65d1F51dDD",
+    "health_check": "0xf13Cd6887C62B5beC145e30c38c4938c5E627fe0",
+    "multicall3": "0xcA11bde05977b3631167028862bE2a173976CA11",
+    "spooky_factory": "0x152eE697f2E276fA89E96742e9bB9aB1F2E61bE3",
+    "spooky_router": "0xF491e7B69E4244ad4002BC14e878a34207E38c29",
+}
+
+CONTAINERS = {
+    "boo": "MockERC20",
+    "xboo": "MockXboo",
+    "sex": "MockERC20",
+    "solid": "MockERC20",
+    "wftm": "MockERC20",
+    "reward_token": "MockERC20",
+    "solidly_factory": "MockSolidlyFactory",
+    "solidly_router": "MockSolidlyRouter",
+    "solidly_voter": "MockSolidlyVoter",
+    "boo_xboo_pair": "MockSolidlyPair",
+    "lpdepositer": "MockLpDepositer",
+    "trade_factory": "MockTradeFactory",
+    "multicall_swapper": "MockMulticallSwapper",
+    "health_check": "MockHealthCheck",
+    "multicall3": "MockMulticall3",
+    "spooky_factory": "MockUniswapV2Factory",
+    "spooky_router": "MockUniswapV2Router",
+}
+
+TOKENS = {
+    "boo": ("SpookyToken", "BOO"),
+    "sex": ("Solidex", "SEX"),
+    "solid": ("Solidly", "SOLID"),
+    "wftm": ("Wrapped Fantom", "WFTM"),
+    "reward_token": ("Reward Token", "REWARD"),
+}
+
+# the accounts our fixtures impersonate
+WHALE = "0x95478C4F7D22D1048F46100001c2C69D2BA57380"
+YMECHS_SAFE = "0x9f2A061d6fEF20ad3A656e23fd9C814b75fd5803"
+
+
+@dataclass
+class MockParams:
+    xboo_boo: int = 1_300_000 * 10 ** 18  # boo backing xboo
+    xboo_supply: int = 1_000_000 * 10 ** 18  # so one xboo is worth 1.3 boo
+    pool_boo: int = 200_000 * 10 ** 18  # boo side of our boo/xboo pair
+    sex_per_lp: int = 10 ** 12  # per second, for each 1e18 lp staked
+    solid_per_lp: int = 2 * 10 ** 12
+    reward_pool_size: int = 1_000_000 * 10 ** 18  # each side of our sex/solid/boo routes through wftm
+    # wftm per token on spooky in basis points, solidly's pairs are all at 1:1. sex sells better on
+    # spooky, solid worse, and boo is level so solidly's lower fee wins: the best route for sex
+    # crosses venues
+    spooky_prices: Tuple[Tuple[str, int], ...] = (("sex", 10_100), ("solid", 9_900), ("boo", 10_000))
+    whale_boo: int = 1_000_000 * 10 ** 18
+    gas_money: int = 5 * 10 ** 18  # for every account we impersonate
+
+
+def set_code(address: str, code: str) -> None:
+    """Write runtime ``code`` to ``address`` on whichever local node we're on."""
+    code = code if code.startswith("0x") else "0x" + code
+    errors = []
+    for method in ("evm_setAccountCode", "hardhat_setCode", "anvil_setCode"):
+        response = web3.provider.make_request(method, [address, code])
+        if "error" not in response:
+            return
+        errors.append(f"{method}: {response['error']}")
+    raise RuntimeError(f"can't set code on this node ({'; '.join(errors)})")
+
+
+def etch(container: Any, address: str) -> Any:
+    """Put ``container``'s runtime code at ``address`` and return it as a contract."""
+    set_code(address, container._build["deployedBytecode"])
+    return container.at(address)
+
+
+class MockEcosystem:
+    """Our mocks by name (``boo``, ``xboo``, ``solidly_router``...), plus the reward routes."""
+
+    def __init__(self, contracts: Dict[str, Any], reward_pairs: Dict[str, Any]):
+        self.contracts = contracts
+        self.reward_pairs = reward_pairs
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self.__dict__["contracts"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+def deploy_mock_ecosystem(project: Any, deployer: Any = None, params: MockParams = None) -> MockEcosystem:
+    """Etch, initialize and seed every mock. ``project`` is the loaded brownie project."""
+    deployer = deployer or accounts[-1]
+    params = params or MockParams()
+    tx = {"from": deployer}
+
+    contracts = {name: etch(getattr(project, CONTAINERS[name]), address) for name, address in ADDRESSES.items()}
+    boo, xboo, wftm = contracts["boo"], contracts["xboo"], contracts["wftm"]
+    factory, router = contracts["solidly_factory"], contracts["solidly_router"]
+
+    for name, (token_name, token_symbol) in TOKENS.items():
+        contracts[name].initialize(token_name, token_symbol, 18, tx)
+    xboo.initialize(boo, tx)
+    router.initialize(factory, tx)
+    (token0, token1) = sorted([boo.address, xboo.address], key=lambda a: int(a, 16))
+    contracts["boo_xboo_pair"].initialize(token0, token1, False, tx)
+    factory.registerPair(contracts["boo_xboo_pair"], tx)
+    contracts["lpdepositer"].initialize(contracts["sex"], contracts["solid"], params.sex_per_lp, params.solid_per_lp, tx)
+    contracts["trade_factory"].initialize(YMECHS_SAFE, tx)
+
+    # xboo, at a rate that isn't 1
+    boo.mint(deployer, params.xboo_supply + 2 * params.pool_boo + params.reward_pool_size, tx)
+    boo.approve(xboo, MAX_UINT, tx)
+    xboo.enter(params.xboo_supply, tx)
+    boo.mint(xboo, params.xboo_boo - params.xboo_supply, tx)
+
+    # our boo/xboo pair, priced at xboo's rate
+    xboo.enter(params.pool_boo, tx)
+    boo.approve(router, MAX_UINT, tx)
+    xboo.approve(router, MAX_UINT, tx)
+    router.addLiquidity(boo, xboo, False, params.pool_boo, xboo.BOOForxBOO(params.pool_boo), 0, 0, deployer, MAX_UINT, tx)
+
+    # volatile routes to sell our rewards into boo: sex/wftm, solid/wftm and wftm/boo
+    reward_pairs = {}
+    for name in ("sex", "solid", "boo"):
+        token = contracts[name]
+        if name != "boo":
+            token.mint(deployer, params.reward_pool_size, tx)
+            token.approve(router, MAX_UINT, tx)
+        wftm.mint(deployer, params.reward_pool_size, tx)
+        wftm.approve(router, MAX_UINT, tx)
+        router.addLiquidity(
+            token, wftm, False, params.reward_pool_size, params.reward_pool_size, 0, 0, deployer, MAX_UINT, tx
+        )
+        reward_pairs[name] = project.MockSolidlyPair.at(router.pairFor(token, wftm, False))
+
+    # and the same routes on spooky
+    contracts["spooky_router"].initialize(contracts["spooky_factory"], tx)
+    for name, price in params.spooky_prices:
+        token = contracts[name]
+        wftm_side = params.reward_pool_size * price // 10_000
+        token.mint(deployer, params.reward_pool_size, tx)
+        wftm.mint(deployer, wftm_side, tx)
+        token.approve(contracts["spooky_router"], MAX_UINT, tx)
+        wftm.approve(contracts["spooky_router"], MAX_UINT, tx)
+        contracts["spooky_router"].addLiquidity(
+            token, wftm, params.reward_pool_size, wftm_side, 0, 0, deployer, MAX_UINT, tx
+        )
+
+    boo.mint(WHALE, params.whale_boo, tx)
+    return MockEcosystem(contracts, reward_pairs)
+
+
+def update_oracles(ecosystem: MockEcosystem, periods: int = 1, deployer: Any = None) -> None:
+    """Sync our reward pairs ``periods`` times, one observation apart, so their twaps have history."""
+    deployer = deployer or accounts[-1]
+    for _ in range(periods):
+        chain.sleep(PERIOD_SIZE + 1)
+        for pair in ecosystem.reward_pairs.values():
+            pair.sync({"from": deployer})
+
+
+def fund(addresses, deployer: Any = None, amount: int = None) -> None:
+    """Send gas money to accounts we impersonate."""
+    deployer = deployer or accounts[-1]
+    amount = amount or MockParams().gas_money
+    for address in addresses:
+        if web3.eth.get_balance(address) < amount:
+            deployer.transfer(address, amount)
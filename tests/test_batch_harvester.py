@@ -0,0 +1,164 @@
+import asyncio
+import time
+
+import brownie
+from brownie import Contract
+from brownie import config
+from brownie import web3
+
+from strategy_tools.batch_harvester import TX_BASE_GAS, batch_gas, create_batch_keeper, pack_batches
+from strategy_tools.keeper import create_keeper
+from strategy_tools.rpc import RpcClient
+
+# harvesting a fleet through our BatchHarvester against one harvest transaction per strategy
+
+FLEET = 24
+GAS_BUDGET = 8_000_000
+
+
+def new_vault(pm, gov, rewards, guardian, management, token):
+    Vault = pm(config["dependencies"][0]).Vault
+    vault = guardian.deploy(Vault)
+    vault.initialize(token, gov, rewards, "", "", guardian)
+    vault.setDepositLimit(2 ** 256 - 1, {"from": gov})
+    vault.setManagement(management, {"from": gov})
+    vault.setManagementFee(0, {"from": gov})
+    return vault
+
+
+def new_fleet(Strategy, strategy, vault, gov, strategist, rewards, keeper, trade_factory, ymechs_safe, name):
+    fleet = []
+    for i in range(FLEET):
+        tx = strategy.cloneStrategy(vault, strategist, rewards, keeper, f"{name}{i}", strategy.pools(0)[0], {"from": gov})
+        clone = Strategy.at(tx.events["Cloned"]["clone"])
+        trade_factory.grantRole(trade_factory.STRATEGY(), clone, {"from": ymechs_safe, "gas_price": "0 gwei"})
+        vault.addStrategy(clone, 10_000 // FLEET, 0, 2 ** 256 - 1, 1_000, {"from": gov})
+        fleet.append(clone)
+    return fleet
+
+
+def test_pack_batches():
+    costs = {"a": 500_000, "b": 300_000, "c": 400_000, "d": 200_000, "e": 900_000, "f": 2_000_000}
+    batches = pack_batches(costs, 1_000_000)
+
+    # biggest first, each into the first batch with room, and one that can't fit anywhere goes alone
+    assert batches == [["f"], ["e"], ["a", "c"], ["b", "d"]]
+    assert sorted(s for batch in batches for s in batch) == sorted(costs)
+    assert all(batch_gas(batch, costs) <= 1_000_000 for batch in batches if batch != ["f"])
+    assert batch_gas(["a", "c"], costs) == TX_BASE_GAS + 900_000
+    assert pack_batches({}, 1_000_000) == []
+
+
+def test_batch_harvester_results(
+    Strategy, BatchHarvester, accounts, gov, token, vault, whale, strategy, strategist, rewards, trade_factory,
+    ymechs_safe, chain, amount,
+):
+    bot = accounts[0]
+    harvester = gov.deploy(BatchHarvester, gov)
+    harvester.setKeeper(bot, True, {"from": gov})
+    with brownie.reverts("!keeper"):
+        harvester.harvestBatch([strategy], 0, {"from": whale})
+
+    vault.updateStrategyDebtRatio(strategy, 5_000, {"from": gov})
+    clones = []
+    for name in ("Due", "NotDue"):
+        tx = strategy.cloneStrategy(vault, strategist, rewards, harvester, name, strategy.pools(0)[0], {"from": gov})
+        clone = Strategy.at(tx.events["Cloned"]["clone"])
+        trade_factory.grantRole(trade_factory.STRATEGY(), clone, {"from": ymechs_safe, "gas_price": "0 gwei"})
+        vault.addStrategy(clone, 2_500, 0, 2 ** 256 - 1, 1_000, {"from": gov})
+        clone.setDoHealthCheck(False, {"from": gov})
+        clones.append(clone)
+    (due, not_due) = clones
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+
+    # our original strategy doesn't have the harvester as its keeper and token isn't a strategy at all,
+    # neither stops the rest of the batch
+    due.setForceHarvestTriggerOnce(True, {"from": gov})
+    strategy.setForceHarvestTriggerOnce(True, {"from": gov})
+    tx = harvester.harvestBatch([strategy, token, not_due, due], 0, {"from": bot})
+    assert [e["strategy"] for e in tx.events["HarvestFailed"]] == [strategy.address, token.address]
+    assert [e["strategy"] for e in tx.events["HarvestSkipped"]] == [not_due.address]
+    assert [e["strategy"] for e in tx.events["Harvested"]] == [due.address]
+    assert tx.events["Harvested"][0]["gasUsed"] > 0
+    assert vault.strategies(due).dict()["totalDebt"] > 0
+    assert vault.strategies(not_due).dict()["totalDebt"] == 0
+
+    # a harvest that runs out of gas takes the batch with it, rather than being reported as failed
+    not_due.setDoHealthCheck(False, {"from": gov})
+    with brownie.reverts("out of gas"):
+        harvester.forceHarvestBatch([not_due], {"from": bot, "gas_limit": 200_000})
+
+    # forcing skips the triggers
+    tx = harvester.forceHarvestBatch([not_due], {"from": bot})
+    assert len(tx.events["Harvested"]) == 1
+    assert vault.strategies(not_due).dict()["totalDebt"] > 0
+
+
+def test_batch_harvester_vs_sequential(
+    Strategy, BatchHarvester, pm, accounts, gov, token, whale, strategy, strategist, rewards, guardian, management,
+    trade_factory, ymechs_safe, chain, amount,
+):
+    (sequential_bot, batch_bot) = (accounts[0], accounts[1])
+    harvester = gov.deploy(BatchHarvester, gov)
+    harvester.setKeeper(batch_bot, True, {"from": gov})
+
+    # two identical fleets in two vaults, one kept by an account and one by our harvester
+    (fleets, vaults) = ({}, {})
+    for name, keeper in (("Sequential", sequential_bot), ("Batched", harvester)):
+        vault = vaults[name] = new_vault(pm, gov, rewards, guardian, management, token)
+        fleets[name] = new_fleet(
+            Strategy, strategy, vault, gov, strategist, rewards, keeper, trade_factory, ymechs_safe, name
+        )
+        token.approve(vault, 2 ** 256 - 1, {"from": whale})
+        vault.deposit(amount // 2, {"from": whale})
+    chain.sleep(1)
+
+    async def cycle(bot):
+        start = time.perf_counter()
+        report = await bot.run_cycle()
+        receipts = [chain.get_transaction(tx_hash) for tx_hash in set(report.sent.values())]
+        return report, receipts, time.perf_counter() - start
+
+    async def run():
+        async with RpcClient(web3.provider.endpoint_uri) as rpc:
+            bots = {
+                "Sequential": await create_keeper(rpc, sequential_bot.private_key, [s.address for s in fleets["Sequential"]]),
+                "Batched": await create_batch_keeper(
+                    rpc, batch_bot.private_key, [s.address for s in fleets["Batched"]], harvester.address,
+                    gas_budget=GAS_BUDGET,
+                ),
+            }
+            results = []
+            # the first harvest deposits everything, the second takes half a day of profit
+            for _ in range(2):
+                for fleet in fleets.values():
+                    for s in fleet:
+                        s.setForceHarvestTriggerOnce(True, {"from": gov})
+                        s.setDoHealthCheck(False, {"from": gov})
+                chain.mine(1)
+                results.append({name: await cycle(bot) for name, bot in bots.items()})
+                chain.sleep(43_200)
+            return results
+
+    for i, result in enumerate(asyncio.run(run())):
+        (sequential, sequential_receipts, sequential_latency) = result["Sequential"]
+        (batched, batch_receipts, batch_latency) = result["Batched"]
+        assert len(sequential.sent) == len(batched.sent) == FLEET
+        assert not sequential.failed and not batched.failed
+        assert sum(len(tx.events["Harvested"]) for tx in batch_receipts) == FLEET
+        assert all(tx.gas_used <= GAS_BUDGET for tx in batch_receipts)
+
+        sequential_gas = sum(tx.gas_used for tx in sequential_receipts)
+        batch_gas_used = sum(tx.gas_used for tx in batch_receipts)
+        print(
+            f"\nround {i + 1}: {FLEET} harvests in {len(sequential_receipts)} txs, {sequential_gas} gas, "
+            f"{sequential_latency:.2f}s; batched in {len(batch_receipts)} txs, {batch_gas_used} gas, "
+            f"{batch_latency:.2f}s ({(batch_gas_used - sequential_gas) / sequential_gas:+.1%} gas)"
+        )
+        assert batch_gas_used < sequential_gas
+
+    for s in fleets["Batched"]:
+        assert s.harvestTrigger(0) == False
+        assert vaults["Batched"].strategies(s).dict()["totalDebt"] > 0
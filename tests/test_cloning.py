@@ -0,0 +1,119 @@
+import brownie
+from brownie import Contract
+from brownie import config
+from brownie import ZERO_ADDRESS
+
+# clones should behave just like a full deployment, for a fraction of the gas
+
+BATCH = 24
+
+
+def new_vault(pm, gov, rewards, guardian, management, token):
+    Vault = pm(config["dependencies"][0]).Vault
+    vault = guardian.deploy(Vault)
+    vault.initialize(token, gov, rewards, "", "", guardian)
+    vault.setDepositLimit(2 ** 256 - 1, {"from": gov})
+    vault.setManagement(management, {"from": gov})
+    vault.setManagementFee(0, {"from": gov})
+    return vault
+
+
+def test_clone(
+    Strategy,
+    pm,
+    gov,
+    token,
+    whale,
+    strategy,
+    strategist,
+    keeper,
+    rewards,
+    guardian,
+    management,
+    chain,
+    amount,
+    trade_factory,
+    ymechs_safe,
+    solidly_factory,
+    sex,
+    wftm,
+):
+    vault = new_vault(pm, gov, rewards, guardian, management, token)
+    lp_token = strategy.pools(0)[0]
+
+    tx = strategy.cloneStrategy(vault, strategist, rewards, keeper, "ClonedBoo", lp_token, {"from": gov})
+    clone = Strategy.at(tx.events["Cloned"]["clone"])
+
+    # everything the original sets up, the clone has too
+    assert clone.isOriginal() == False
+    assert clone.vault() == vault
+    assert clone.want() == token
+    assert clone.strategist() == strategist
+    assert clone.rewards() == rewards
+    assert clone.keeper() == keeper
+    assert clone.name() == "ClonedBoo"
+    assert clone.poolCount() == 1
+    assert clone.pools(0) == strategy.pools(0)
+    for view in ["tradeFactory", "lpDepositer", "lpSlippage", "minHarvestCredit", "maxReportDelay", "healthCheck"]:
+        assert getattr(clone, view)() == getattr(strategy, view)()
+
+    # initializing only happens once, and clones don't clone
+    with brownie.reverts("Strategy already initialized"):
+        clone.initialize(vault, strategist, rewards, keeper, "Again", lp_token, {"from": gov})
+    with brownie.reverts("Strategy already initialized"):
+        strategy.initialize(vault, strategist, rewards, keeper, "Again", lp_token, {"from": gov})
+    with brownie.reverts("!clone"):
+        clone.cloneStrategy(vault, strategist, rewards, keeper, "Clone of a clone", lp_token, {"from": gov})
+    wrong_pair = solidly_factory.getPair(sex, wftm, False)
+    with brownie.reverts("not a boo/xboo pair"):
+        strategy.cloneStrategy(vault, strategist, rewards, keeper, "Wrong pair", wrong_pair, {"from": gov})
+
+    # and it works end to end
+    trade_factory.grantRole(trade_factory.STRATEGY(), clone, {"from": ymechs_safe, "gas_price": "0 gwei"})
+    vault.addStrategy(clone, 10_000, 0, 2 ** 256 - 1, 1_000, {"from": gov})
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    clone.setDoHealthCheck(False, {"from": gov})
+    clone.harvest({"from": gov})
+    assert clone.tradesEnabled() == True
+    assert clone.balanceOfLPStaked() > 0
+
+    chain.sleep(1)
+    vault.withdraw({"from": whale})
+    assert token.balanceOf(vault) == 0
+    assert vault.strategies(clone).dict()["totalLoss"] == 0
+
+
+def test_clone_gas(
+    Strategy,
+    pm,
+    gov,
+    token,
+    strategy,
+    strategist,
+    strategy_name,
+    keeper,
+    rewards,
+    guardian,
+    management,
+    gas_snapshot,
+):
+    vault = new_vault(pm, gov, rewards, guardian, management, token)
+    lp_token = strategy.pools(0)[0]
+
+    full = strategist.deploy(Strategy, vault, strategy_name)
+    full_gas = full.tx.gas_used
+
+    # a batch of clones for a fleet of vaults, like scripts/clone_boo.py does
+    clone_gas = []
+    for i in range(BATCH):
+        tx = strategy.cloneStrategy(vault, strategist, rewards, keeper, f"{strategy_name}_{i}", lp_token, {"from": gov})
+        assert tx.events["Cloned"]["clone"] != ZERO_ADDRESS
+        clone_gas.append(tx.gas_used)
+
+    print(f"\nFull deployment: {full_gas} gas")
+    print(f"Clone: {max(clone_gas)} gas, {BATCH} clones for {sum(clone_gas)} vs {full_gas * BATCH} deployed in full")
+    assert max(clone_gas) * 4 < full_gas
+    gas_snapshot.check("deploy_full", full_gas)
+    gas_snapshot.check("deploy_clone", max(clone_gas))
@@ -0,0 +1,195 @@
+import json
+import time
+
+import brownie
+import pytest
+import yaml
+from brownie import Contract
+from brownie import config
+from brownie import project, web3
+
+from strategy_tools.deploy_pipeline import DeployPipeline
+
+# a manifest rollout of 54 clones across three vaults, crashing halfway and resuming
+
+VAULTS = 3
+PER_VAULT = 18  # vaults take 20 strategies at most
+
+
+class Crash(BaseException):
+    pass
+
+
+def new_vault(pm, gov, rewards, guardian, management, token):
+    Vault = pm(config["dependencies"][0]).Vault
+    vault = guardian.deploy(Vault)
+    vault.initialize(token, gov, rewards, "", "", guardian)
+    vault.setDepositLimit(2 ** 256 - 1, {"from": gov})
+    vault.setManagement(management, {"from": gov})
+    return vault
+
+
+def write_manifest(path, original, vaults, keeper, strategist, health_check, lp_token, bad_lp_token=None):
+    manifest = {
+        "original": original,
+        "defaults": {
+            "strategist": strategist,
+            "keeper": keeper,
+            "health_check": health_check,
+            "lp_token": lp_token,
+            "debt_ratio": 500,
+            "params": {"max_report_delay": 86_400, "lp_slippage": 990},
+        },
+        "strategies": [
+            {"vault": vault, "name": f"boo_Xboo_{v}_{i}"} for v, vault in enumerate(vaults) for i in range(PER_VAULT)
+        ],
+    }
+    if bad_lp_token:
+        manifest["strategies"][7]["lp_token"] = bad_lp_token
+    manifest["strategies"][0]["params"] = {"min_harvest_credit": 10 ** 21}
+    path.write_text(yaml.safe_dump(manifest))
+
+
+def test_deploy_pipeline_resumes(
+    Strategy,
+    pm,
+    gov,
+    token,
+    strategy,
+    strategist,
+    keeper,
+    rewards,
+    guardian,
+    management,
+    healthCheck,
+    solidly_factory,
+    sex,
+    wftm,
+    tmp_path,
+    monkeypatch,
+):
+    vaults = [new_vault(pm, gov, rewards, guardian, management, token) for _ in range(VAULTS)]
+    manifest = tmp_path / "manifest.yml"
+    state = tmp_path / "state.json"
+    record = tmp_path / "deployment.json"
+    lp_token = strategy.pools(0)[0]
+    args = (strategy.address, [v.address for v in vaults], keeper.address, strategist.address, healthCheck.address)
+
+    # one strategy points at a pair we can't use, and we crash partway through configuring
+    write_manifest(manifest, *args, lp_token, bad_lp_token=solidly_factory.getPair(sex, wftm, False))
+    pipeline = DeployPipeline(project.get_loaded_projects()[0], str(manifest), gov, str(state), str(record))
+    call = pipeline._call
+    sends = []
+
+    def crashing_call(*args):
+        if len(sends) == 60:
+            raise Crash()
+        sends.append(args)
+        return call(*args)
+
+    monkeypatch.setattr(pipeline, "_call", crashing_call)
+    clones_before = web3.eth.get_transaction_count(strategy.address)
+    start = time.perf_counter()
+    with pytest.raises(Crash):
+        pipeline.run()
+
+    saved = json.loads(state.read_text())["strategies"]
+    assert saved["boo_Xboo_0_7"]["steps"]["deploy"]["status"] == "failed"
+    assert sum(s["address"] is not None for s in saved.values()) == VAULTS * PER_VAULT - 1
+
+    # fix the manifest and run again from the state file
+    write_manifest(manifest, *args, lp_token)
+    pipeline = DeployPipeline(project.get_loaded_projects()[0], str(manifest), gov, str(state), str(record))
+    result = pipeline.run()
+    elapsed = time.perf_counter() - start
+
+    transactions = sum(len(s["transactions"]) for s in result["strategies"])
+    print(f"{len(result['strategies'])} strategies, {transactions} transactions in {elapsed:.1f}s")
+    assert result["complete"]
+    assert result["failed"] == []
+    assert json.loads(record.read_text()) == result
+
+    # every strategy was cloned exactly once, configured and added to its vault
+    addresses = [s["strategy"] for s in result["strategies"]]
+    assert len(set(addresses)) == VAULTS * PER_VAULT
+    assert web3.eth.get_transaction_count(strategy.address) - clones_before == VAULTS * PER_VAULT
+    for i, item in enumerate(result["strategies"]):
+        deployed = Strategy.at(item["strategy"])
+        vault = vaults[i // PER_VAULT]
+        assert item["vault"] == vault.address
+        assert deployed.vault() == vault
+        assert deployed.name() == item["name"]
+        assert deployed.strategist() == strategist
+        assert deployed.keeper() == keeper
+        assert deployed.healthCheck() == healthCheck
+        assert deployed.maxReportDelay() == 86_400
+        assert deployed.lpSlippage() == 990
+        assert vault.strategies(deployed).dict()["debtRatio"] == 500
+    assert Strategy.at(addresses[0]).minHarvestCredit() == 10 ** 21
+
+    # and a third run has nothing left to do
+    nonce = gov.nonce
+    DeployPipeline(project.get_loaded_projects()[0], str(manifest), gov, str(state), str(record)).run()
+    assert gov.nonce == nonce
+
+
+# a step the node lost frees its nonce, so we go back to the node's count instead of leaving a gap
+def test_deploy_pipeline_dropped_step(
+    pm, gov, token, strategy, strategist, keeper, rewards, guardian, management, healthCheck, tmp_path
+):
+    vault = new_vault(pm, gov, rewards, guardian, management, token)
+    manifest = tmp_path / "manifest.yml"
+    args = (strategy.address, [vault.address], keeper.address, strategist.address, healthCheck.address)
+    write_manifest(manifest, *args, strategy.pools(0)[0])
+    pipeline = DeployPipeline(
+        project.get_loaded_projects()[0], str(manifest), gov, str(tmp_path / "state.json"), str(tmp_path / "deployment.json")
+    )
+
+    assert pipeline._next_nonce() == gov.nonce
+    step = {"txid": "0x" + "00" * 32, "nonce": gov.nonce, "status": "sent"}
+    assert pipeline._settle(step) is None
+    assert step["status"] == "failed" and step["error"] == "dropped"
+    assert pipeline._next_nonce() == gov.nonce
+
+
+# steps the sender has no role for are recorded as failed, not sent to revert
+def test_deploy_pipeline_checks_roles(
+    Strategy, pm, gov, token, strategy, strategist, keeper, rewards, guardian, management, healthCheck, tmp_path
+):
+    vault = new_vault(pm, gov, rewards, guardian, management, token)
+    manifest = tmp_path / "manifest.yml"
+    manifest.write_text(
+        yaml.safe_dump(
+            {
+                "original": strategy.address,
+                "defaults": {
+                    "strategist": strategist.address,
+                    "keeper": keeper.address,
+                    "health_check": healthCheck.address,
+                    "lp_token": strategy.pools(0)[0],
+                    "debt_ratio": 500,
+                    "params": {"max_report_delay": 86_400, "boo_buffer": 50},
+                },
+                "strategies": [{"vault": vault.address, "name": "boo_Xboo_management"}],
+            }
+        )
+    )
+    state = tmp_path / "state.json"
+    nonce = management.nonce
+    record = DeployPipeline(
+        project.get_loaded_projects()[0], str(manifest), management, str(state), str(tmp_path / "deployment.json")
+    ).run()
+
+    # management may set the buffer and health check, but only governance adds strategies
+    # and only the strategist or governance sets maxReportDelay
+    clone = Strategy.at(record["failed"][0]["strategy"])
+    steps = json.loads(state.read_text())["strategies"]["boo_Xboo_management"]["steps"]
+    assert {name for name, step in steps.items() if step["status"] == "failed"} == {"setMaxReportDelay", "addStrategy"}
+    assert steps["addStrategy"]["error"] == "sender isn't governance"
+    assert steps["setMaxReportDelay"].get("txid") is None
+    assert record["failed"][0]["errors"]["setMaxReportDelay"] == "sender isn't strategist or governance"
+    assert clone.booBuffer() == 50
+    assert clone.healthCheck() == healthCheck.address
+    assert vault.strategies(clone).dict()["activation"] == 0
+    # the deployment and the two steps we could send
+    assert management.nonce == nonce + 3
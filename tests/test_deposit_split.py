@@ -0,0 +1,74 @@
+import brownie
+from brownie import Contract
+from brownie import config
+
+# our deposit split is exact, so only rounding dust should sit idle: a few wei, plus up to an xboo's worth of
+# boo (test_model.py pins the bound), which is 5 wei at most while xboo is worth under 2 boo
+
+
+def test_deposit_split_dust(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    chain,
+    amount,
+    boo,
+    xboo,
+    gas_snapshot,
+):
+    ## deposit to the vault after approving
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    tx = strategy.harvest({"from": gov})
+    chain.sleep(1)
+    print("Harvest gas with exact split:", tx.gas_used)
+
+    assert boo.balanceOf(strategy) <= 5
+    assert xboo.balanceOf(strategy) <= 5
+    assert Contract(strategy.pools(0)[0]).balanceOf(strategy) == 0
+    assert strategy.balanceOfLPStaked() > 0
+
+    # donate a big chunk of boo, harvest again and we should still be dust free
+    token.transfer(strategy, amount / 3, {"from": whale})
+    strategy.setDoHealthCheck(False, {"from": gov})
+    tx = strategy.harvest({"from": gov})
+    assert boo.balanceOf(strategy) <= 5
+    assert xboo.balanceOf(strategy) <= 5
+    gas_snapshot.check("harvest_deposit_donation", tx.gas_used, tx)
+
+
+def test_deposit_split_loose_xboo(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    chain,
+    amount,
+    boo,
+    xboo,
+):
+    ## deposit to the vault after approving
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    chain.sleep(1)
+
+    # send over way more xboo than our boo can pair with, tend should turn the excess back into boo
+    token.transfer(strategy, amount / 10, {"from": whale})
+    token.approve(xboo, 2 ** 256 - 1, {"from": whale})
+    xboo.enter(amount / 2, {"from": whale})
+    xboo.transfer(strategy, xboo.balanceOf(whale), {"from": whale})
+    staked = strategy.balanceOfLPStaked()
+
+    strategy.tend({"from": gov})
+
+    assert boo.balanceOf(strategy) <= 5
+    assert xboo.balanceOf(strategy) <= 5
+    assert strategy.balanceOfLPStaked() > staked
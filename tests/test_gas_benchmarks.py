@@ -0,0 +1,198 @@
+import brownie
+from brownie import Contract
+from brownie import config
+import pytest
+
+from mock_ecosystem import update_oracles
+
+# gas benchmarks for our hot paths on our local contracts, each one is checked against tests/gas_snapshot.json.
+# --update-gas-snapshot re-records the snapshot, GAS_REGRESSION_PCT sets the allowed regression
+
+# vault withdrawals in basis points of the vault: mostly small, with a long tail of big ones
+WITHDRAWAL_MIX = [1, 1, 2, 2, 3, 5, 5, 8, 10, 10, 15, 20, 30, 50, 80, 150, 400]
+
+
+@pytest.fixture(autouse=True)
+def only_offline(offline):
+    if not offline:
+        pytest.skip("benchmarks our local contracts, run with --network development")
+
+
+def deposit_and_harvest(token, vault, strategy, whale, gov, chain, amount):
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    tx = strategy.harvest({"from": gov})
+    chain.sleep(1)
+    return tx
+
+
+# first harvest sets up our trade factory and deposits everything
+def test_gas_harvest_first(
+    gov, token, vault, whale, strategy, chain, amount, gas_snapshot
+):
+    assert strategy.tradesEnabled() == False
+    tx = deposit_and_harvest(token, vault, strategy, whale, gov, chain, amount)
+    assert strategy.tradesEnabled() == True
+    gas_snapshot.check("harvest_first", tx.gas_used, tx)
+
+
+# prepareReturn with profit to take plus adjustPosition
+def test_gas_harvest_profit(
+    gov, token, vault, whale, strategy, chain, amount, gas_snapshot
+):
+    deposit_and_harvest(token, vault, strategy, whale, gov, chain, amount)
+
+    # simulate 12 hours of earnings
+    chain.sleep(43200)
+    chain.mine(1)
+    token.transfer(strategy, amount / 100, {"from": whale})
+
+    strategy.setDoHealthCheck(False, {"from": gov})
+    tx = strategy.harvest({"from": gov})
+    assert tx.events["Harvested"]["profit"] > 0
+    gas_snapshot.check("harvest_profit", tx.gas_used, tx)
+
+
+# adjustPosition bails out because our lp price is outside of lpSlippage
+def test_gas_harvest_slippage_skip(
+    gov, token, vault, whale, strategy, chain, amount, gas_snapshot
+):
+    # get our trade factory setup out of the way first
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    chain.sleep(1)
+
+    # with 10x allowed our gate always trips
+    strategy.setLpSlippage["uint256,bool"](10_000, True, {"from": gov})
+    tx = deposit_and_harvest(token, vault, strategy, whale, gov, chain, amount)
+    assert strategy.balanceOfLPStaked() == 0
+    assert strategy.balanceOfWant() == amount
+    gas_snapshot.check("harvest_slippage_skip", tx.gas_used, tx)
+
+
+# vault withdrawal served entirely from loose boo
+def test_gas_withdraw_loose(
+    gov, token, vault, whale, strategy, chain, amount, gas_snapshot
+):
+    deposit_and_harvest(token, vault, strategy, whale, gov, chain, amount)
+    staked = strategy.balanceOfLPStaked()
+
+    donation = amount / 2
+    token.transfer(strategy, donation, {"from": whale})
+    tx = vault.withdraw(donation / 2, {"from": whale})
+    assert strategy.balanceOfLPStaked() == staked
+    gas_snapshot.check("withdraw_loose", tx.gas_used, tx)
+
+
+# vault withdrawal that has to unstake and break our lp
+def test_gas_withdraw_unstake(
+    gov, token, vault, whale, strategy, chain, amount, gas_snapshot
+):
+    deposit_and_harvest(token, vault, strategy, whale, gov, chain, amount)
+    staked = strategy.balanceOfLPStaked()
+
+    tx = vault.withdraw(amount / 2, whale, 10_000, {"from": whale})
+    assert strategy.balanceOfLPStaked() < staked
+    gas_snapshot.check("withdraw_unstake", tx.gas_used, tx)
+
+
+# emergency exit harvest runs liquidateAllPositions
+def test_gas_liquidate_all(
+    gov, token, vault, whale, strategy, chain, amount, gas_snapshot
+):
+    deposit_and_harvest(token, vault, strategy, whale, gov, chain, amount)
+
+    strategy.setEmergencyExit({"from": gov})
+    strategy.setDoHealthCheck(False, {"from": gov})
+    tx = strategy.harvest({"from": gov})
+    assert strategy.estimatedTotalAssets() == 0
+    gas_snapshot.check("liquidate_all", tx.gas_used, tx)
+
+
+# migrating runs prepareMigration
+def test_gas_migration(
+    Strategy,
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    strategist,
+    strategy_name,
+    chain,
+    amount,
+    gas_snapshot,
+):
+    deposit_and_harvest(token, vault, strategy, whale, gov, chain, amount)
+
+    new_strategy = strategist.deploy(Strategy, vault, strategy_name)
+    tx = vault.migrateStrategy(strategy, new_strategy, {"from": gov})
+    assert strategy.estimatedTotalAssets() == 0
+    gas_snapshot.check("migration", tx.gas_used, tx)
+
+
+# harvest with nothing staked, so nothing pending and no getReward call
+def test_gas_harvest_no_rewards(gov, strategy, chain, gas_snapshot):
+    # get our trade factory setup out of the way first
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    chain.sleep(1)
+
+    assert strategy.pendingRewards() == (0, 0)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    tx = strategy.harvest({"from": gov})
+    gas_snapshot.check("harvest_no_rewards", tx.gas_used, tx)
+
+
+# a mix of withdrawals, paid from our lp or mostly from a 2% buffer of loose boo that harvest refills
+@pytest.mark.parametrize("buffer", [0, 200])
+def test_gas_withdraw_mix(
+    gov, token, vault, whale, strategy, chain, amount, buffer, gas_snapshot
+):
+    strategy.setBooBuffer(buffer, {"from": gov})
+    deposit_and_harvest(token, vault, strategy, whale, gov, chain, amount)
+    kept = strategy.estimatedTotalAssets() * buffer // 10_000
+    assert strategy.balanceOfWant() >= kept
+
+    gas = []
+    from_buffer = 0
+    for size in WITHDRAWAL_MIX:
+        staked = strategy.balanceOfLPStaked()
+        tx = vault.withdraw(amount * size // 10_000, whale, 10_000, {"from": whale})
+        gas.append(tx.gas_used)
+        from_buffer += strategy.balanceOfLPStaked() == staked
+    mean = sum(gas) // len(gas)
+    print(f"\n{buffer} bps buffer: {from_buffer}/{len(gas)} withdrawals paid from loose boo, "
+          f"{min(gas)} to {max(gas)} gas")
+    gas_snapshot.check(f"withdraw_mix_buffer_{buffer}", mean)
+
+    # our next harvest tops the buffer back up
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    assert strategy.balanceOfWant() >= strategy.estimatedTotalAssets() * buffer // 10_000
+
+
+# what the buffer costs us: a day of yield on everything we hold vs on what's actually invested
+def test_boo_buffer_yield_drag(
+    mock_ecosystem, gov, token, vault, whale, strategy, chain, amount, boo, xboo
+):
+    strategy.setBooBuffer(200, {"from": gov})
+    deposit_and_harvest(token, vault, strategy, whale, gov, chain, amount)
+    update_oracles(mock_ecosystem, 5)
+    total = strategy.estimatedTotalAssets()
+    invested = total - strategy.balanceOfWant()
+
+    chain.sleep(86_400)
+    # about 10% a year on xboo
+    boo.mint(xboo, boo.balanceOf(xboo) // 3650, {"from": gov})
+    update_oracles(mock_ecosystem)
+    day_yield = strategy.expectedHarvestProfit()
+    assert day_yield > 0
+
+    apr_invested = day_yield * 365 * 10_000 / invested
+    apr_total = day_yield * 365 * 10_000 / total
+    print(f"\n2% buffer: {apr_invested:.0f} bps on what's invested, {apr_total:.0f} bps on all of it, "
+          f"{apr_invested - apr_total:.1f} bps of yield drag")
+    assert apr_total < apr_invested
@@ -0,0 +1,80 @@
+import brownie
+from brownie import Contract
+from brownie import config
+
+from strategy_tools.gas_profiler import GasProfile, Step, profile_transaction
+
+# the profiler has to account for every unit of gas a trace spends, against the right function
+
+
+def synthetic_steps():
+    return [
+        Step(0, 0, "A.f", "PUSH1", 1_000, 3),
+        Step(0, 0, "A.f", "CALL", 997, 700),
+        Step(1, 0, "B.g", "PUSH1", 600, 3),
+        Step(1, 0, "B.g", "SSTORE", 597, 100),
+        Step(1, 0, "B.g", "STOP", 497, 0),
+        Step(0, 0, "A.f", "POP", 890, 2),
+        Step(0, 1, "A._h", "ADD", 888, 3),
+        Step(0, 1, "A._h", "JUMP", 885, 8),
+        Step(0, 0, "A.f", "CALL", 877, 700),
+        Step(1, 0, "B.g", "STOP", 500, 0),
+        Step(0, 0, "A.f", "STOP", 860, 0),
+    ]
+
+
+def test_gas_profiler_attribution():
+    profile = GasProfile.from_steps(synthetic_steps(), gas_used=21_000 + 140)
+
+    # the call opcodes only pay what their callee didn't spend
+    assert profile.stacks == {
+        ("A.f",): 3 + (997 - 890 - 103) + 2 + (877 - 860),
+        ("A.f", "B.g"): 103,
+        ("A.f", "A._h"): 11,
+    }
+    assert profile.traced == 1_000 - 860
+    assert profile.overhead == 21_000
+
+    rows = {row.name: row for row in profile.rows()}
+    assert rows["A.f"].inclusive == 140
+    assert rows["A.f"].exclusive == 26
+    assert rows["B.g"].calls == 2
+    assert rows["B.g"].inclusive == rows["B.g"].exclusive == 103
+    assert rows["A._h"].calls == 1
+
+    folded = profile.folded().splitlines()
+    assert "A.f;B.g 103" in folded
+    assert "[intrinsic and refunds] 21000" in folded
+    assert profile.table().splitlines()[1].startswith("A.f")
+
+
+def test_gas_profiler_harvest(
+    gov, token, vault, whale, strategy, chain, amount, tmp_path
+):
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    chain.sleep(3_600)
+
+    token.transfer(strategy, amount / 100, {"from": whale})
+    strategy.setDoHealthCheck(False, {"from": gov})
+    tx = strategy.harvest({"from": gov})
+    profile = profile_transaction(tx)
+    print("\n" + profile.table(limit=25))
+
+    # everything the trace spent, plus what it can't see, is what the receipt says
+    assert profile.traced + profile.overhead == tx.gas_used
+    names = {row.name for row in profile.rows()}
+    assert any(name.endswith(".getReward") for name in names)
+    assert any(name.endswith(".report") for name in names)
+    assert "Strategy.prepareReturn" in names
+
+    # inclusive gas of the whole harvest is everything the trace spent
+    top = profile.rows()[0]
+    assert top.inclusive == profile.traced
+
+    profile.write(tmp_path / "harvest")
+    assert (tmp_path / "harvest.folded").read_text() == profile.folded()
+    assert (tmp_path / "harvest.txt").exists()
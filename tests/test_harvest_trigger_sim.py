@@ -0,0 +1,173 @@
+import brownie
+from brownie import Contract
+from brownie import config
+import pytest
+
+from mock_ecosystem import update_oracles
+
+# two strategies earn the same yield side by side for a week: one harvested every 12 hours, the other
+# whenever harvestTrigger(callCost) says so. gas is priced at a day of yield, so the 12 hour schedule pays
+# more for its harvests than they bring in
+
+HOURS = 7 * 24
+OLD_DELAY = 12  # hours
+XBOO_GROWTH = 20 * 10 ** 18  # boo added to xboo every hour
+
+
+@pytest.fixture(autouse=True)
+def only_offline(offline):
+    if not offline:
+        pytest.skip("simulates on our mock pools, run with --network development")
+
+
+def reward_value(mock_ecosystem, strategy, sex_amount, solid_amount):
+    """sex and solid in boo, the way harvestTrigger prices them."""
+    in_wftm = 0
+    for name, amount in (("sex", sex_amount), ("solid", solid_amount)):
+        if amount > 0:
+            in_wftm += mock_ecosystem.reward_pairs[name].quote(getattr(mock_ecosystem, name), amount, 4)
+    return strategy.ethToWant(in_wftm)
+
+
+def pending_value(mock_ecosystem, strategy, lpdepositer):
+    pending = lpdepositer.pendingRewards(strategy, [strategy.pools(0)[0]])[0]
+    return reward_value(mock_ecosystem, strategy, pending["sex"], pending["solid"])
+
+
+def harvest(mock_ecosystem, strategy, gov, sex, solid):
+    """Harvest, and return what it brought in: the profit it reported plus the rewards it claimed."""
+    (sex_before, solid_before) = (sex.balanceOf(strategy), solid.balanceOf(strategy))
+    strategy.setDoHealthCheck(False, {"from": gov})
+    tx = strategy.harvest({"from": gov})
+    claimed = reward_value(
+        mock_ecosystem,
+        strategy,
+        sex.balanceOf(strategy) - sex_before,
+        solid.balanceOf(strategy) - solid_before,
+    )
+    return tx.events["Harvested"]["profit"] + claimed
+
+
+def test_harvest_trigger_sim(
+    Strategy,
+    mock_ecosystem,
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    strategist,
+    keeper,
+    rewards,
+    chain,
+    amount,
+    boo,
+    xboo,
+    sex,
+    solid,
+    lpdepositer,
+    trade_factory,
+    ymechs_safe,
+):
+    # a clone of our strategy takes half of the vault, so both earn exactly the same
+    tx = strategy.cloneStrategy(vault, strategist, rewards, keeper, "TriggeredBoo", strategy.pools(0)[0], {"from": gov})
+    triggered = Strategy.at(tx.events["Cloned"]["clone"])
+    trade_factory.grantRole(trade_factory.STRATEGY(), triggered, {"from": ymechs_safe, "gas_price": "0 gwei"})
+    vault.updateStrategyDebtRatio(strategy, 5_000, {"from": gov})
+    vault.addStrategy(triggered, 5_000, 0, 2 ** 256 - 1, 1_000, {"from": gov})
+    triggered.setProfitFactor(1, {"from": gov})
+
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    for s in (strategy, triggered):
+        s.setDoHealthCheck(False, {"from": gov})
+        s.harvest({"from": gov})
+
+    # no twap, no price for our gas, so no profit trigger either
+    assert triggered.ethToWant(10 ** 18) == 0
+    assert triggered.harvestTrigger(10 ** 18) == False
+
+    # give our pairs some history, then price a harvest at about a day of rewards
+    update_oracles(mock_ecosystem, 5)
+    call_cost = pending_value(mock_ecosystem, triggered, lpdepositer) * 86_400 // (5 * 1_801)
+    cost_in_boo = triggered.ethToWant(call_cost)
+    assert cost_in_boo > 0
+
+    results = {}
+    for s in (strategy, triggered):
+        results[s.address] = {"harvests": 0, "unprofitable": 0, "value": 0}
+    since_old = 0
+    for _ in range(HOURS):
+        chain.sleep(3_600)
+        boo.mint(xboo, XBOO_GROWTH, {"from": gov})
+        for pair in mock_ecosystem.reward_pairs.values():
+            pair.sync({"from": gov})
+        since_old += 1
+
+        due = []
+        if since_old >= OLD_DELAY:
+            due.append(strategy)
+            since_old = 0
+        if triggered.harvestTrigger(call_cost):
+            due.append(triggered)
+        for s in due:
+            value = harvest(mock_ecosystem, s, gov, sex, solid)
+            result = results[s.address]
+            result["harvests"] += 1
+            result["value"] += value
+            result["unprofitable"] += value < cost_in_boo
+
+    # whatever hasn't been harvested yet still counts toward our yield
+    for s in (strategy, triggered):
+        params = vault.strategies(s).dict()
+        unrealized = max(s.estimatedTotalAssets() - params["totalDebt"], 0)
+        results[s.address]["value"] += unrealized + pending_value(mock_ecosystem, s, lpdepositer)
+
+    old, new = results[strategy.address], results[triggered.address]
+    print("\n12 hour harvests:", old)
+    print("Triggered harvests:", new)
+    assert new["harvests"] > 0
+    assert new["harvests"] < old["harvests"]
+    assert new["unprofitable"] < old["unprofitable"]
+
+    # for the same yield, less the gas we didn't spend
+    assert abs(new["value"] - old["value"]) <= old["value"] // 50
+    assert new["value"] - new["harvests"] * cost_in_boo > old["value"] - old["harvests"] * cost_in_boo
+
+
+def test_harvest_trigger_unprofitable_waits(
+    mock_ecosystem,
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    amount,
+    chain,
+    lpdepositer,
+    boo,
+):
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    update_oracles(mock_ecosystem, 5)
+
+    # a harvest that costs far more than it would bring in
+    pending = pending_value(mock_ecosystem, strategy, lpdepositer)
+    call_cost = mock_ecosystem.reward_pairs["boo"].quote(boo, 1_000 * pending + 10 ** 18, 4)
+    assert strategy.ethToWant(call_cost) > 100 * pending
+
+    # the old 12 hour backstop no longer harvests it, only a report this stale does
+    chain.sleep(43_200 + 1)
+    chain.mine(1)
+    assert strategy.harvestTrigger(call_cost) == False
+    since = chain.time() - vault.strategies(strategy).dict()["lastReport"]
+    chain.sleep(strategy.maxReportDelay() - since - 60)
+    chain.mine(1)
+    assert strategy.harvestTrigger(call_cost) == False
+    chain.sleep(120)
+    chain.mine(1)
+    assert strategy.harvestTrigger(call_cost) == True
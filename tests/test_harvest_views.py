@@ -0,0 +1,70 @@
+import brownie
+from brownie import Contract
+from brownie import config
+
+# keepers should be able to see what a harvest will bring in without simulating one
+
+
+def test_harvest_views(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    chain,
+    amount,
+    sex,
+    solid,
+    lpdepositer,
+):
+    ## deposit to the vault after approving
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    chain.sleep(3_600)
+    chain.mine(1)
+
+    # pending rewards are summed over all of our pools
+    (pending_sex, pending_solid) = strategy.pendingRewards()
+    pools = [strategy.pools(i)[0] for i in range(strategy.poolCount())]
+    pending = lpdepositer.pendingRewards(strategy, pools)
+    assert pending_sex == sum(p["sex"] for p in pending) > 0
+    assert pending_solid == sum(p["solid"] for p in pending) > 0
+
+    # a donation shows up as unrealized profit, to the wei
+    before = strategy.unrealizedProfit()
+    donation = amount // 10
+    token.transfer(strategy, donation, {"from": whale})
+    params = vault.strategies(strategy).dict()
+    assert strategy.unrealizedProfit() == strategy.estimatedTotalAssets() - params["totalDebt"]
+    assert strategy.unrealizedProfit() == before + donation
+    assert strategy.expectedHarvestProfit() >= strategy.unrealizedProfit()
+
+    # and our harvest reports at least that, while claiming what was pending
+    profit = strategy.unrealizedProfit()
+    strategy.setDoHealthCheck(False, {"from": gov})
+    tx = strategy.harvest({"from": gov})
+    assert tx.events["Harvested"]["profit"] >= profit
+    assert sex.balanceOf(strategy) >= pending_sex
+    assert solid.balanceOf(strategy) >= pending_solid
+    assert strategy.unrealizedProfit() <= 5
+
+
+def test_harvest_skips_empty_claim(gov, strategy, chain, lpdepositer):
+    # with nothing staked there's nothing to claim, so we don't call getReward at all
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    chain.sleep(1)
+
+    assert strategy.pendingRewards() == (0, 0)
+    assert strategy.expectedHarvestProfit() == 0
+    strategy.setDoHealthCheck(False, {"from": gov})
+    tx = strategy.harvest({"from": gov})
+    claims = [
+        call
+        for call in tx.subcalls
+        if call["to"] == lpdepositer.address and call.get("function", "").startswith("getReward")
+    ]
+    assert claims == []
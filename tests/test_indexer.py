@@ -0,0 +1,95 @@
+import asyncio
+
+import brownie
+import pytest
+from brownie import Contract
+from brownie import config
+from brownie import web3
+
+from strategy_tools.indexer import EventDecoder, Indexer, LogStore, TooManyResults
+from strategy_tools.rpc import RpcClient
+
+# our indexer should pick up every harvest once, in ranges our fake provider limit forces it to halve
+
+HARVESTS = 1_000
+
+
+def index(store, decoder, addresses, start_block, **kwargs):
+    async def run():
+        async with RpcClient(web3.provider.endpoint_uri) as rpc:
+            return await Indexer(rpc, store, decoder, addresses, start_block=start_block, **kwargs).run()
+
+    return asyncio.run(run())
+
+
+def test_indexer_incremental(
+    Strategy,
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    chain,
+    amount,
+    tmp_path,
+):
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    start = chain.height
+
+    first = [strategy.harvest({"from": gov}) for _ in range(HARVESTS // 2)]
+
+    store = LogStore(str(tmp_path / "logs.db"))
+    decoder = EventDecoder([Strategy.abi, vault.abi])
+    addresses = [strategy.address, vault.address]
+    report = index(store, decoder, addresses, start, max_logs=200)
+    print(
+        f"Indexed {report.logs} logs from {report.to_block - report.from_block + 1} blocks in "
+        f"{report.requests} requests ({report.halvings} halvings), {report.logs_per_second:.0f} logs/s"
+    )
+
+    assert report.halvings > 0
+    assert report.logs == store.count()
+    assert store.count("Harvested") == len(first)
+    assert store.count("StrategyReported") == len(first)
+    assert store.checkpoint("default") == chain.height == report.to_block
+
+    # decoded args match brownie's
+    harvested = store.events("Harvested", address=strategy)
+    for tx, event in zip(first, harvested):
+        assert event["block_number"] == tx.block_number
+        assert event["transaction_hash"] == tx.txid
+        assert event["args"] == dict(tx.events["Harvested"])
+    reported = store.events("StrategyReported", address=vault)[-1]
+    assert reported["args"] == dict(first[-1].events["StrategyReported"])
+
+    # nothing new, nothing fetched
+    report = index(store, decoder, addresses, start)
+    assert report.logs == 0
+    assert report.requests == 1
+
+    # and a rerun only picks up what's new
+    checkpoint = store.checkpoint("default")
+    second = [strategy.harvest({"from": gov}) for _ in range(HARVESTS - len(first))]
+    report = index(store, decoder, addresses, start, max_logs=200)
+    print(f"Incremental: {report.logs} logs, {report.logs_per_second:.0f} logs/s")
+    assert report.from_block == checkpoint + 1
+    assert store.count("Harvested") == HARVESTS
+    assert store.events("Harvested")[-1]["args"] == dict(second[-1].events["Harvested"])
+    assert len({(e["block_number"], e["log_index"]) for e in store.events()}) == store.count()
+    store.close()
+
+
+def test_indexer_single_block_too_many(Strategy, gov, vault, strategy, chain, tmp_path):
+    strategy.setDoHealthCheck(False, {"from": gov})
+    tx = strategy.harvest({"from": gov})
+
+    # a block we can't split any further has to fail loudly, and leave the checkpoint alone
+    store = LogStore(str(tmp_path / "logs.db"))
+    decoder = EventDecoder([Strategy.abi, vault.abi])
+    with pytest.raises(TooManyResults):
+        index(store, decoder, [strategy.address, vault.address], tx.block_number, max_logs=1)
+    assert store.checkpoint("default") is None
+    store.close()
@@ -0,0 +1,91 @@
+import asyncio
+
+import brownie
+from brownie import Contract
+from brownie import config
+from brownie import web3
+
+from strategy_tools.keeper import create_keeper
+from strategy_tools.rpc import RpcClient
+
+# run our keeper against a fleet of strategies on the local chain
+
+
+def test_keeper_harvests_triggered_strategies(
+    Strategy,
+    accounts,
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    strategist,
+    strategy_name,
+    trade_factory,
+    ymechs_safe,
+    chain,
+    amount,
+):
+    keeper = accounts[0]
+    vault.updateStrategyDebtRatio(strategy, 2_000, {"from": gov})
+    strategies = [strategy]
+    for i in range(4):
+        new_strategy = strategist.deploy(Strategy, vault, strategy_name)
+        trade_factory.grantRole(
+            trade_factory.STRATEGY(),
+            new_strategy,
+            {"from": ymechs_safe, "gas_price": "0 gwei"},
+        )
+        vault.addStrategy(new_strategy, 2_000, 0, 2 ** 256 - 1, 1_000, {"from": gov})
+        strategies.append(new_strategy)
+
+    for s in strategies:
+        s.setKeeper(keeper, {"from": gov})
+        s.setDoHealthCheck(False, {"from": gov})
+
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+
+    # only some of our strategies want a harvest
+    forced = strategies[::2]
+    for s in forced:
+        s.setForceHarvestTriggerOnce(True, {"from": gov})
+    chain.mine(1)
+
+    async def run():
+        async with RpcClient(web3.provider.endpoint_uri) as rpc:
+            keeper_bot = await create_keeper(
+                rpc, keeper.private_key, [s.address for s in strategies], concurrency=4
+            )
+            first = await keeper_bot.run_cycle()
+            chain.mine(1)
+            second = await keeper_bot.run_cycle()
+
+            # a harvest the node never heard of (dropped from its mempool) doesn't block the next one
+            dropped = strategies[1]
+            dropped.setForceHarvestTriggerOnce(True, {"from": gov})
+            keeper_bot._pending[dropped.address] = "0x" + "00" * 32
+            chain.mine(1)
+            third = await keeper_bot.run_cycle()
+            return first, second, third
+
+    first, second, third = asyncio.run(run())
+    print("Trigger latency:", first.trigger_latency, "RPC calls:", first.rpc_calls)
+
+    assert first.strategies == len(strategies)
+    assert sorted(first.triggered) == sorted(s.address for s in forced)
+    assert len(first.sent) == len(forced) and not first.failed
+    # one gas price, one call per strategy and one send per harvest
+    assert first.rpc_calls <= 1 + len(strategies) + 2 * len(forced) + 2
+
+    for s in forced:
+        assert s.harvestTrigger(0) == False
+        assert vault.strategies(s).dict()["totalDebt"] > 0
+    for s in strategies[1::2]:
+        assert vault.strategies(s).dict()["totalDebt"] == 0
+
+    # once harvested nothing fires again
+    assert second.triggered == []
+    assert third.triggered == [strategies[1].address]
+    assert list(third.sent) == [strategies[1].address]
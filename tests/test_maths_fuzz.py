@@ -0,0 +1,148 @@
+import json
+import os
+from pathlib import Path
+
+import brownie
+import pytest
+from hypothesis import given, settings, HealthCheck, strategies as st
+
+from strategy_tools import model
+
+# differential fuzzing: thousands of random states run through the strategy's own maths on chain, in
+# batches, and checked against strategy_tools.model to the wei. when a batch fails, the shrunk case
+# that broke it is saved to tests/fixtures/maths_counterexamples.json and replayed on every run.
+# MATHS_FUZZ_CASES sets how many cases we try (default 10k), split between one and three pools
+
+CASES = int(os.environ.get("MATHS_FUZZ_CASES", 10_000))
+# cases per call, sized so a batch fits in what hypothesis draws for one example
+BATCH = {1: 100, 3: 40}
+COUNTEREXAMPLES = Path(__file__).parent / "fixtures" / "maths_counterexamples.json"
+
+# 32 bits of digits at any scale up to ~4e24 (4M tokens), so every magnitude gets tried, plus the
+# edges our roundings care about. cheap for hypothesis to draw, which keeps our batches big
+scaled = st.builds(
+    lambda digits, scale: digits * 10 ** scale,
+    st.integers(min_value=0, max_value=2 ** 32 - 1),
+    st.integers(min_value=0, max_value=15),
+)
+amounts = st.one_of(scaled, st.sampled_from([0, 1, 2, 3, 10 ** 18 - 1, 10 ** 18, 10 ** 18 + 1]))
+nonzero = amounts.filter(lambda amount: amount > 0)
+
+
+@st.composite
+def pool_states(draw):
+    lp_supply = draw(nonzero)
+    staked = draw(st.integers(min_value=0, max_value=lp_supply))
+    loose = draw(st.integers(min_value=0, max_value=lp_supply - staked))
+    return model.PoolState(draw(nonzero), draw(nonzero), lp_supply, staked, loose, 0)
+
+
+@st.composite
+def cases(draw, pools_per_case):
+    pools = [draw(pool_states()) for _ in range(pools_per_case)]
+    # weights in basis points that add up to 10_000, like setPoolWeights enforces
+    cuts = sorted(draw(st.integers(min_value=0, max_value=10_000)) for _ in range(pools_per_case - 1))
+    weights = [b - a for a, b in zip([0] + cuts, cuts + [10_000])]
+    pools = [pool._replace(weight=weight) for pool, weight in zip(pools, weights)]
+    xboo = model.XbooState(draw(nonzero), draw(nonzero))
+    return {
+        "pools": [list(pool) for pool in pools],
+        "xboo": list(xboo),
+        "loose_boo": draw(amounts),
+        "loose_xboo": draw(amounts),
+        "boo_wanted": draw(amounts),
+    }
+
+
+def expected(case):
+    """What the contract should return for a case, or None where it should revert."""
+    pools = [model.PoolState(*pool) for pool in case["pools"]]
+    xboo = model.XbooState(*case["xboo"])
+    try:
+        result = [model.estimated_total_assets(pools, xboo, case["loose_boo"], case["loose_xboo"])]
+        allocations = model.deposit_allocations(pools, xboo, case["loose_boo"])
+        for pool, allocation in zip(pools, allocations):
+            result.append(model.boo_to_lp_tokens(pool, xboo, case["boo_wanted"]))
+            result.append(allocation)
+            result.extend(model.deposit_split(pool, xboo, allocation, case["loose_xboo"]))
+    except model.Revert:
+        return None
+    return result
+
+
+def pack(case):
+    words = [case["loose_boo"], case["loose_xboo"], *case["xboo"], case["boo_wanted"]]
+    for (reserve_boo, reserve_xboo, lp_supply, staked, loose, weight) in case["pools"]:
+        words += [reserve_boo, reserve_xboo, lp_supply, staked, loose, weight]
+    return words
+
+
+def check(maths, batch):
+    """Run a batch through the contract, returning the first case that disagrees with our model."""
+    pools_per_case = len(batch[0]["pools"])
+    result_length = 1 + 4 * pools_per_case
+    wanted = [(case, expected(case)) for case in batch]
+
+    # one revert would take the whole call down with it, so those cases go on their own
+    for case, result in wanted:
+        if result is None:
+            try:
+                maths.evaluate(pack(case), pools_per_case)
+            except brownie.exceptions.VirtualMachineError:
+                continue
+            return case
+
+    passing = [(case, result) for case, result in wanted if result is not None]
+    if not passing:
+        return None
+    words = [word for case, _ in passing for word in pack(case)]
+    results = maths.evaluate(words, pools_per_case)
+    for i, (case, result) in enumerate(passing):
+        if list(results[i * result_length : (i + 1) * result_length]) != result:
+            return case
+    return None
+
+
+def load_counterexamples():
+    return json.loads(COUNTEREXAMPLES.read_text()) if COUNTEREXAMPLES.exists() else []
+
+
+@pytest.fixture(scope="module")
+def maths(MockStrategyMaths, strategist, vault):
+    yield strategist.deploy(MockStrategyMaths, vault)
+
+
+# hypothesis replays its shrunk example last, so the last case we see fail is the one to keep
+@pytest.fixture(scope="module")
+def failures():
+    failed = {}
+    yield failed
+    if "case" in failed:
+        saved = load_counterexamples()
+        if failed["case"] not in saved:
+            COUNTEREXAMPLES.parent.mkdir(exist_ok=True)
+            COUNTEREXAMPLES.write_text(json.dumps(saved + [failed["case"]], indent=2) + "\n")
+
+
+@pytest.mark.parametrize("pools_per_case", [1, 3])
+def test_maths_fuzz(maths, failures, pools_per_case):
+    batch_size = BATCH[pools_per_case]
+
+    @given(batch=st.lists(cases(pools_per_case), min_size=batch_size, max_size=batch_size))
+    @settings(
+        max_examples=max(CASES // 2 // batch_size, 1),
+        deadline=None,
+        suppress_health_check=[HealthCheck.too_slow, HealthCheck.data_too_large],
+    )
+    def run(batch):
+        case = check(maths, batch)
+        if case is not None:
+            failures["case"] = case
+        assert case is None, f"contract and model disagree on {case}"
+
+    run()
+
+
+@pytest.mark.parametrize("case", load_counterexamples())
+def test_maths_counterexamples(maths, case):
+    assert check(maths, [case]) is None
@@ -0,0 +1,115 @@
+import brownie
+from brownie import Contract
+from brownie import config
+import pytest
+
+from mock_ecosystem import update_oracles
+
+# our offline mocks have to do the same maths as the contracts they stand in for
+
+
+@pytest.fixture(autouse=True)
+def only_offline(offline):
+    if not offline:
+        pytest.skip("checks our mocks, run with --network development")
+
+
+def test_mock_volatile_swap(mock_ecosystem, solidex_router, boo, wftm, whale):
+    pair = mock_ecosystem.reward_pairs["boo"]
+    amount_in = 1_000 * 10 ** 18
+    (reserve0, reserve1, _) = pair.getReserves()
+    (reserve_in, reserve_out) = (
+        (reserve0, reserve1) if pair.token0() == boo.address else (reserve1, reserve0)
+    )
+
+    # x*y=k after a 0.01% fee
+    after_fee = amount_in - amount_in // 10_000
+    expected = after_fee * reserve_out // (reserve_in + after_fee)
+    route = [(boo.address, wftm.address, False)]
+    assert solidex_router.getAmountsOut(amount_in, route)[1] == expected
+
+    boo.approve(solidex_router, amount_in, {"from": whale})
+    solidex_router.swapExactTokensForTokens(
+        amount_in, expected, route, whale, 2 ** 256 - 1, {"from": whale}
+    )
+    assert wftm.balanceOf(whale) == expected
+
+    # the fee stays in the pair
+    (reserve0, reserve1, _) = pair.getReserves()
+    assert reserve0 * reserve1 > reserve_in * reserve_out
+
+
+def test_mock_xboo_shares(boo, xboo, whale):
+    amount = 1_000 * 10 ** 18
+    expected = amount * xboo.totalSupply() // boo.balanceOf(xboo)
+    assert xboo.BOOForxBOO(amount) == expected
+
+    boo.approve(xboo, amount, {"from": whale})
+    xboo.enter(amount, {"from": whale})
+    assert xboo.balanceOf(whale) == expected
+
+    before = boo.balanceOf(whale)
+    out = xboo.xBOOForBOO(expected)
+    xboo.leave(expected, {"from": whale})
+    assert boo.balanceOf(whale) - before == out
+    assert amount - out <= 1
+
+
+def test_mock_lpdepositer_rewards(
+    lpdepositer, sex, solid, boo, xboo, whale, solidex_router, chain
+):
+    boo.approve(xboo, 2 ** 256 - 1, {"from": whale})
+    xboo.enter(1_000 * 10 ** 18, {"from": whale})
+    boo.approve(solidex_router, 2 ** 256 - 1, {"from": whale})
+    xboo.approve(solidex_router, 2 ** 256 - 1, {"from": whale})
+    solidex_router.addLiquidity(
+        boo,
+        xboo,
+        False,
+        1_000 * 10 ** 18,
+        xboo.balanceOf(whale),
+        0,
+        0,
+        whale,
+        2 ** 256 - 1,
+        {"from": whale},
+    )
+    pair = solidex_router.pairFor(boo, xboo, False)
+    lp = Contract(pair)
+    staked = lp.balanceOf(whale)
+    lp.approve(lpdepositer, staked, {"from": whale})
+    start = lpdepositer.deposit(pair, staked, {"from": whale}).timestamp
+    assert lpdepositer.userBalances(whale, pair) == staked
+
+    chain.sleep(3_600)
+    end = lpdepositer.getReward([pair], {"from": whale}).timestamp
+    elapsed = end - start
+    assert sex.balanceOf(whale) == staked * elapsed * lpdepositer.sexPerLp() // 10 ** 18
+    assert solid.balanceOf(whale) == staked * elapsed * lpdepositer.solidPerLp() // 10 ** 18
+
+    lpdepositer.withdraw(pair, staked, {"from": whale})
+    assert lp.balanceOf(whale) == staked
+
+
+def test_mock_twap(mock_ecosystem, solidex_router, boo, wftm, whale):
+    pair = mock_ecosystem.reward_pairs["boo"]
+    update_oracles(mock_ecosystem, 5)
+    assert pair.observationLength() >= 5
+
+    # reserves haven't moved, so the twap is the spot price without the fee
+    amount_in = 1_000 * 10 ** 18
+    (reserve0, reserve1, _) = pair.getReserves()
+    (reserve_in, reserve_out) = (
+        (reserve0, reserve1) if pair.token0() == wftm.address else (reserve1, reserve0)
+    )
+    twap = pair.quote(wftm, amount_in, 4)
+    assert twap == amount_in * reserve_out // (reserve_in + amount_in)
+
+    # dumping boo into the pair moves the spot price, but not the twap
+    spot = pair.getAmountOut(amount_in, wftm)
+    boo.approve(solidex_router, 2 ** 256 - 1, {"from": whale})
+    solidex_router.swapExactTokensForTokens(
+        100_000 * 10 ** 18, 0, [(boo.address, wftm.address, False)], whale, 2 ** 256 - 1, {"from": whale}
+    )
+    assert pair.getAmountOut(amount_in, wftm) < spot * 9 // 10
+    assert pair.quote(wftm, amount_in, 4) == twap
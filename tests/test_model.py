@@ -0,0 +1,232 @@
+import brownie
+from brownie import Contract
+from brownie import config
+import random
+import time
+
+from strategy_tools import model, vectorized
+
+# pin our python model of the strategy maths to the contract, to the wei
+
+
+def read_state(strategy, boo, xboo, lpdepositer):
+    pools = []
+    for i in range(strategy.poolCount()):
+        (lp_token, stable, weight) = strategy.pools(i)
+        pair = Contract(lp_token)
+        (reserve0, reserve1, _) = pair.getReserves()
+        if pair.token0() != boo.address:
+            (reserve0, reserve1) = (reserve1, reserve0)
+        pools.append(
+            model.PoolState(
+                reserve0,
+                reserve1,
+                pair.totalSupply(),
+                lpdepositer.userBalances(strategy, pair),
+                pair.balanceOf(strategy),
+                weight,
+                stable,
+            )
+        )
+    xboo_state = model.XbooState(boo.balanceOf(xboo), xboo.totalSupply())
+    return pools, xboo_state, boo.balanceOf(strategy), xboo.balanceOf(strategy)
+
+
+def test_model_matches_chain(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    chain,
+    amount,
+    boo,
+    xboo,
+    lpdepositer,
+):
+    ## deposit to the vault after approving
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    chain.sleep(1)
+
+    pools, xboo_state, loose_boo, loose_xboo = read_state(
+        strategy, boo, xboo, lpdepositer
+    )
+    assert model.estimated_total_assets(
+        pools, xboo_state, loose_boo, loose_xboo
+    ) == strategy.estimatedTotalAssets()
+    assert model.xboo_rate(xboo_state) == xboo.xBOOForBOO(1e18)
+
+    for fraction in [1, 100, 5_000, 9_999]:
+        wanted = amount * fraction // 10_000
+        assert model.boo_to_lp_tokens(
+            pools[0], xboo_state, wanted
+        ) == strategy.booToLpTokens(wanted, 0)
+
+        (lp_to_remove, lp_to_unstake, _) = strategy.withdrawalPlan(wanted)
+        assert model.plan_withdrawal(pools, xboo_state, loose_boo, wanted) == (
+            list(lp_to_remove),
+            list(lp_to_unstake),
+        )
+
+    # donate some boo and predict exactly what our deposit does with it
+    token.transfer(strategy, amount / 7, {"from": whale})
+    pools, xboo_state, loose_boo, loose_xboo = read_state(
+        strategy, boo, xboo, lpdepositer
+    )
+    assert model.lp_price_in_range(pools[0], xboo_state, strategy.lpSlippage())
+    [allocation] = model.deposit_allocations(pools, xboo_state, loose_boo)
+    predicted = model.deposit(pools[0], xboo_state, allocation, loose_xboo)
+
+    strategy.tend({"from": gov})
+
+    pools_after, _, boo_after, xboo_after = read_state(strategy, boo, xboo, lpdepositer)
+    assert pools_after[0].staked_lp - pools[0].staked_lp == predicted.lp_minted
+    assert boo_after == loose_boo - allocation + predicted.boo_left
+    assert xboo_after == predicted.xboo_left
+
+
+def test_vectorized_model_matches_scalar():
+    random.seed(1)
+    n = 20_000
+    states = []
+    for _ in range(n):
+        reserve_boo = random.randint(10 ** 18, 10 ** 25)
+        boo_in_xboo = random.randint(10 ** 20, 10 ** 26)
+        states.append(
+            (
+                reserve_boo,
+                reserve_boo * random.randint(700, 800) // 1000,
+                random.randint(10 ** 18, 10 ** 25),
+                boo_in_xboo,
+                boo_in_xboo * random.randint(700, 800) // 1000,
+                random.randint(10 ** 17, 10 ** 24),
+                random.choice([0, random.randint(0, 10 ** 22)]),
+            )
+        )
+    columns = [vectorized.as_uint(column) for column in zip(*states)]
+    (reserve_boo, reserve_xboo, lp_supply, boo_in_xboo, xboo_supply, boo, loose_xboo) = columns
+
+    start = time.perf_counter()
+    boo_to_enter, xboo_to_leave = vectorized.deposit_split(
+        reserve_boo, reserve_xboo, boo_in_xboo, xboo_supply, boo, loose_xboo
+    )
+    lp_needed = vectorized.boo_to_lp_tokens(
+        reserve_boo, reserve_xboo, lp_supply, boo_in_xboo, xboo_supply, boo
+    )
+    in_range = vectorized.lp_price_in_range(
+        reserve_boo, reserve_xboo, boo_in_xboo, xboo_supply, 995
+    )
+    elapsed = time.perf_counter() - start
+    print(f"\n{n / elapsed:,.0f} states per second")
+
+    for i, state in enumerate(states):
+        pool = model.PoolState(state[0], state[1], state[2])
+        xboo_state = model.XbooState(state[3], state[4])
+        assert model.deposit_split(pool, xboo_state, state[5], state[6]) == (
+            boo_to_enter[i],
+            xboo_to_leave[i],
+        )
+        assert model.boo_to_lp_tokens(pool, xboo_state, state[5]) == lp_needed[i]
+        assert model.lp_price_in_range(pool, xboo_state, 995) == bool(in_range[i])
+
+
+
+
+# a pool nobody has lp in yet is worth nothing to us, only our loose boo and xboo count
+def test_vectorized_empty_pool():
+    xboo_state = model.XbooState(10 ** 21, 8 * 10 ** 20)
+    state = (10 ** 20, 5 * 10 ** 19, 0, 0, xboo_state.boo_in_xboo, xboo_state.xboo_supply, 7, 3 * 10 ** 18)
+    expected = model.estimated_total_assets([model.PoolState(*state[:4])], xboo_state, state[6], state[7])
+    assert vectorized.estimated_total_assets(*(vectorized.as_uint([value]) for value in state))[0] == expected
+    floats = vectorized.estimated_total_assets_float(*(vectorized.as_float([value]) for value in state))
+    assert abs(floats[0] - expected) <= expected * vectorized.FLOAT_TOLERANCE
+
+# the exact split still rounds: addLiquidity leaves up to about an xboo's worth of boo, plus a few wei
+def test_deposit_dust_bound():
+    random.seed(3)
+    worst_boo = worst_xboo = 0
+    for _ in range(20_000):
+        boo_in_xboo = random.randint(10 ** 18, 10 ** 24)
+        xboo_state = model.XbooState(boo_in_xboo, boo_in_xboo * 10 ** 18 // random.randint(10 ** 18, 3 * 10 ** 18))
+        reserve_xboo = random.randint(10 ** 18, 10 ** 24)
+        reserve_boo = reserve_xboo * model.xboo_rate(xboo_state) // 10 ** 18 * random.randint(995, 1005) // 1000
+        pool = model.PoolState(reserve_boo, reserve_xboo, random.randint(10 ** 18, 10 ** 24))
+        loose_xboo = random.choice([0, random.randint(0, 10 ** 22)])
+        try:
+            result = model.deposit(pool, xboo_state, random.randint(0, 10 ** 23), loose_xboo)
+        except model.Revert:
+            continue
+        assert result.boo_left <= reserve_boo // reserve_xboo + 3
+        assert result.xboo_left <= 3
+        worst_boo = max(worst_boo, result.boo_left)
+        worst_xboo = max(worst_xboo, result.xboo_left)
+    print(f"\nmost dust left: {worst_boo} wei of boo, {worst_xboo} wei of xboo")
+
+def test_float_model_throughput():
+    random.seed(2)
+    n = 500_000
+    reserve_boo = [random.randint(10 ** 18, 10 ** 25) for _ in range(n)]
+    reserve_xboo = [r * random.randint(700, 800) // 1000 for r in reserve_boo]
+    lp_supply = [random.randint(10 ** 18, 10 ** 25) for _ in range(n)]
+    boo_in_xboo = [random.randint(10 ** 20, 10 ** 26) for _ in range(n)]
+    xboo_supply = [b * random.randint(700, 800) // 1000 for b in boo_in_xboo]
+    boo = [random.randint(10 ** 17, 10 ** 24) for _ in range(n)]
+    loose_xboo = [random.choice([0, random.randint(0, 10 ** 22)]) for _ in range(n)]
+    # a tenth of our states sit within a few wei of either edge of the lpSlippage gate
+    for i in range(0, n, 10):
+        rate = boo_in_xboo[i] * 10 ** 18 // xboo_supply[i]
+        edge = rate * 995 // 1000 if i % 20 == 0 else rate * 1000 // 995
+        reserve_boo[i] = edge * reserve_xboo[i] // 10 ** 18 + random.randint(-3, 3)
+
+    exact = [
+        vectorized.as_uint(column)
+        for column in (reserve_boo, reserve_xboo, lp_supply, boo_in_xboo, xboo_supply, boo, loose_xboo)
+    ]
+    approx = [vectorized.as_float(column) for column in exact]
+    (reserve_boo, reserve_xboo, lp_supply, boo_in_xboo, xboo_supply, boo, loose_xboo) = approx
+
+    start = time.perf_counter()
+    boo_to_enter, xboo_to_leave = vectorized.deposit_split_float(
+        reserve_boo, reserve_xboo, boo_in_xboo, xboo_supply, boo, loose_xboo
+    )
+    lp_needed = vectorized.boo_to_lp_tokens_float(
+        reserve_boo, reserve_xboo, lp_supply, boo_in_xboo, xboo_supply, boo
+    )
+    in_range = vectorized.lp_price_in_range_float(
+        (reserve_boo, reserve_xboo, boo_in_xboo, xboo_supply),
+        (exact[0], exact[1], exact[3], exact[4]),
+        995,
+    )
+    elapsed = time.perf_counter() - start
+    print(f"\n{n / elapsed:,.0f} states per second")
+    assert n / elapsed > 1_000_000
+
+    # the gate matches our exact model on every state, edges included, and amounts to FLOAT_TOLERANCE
+    assert (in_range == vectorized.lp_price_in_range(exact[0], exact[1], exact[3], exact[4], 995).astype(bool)).all()
+    expected = vectorized.deposit_split(exact[0], exact[1], exact[3], exact[4], exact[5], exact[6])
+    expected += (vectorized.boo_to_lp_tokens(exact[0], exact[1], exact[2], exact[3], exact[4], exact[5]),)
+    for result, wanted in zip((boo_to_enter, xboo_to_leave, lp_needed), expected):
+        wanted = vectorized.as_float(wanted)
+        assert (abs(result - wanted) <= vectorized.FLOAT_TOLERANCE * abs(wanted) + 10).all()
+
+
+# a stable pair's price comes off its curve, which sits near 1:1 whatever its reserves
+def test_stable_pool_price_in_range():
+    xboo_state = model.XbooState(130 * 10 ** 18, 100 * 10 ** 18)
+    rate = model.xboo_rate(xboo_state)
+    reserve_xboo = 1_000 * 10 ** 18
+
+    # reserves in xboo's rate only price a volatile pair right
+    volatile = model.PoolState(reserve_xboo * rate // 10 ** 18, reserve_xboo, 10 ** 21)
+    assert model.lp_price_in_range(volatile, xboo_state, 995)
+    assert not model.lp_price_in_range(volatile._replace(stable=True), xboo_state, 995)
+
+    parity = reserve_xboo * model.stable_reserve_ratio(rate) // 10 ** 18
+    stable = model.PoolState(parity, reserve_xboo, 10 ** 21, stable=True)
+    assert model.lp_price_in_range(stable, xboo_state, 995)
+    assert model.lp_price_in_range(stable, xboo_state, 999)
+    assert not model.lp_price_in_range(stable._replace(reserve_boo=parity * 95 // 100), xboo_state, 995)
@@ -0,0 +1,113 @@
+import brownie
+from brownie import Contract
+from brownie import config
+import pytest
+
+
+def test_multi_pool(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    chain,
+    amount,
+    stable_pool,
+    gas_snapshot,
+):
+    strategy.addPool(stable_pool, {"from": gov})
+    assert strategy.poolCount() == 2
+    assert strategy.pools(1)[1] == True
+
+    # weights need to add up to 100%
+    with brownie.reverts():
+        strategy.setPoolWeights([5_000, 4_000], {"from": gov})
+    strategy.setPoolWeights([5_000, 5_000], {"from": gov})
+
+    ## deposit to the vault after approving
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    chain.sleep(1)
+
+    # both pools got roughly half of our deposit
+    snapshot = strategy.positionSnapshot()
+    values = [
+        pool["booInLp"] + pool["xbooInLp"] * snapshot["xbooRate"] // 10 ** 18
+        for pool in snapshot["pools"]
+    ]
+    assert all(pool["stakedLp"] > 0 for pool in snapshot["pools"])
+    assert abs(values[0] - values[1]) < amount / 100
+
+    # each pool's views read that pool, and the ones without an index our first pool
+    for i, pool in enumerate(snapshot["pools"]):
+        lp = pool["stakedLp"] + pool["looseLp"]
+        assert strategy.balanceOfLPStaked(i) == pool["stakedLp"]
+        assert strategy.balanceOfConstituents(lp, i) == (pool["booInLp"], pool["xbooInLp"])
+    assert strategy.balanceOfLPStaked() == snapshot["pools"][0]["stakedLp"]
+    assert strategy.booToLpTokens(amount // 10) == strategy.booToLpTokens(amount // 10, 0)
+    assert strategy.booToLpTokens(amount // 10, 1) != strategy.booToLpTokens(amount // 10, 0)
+
+    # simulate 12 hours of earnings, one getReward call covers both pools
+    chain.sleep(43200)
+    chain.mine(1)
+    token.transfer(strategy, amount / 100, {"from": whale})
+    strategy.setDoHealthCheck(False, {"from": gov})
+    tx = strategy.harvest({"from": gov})
+    assert tx.events["Harvested"]["profit"] > 0
+    print("Harvest gas per pool with 2 pools:", tx.gas_used / 2)
+    gas_snapshot.check("harvest_profit_two_pools", tx.gas_used, tx)
+
+    # withdrawals come out of both pools
+    staked = [pool["stakedLp"] for pool in strategy.positionSnapshot()["pools"]]
+    vault.withdraw(vault.balanceOf(whale) // 2, whale, 0, {"from": whale})
+    after = [pool["stakedLp"] for pool in strategy.positionSnapshot()["pools"]]
+    assert after[0] < staked[0]
+    assert after[1] < staked[1]
+    assert vault.strategies(strategy).dict()["totalLoss"] == 0
+
+
+def test_remove_pool(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    chain,
+    amount,
+    stable_pool,
+    lpdepositer,
+):
+    strategy.addPool(stable_pool, {"from": gov})
+    strategy.setPoolWeights([5_000, 5_000], {"from": gov})
+
+    ## deposit to the vault after approving
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    chain.sleep(3_600)
+    chain.mine(1)
+    total = strategy.estimatedTotalAssets()
+    assert lpdepositer.pendingRewards(strategy, [stable_pool])[0][0] > 0
+
+    # can't remove a pool that still has weight, or our last pool
+    with brownie.reverts():
+        strategy.removePool(1, {"from": gov})
+    strategy.setPoolWeights([10_000, 0], {"from": gov})
+    strategy.removePool(1, {"from": gov})
+    assert strategy.poolCount() == 1
+    # our harvests won't claim from it any more, so removing it claimed what it had earned us
+    assert lpdepositer.pendingRewards(strategy, [stable_pool])[0] == (0, 0)
+    with brownie.reverts():
+        strategy.removePool(0, {"from": gov})
+
+    # everything from the old pool is loose, and our next harvest redeploys it
+    assert stable_pool.balanceOf(strategy) == 0
+    assert strategy.estimatedTotalAssets() >= total * 0.999
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    assert token.balanceOf(strategy) <= 5
@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+import brownie
+from brownie import Contract
+from brownie import config
+from brownie import web3
+
+from strategy_tools.multicall import DEFAULT_VIEWS, read_fleet, read_fleet_unbatched
+from strategy_tools.rpc import RpcClient
+
+# our multicall reader should match one-call-at-a-time reads, in far fewer round-trips
+
+
+def test_multicall_reads_fleet(
+    Strategy,
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    strategist,
+    strategy_name,
+    chain,
+    amount,
+):
+    vault.updateStrategyDebtRatio(strategy, 2_000, {"from": gov})
+    strategies = [strategy]
+    for i in range(9):
+        new_strategy = strategist.deploy(Strategy, vault, strategy_name)
+        vault.addStrategy(new_strategy, 800, 0, 2 ** 256 - 1, 1_000, {"from": gov})
+        strategies.append(new_strategy)
+
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    chain.mine(1)
+    block = chain.height
+    addresses = [s.address for s in strategies]
+
+    async def run():
+        async with RpcClient(web3.provider.endpoint_uri) as rpc:
+            start = time.perf_counter()
+            batched = await read_fleet(rpc, addresses)
+            batched_time = time.perf_counter() - start
+            batched_calls = rpc.calls
+
+            start = time.perf_counter()
+            unbatched = await read_fleet_unbatched(rpc, addresses, block=batched[0].block)
+            unbatched_time = time.perf_counter() - start
+            return batched, batched_calls, batched_time, unbatched, rpc.calls - batched_calls, unbatched_time
+
+    batched, batched_calls, batched_time, unbatched, unbatched_calls, unbatched_time = asyncio.run(run())
+
+    views = len(addresses) * len(DEFAULT_VIEWS)
+    print(f"Batched: {batched_calls} round-trips, {views / batched_time:.0f} views/s")
+    print(f"Unbatched: {unbatched_calls} round-trips, {views / unbatched_time:.0f} views/s")
+
+    assert batched_calls == 2
+    assert unbatched_calls >= views
+    assert batched == unbatched
+
+    # and every record matches what brownie reads
+    for s, state in zip(strategies, batched):
+        assert state.block == block
+        assert state.vault == vault.address
+        assert state.errors == {}
+        assert state.estimated_total_assets == s.estimatedTotalAssets()
+        assert state.balance_of_lp_staked == s.balanceOfLPStaked()
+        assert state.balance_of_constituents == tuple(s.balanceOfConstituents(1e18))
+        assert state.lp_slippage == s.lpSlippage()
+        assert state.trades_enabled == s.tradesEnabled()
+        assert state.params.total_debt == vault.strategies(s).dict()["totalDebt"]
+    assert batched[0].balance_of_lp_staked > 0
+
+
+# an account has no code, so its calls succeed with nothing returned, and that's no vault either
+def test_multicall_not_strategies(accounts, token, strategy):
+    addresses = [strategy.address, token.address, accounts[5].address]
+
+    async def run():
+        async with RpcClient(web3.provider.endpoint_uri) as rpc:
+            return await read_fleet(rpc, addresses), await read_fleet_unbatched(rpc, addresses)
+
+    batched, unbatched = asyncio.run(run())
+    assert batched == unbatched
+    assert batched[0].errors == {}
+    for state in batched[1:]:
+        assert state.vault is None
+        assert state.estimated_total_assets is None
+        assert "vault" in state.errors
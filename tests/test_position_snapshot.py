@@ -0,0 +1,64 @@
+import brownie
+from brownie import Contract
+from brownie import config
+
+
+def test_position_snapshot(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    chain,
+    amount,
+    boo,
+    xboo,
+):
+    ## deposit to the vault after approving
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    chain.sleep(1)
+
+    # leave some loose boo and xboo in the strategy too
+    token.transfer(strategy, amount / 10, {"from": whale})
+    token.approve(xboo, 2 ** 256 - 1, {"from": whale})
+    xboo.enter(amount / 10, {"from": whale})
+    xboo.transfer(strategy, xboo.balanceOf(whale), {"from": whale})
+
+    snapshot = strategy.positionSnapshot()
+    pool = snapshot["pools"][0]
+    lp = Contract(strategy.pools(0)[0])
+
+    # every component matches the individual views
+    assert pool["lpToken"] == lp.address
+    assert pool["stakedLp"] == strategy.balanceOfLPStaked()
+    assert pool["looseLp"] == lp.balanceOf(strategy)
+    assert pool["lpSupply"] == lp.totalSupply()
+    assert snapshot["looseXboo"] == xboo.balanceOf(strategy)
+    assert snapshot["looseBoo"] == strategy.balanceOfWant()
+    assert snapshot["xbooRate"] == xboo.xBOOForBOO(1e18)
+
+    (value_boo, value_xboo) = strategy.balanceOfConstituents(
+        pool["stakedLp"] + pool["looseLp"]
+    )
+    assert pool["booInLp"] == snapshot["booInLp"] == value_boo
+    assert pool["xbooInLp"] == snapshot["xbooInLp"] == value_xboo
+
+    # and our total matches the old per-call maths exactly
+    total = (
+        value_boo
+        + xboo.xBOOForBOO(value_xboo + snapshot["looseXboo"])
+        + snapshot["looseBoo"]
+    )
+    assert snapshot["totalAssets"] == total
+    assert strategy.estimatedTotalAssets() == total
+
+    # harvesting off the snapshot still pays everyone back
+    vault.updateStrategyDebtRatio(strategy, 0, {"from": gov})
+    chain.sleep(1)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    assert vault.strategies(strategy).dict()["totalLoss"] == 0
@@ -0,0 +1,145 @@
+import asyncio
+import time
+
+import numpy as np
+
+from strategy_tools import model
+from strategy_tools.split_route import route_outputs, shared_pools, split_amount
+from strategy_tools.yswaps import (
+    APPROVE,
+    SOLIDLY,
+    SPOOKY,
+    SWAP_SOLIDLY,
+    SWAP_V2,
+    WFTM,
+    Pool,
+    QuoteCache,
+    Trade,
+    _segments,
+    _sorted,
+    build_payloads,
+)
+
+# the split optimizer on synthetic reserves, no chain needed
+
+SEX = "0xD31Fcd1f7Ba190dBc75354046F6024A9b86014d7"
+BOO = "0x841FAD6EAe12c286d1Fd18d1d525DFfA75C7EFFE"
+E = 10 ** 18
+
+
+def make_cache(pools):
+    cache = QuoteCache(None)
+    for i, (venue, token_a, token_b, reserve_a, reserve_b, stable) in enumerate(pools):
+        (token0, token1) = _sorted(token_a, token_b)
+        reserves = (reserve_a, reserve_b) if token0 == token_a else (reserve_b, reserve_a)
+        cache.add_pool(Pool(venue, f"0x{i + 1:040x}", token0, token1, stable), reserves)
+    # the snapshot is all there is, so pairs without a pool are known to have none
+    tokens = {token for pair in list(cache.pools) for token in pair}
+    for token_a in tokens:
+        for token_b in tokens - {token_a}:
+            cache.pools.setdefault(_sorted(token_a, token_b), [])
+    return cache
+
+
+def sex_cache():
+    return make_cache(
+        [
+            (SPOOKY, SEX, WFTM, 1_000_000 * E, 1_010_000 * E, False),
+            (SOLIDLY, SEX, WFTM, 1_000_000 * E, 1_000_000 * E, False),
+            (SOLIDLY, SEX, WFTM, 500_000 * E, 500_000 * E, True),
+            (SPOOKY, WFTM, BOO, 2_000_000 * E, 2_000_000 * E, False),
+            (SOLIDLY, WFTM, BOO, 1_000_000 * E, 1_000_000 * E, False),
+        ]
+    )
+
+
+def test_curves_match_exact_maths():
+    cache = sex_cache()
+    candidates = cache.candidates(SEX, BOO)
+    curves = cache.curves(candidates)
+    amounts = np.array([1, 1_000, 100_000, 400_000], dtype=float)
+    outputs = route_outputs(curves, np.broadcast_to(amounts, (len(candidates), len(amounts))))
+    for candidate, row in zip(candidates, outputs):
+        for amount, output in zip(amounts, row):
+            exact = cache.quote(candidate, int(amount) * E).amount_out / E
+            assert abs(output - exact) <= exact * 1e-9
+
+
+def test_split_beats_single_route_for_big_sales():
+    cache = sex_cache()
+    for amount in [10_000 * E, 100_000 * E, 300_000 * E]:
+        single = cache.best_route(SEX, BOO, amount)
+        routes = cache.split_routes(SEX, BOO, amount)
+        assert len(routes) > 1
+        assert sum(route.hops[0].amount_in for route in routes) == amount
+        assert sum(route.amount_out for route in routes) > single.amount_out
+
+        # no two routes touch the same pool, so every quote stands on its own
+        pools = [hop.pool.address for route in routes for hop in route.hops]
+        assert len(pools) == len(set(pools))
+
+
+def test_small_sales_take_one_route():
+    cache = sex_cache()
+    routes = cache.split_routes(SEX, BOO, 10 * E)
+    assert routes == (cache.best_route(SEX, BOO, 10 * E),)
+    assert cache.split_routes(SEX, BOO, 0) == ()
+
+
+def test_split_amount_edge_cases():
+    cache = sex_cache()
+    curves = cache.curves(cache.candidates(SEX, BOO))
+    shared = shared_pools(curves)
+    assert not shared.diagonal().any()
+    assert (shared == shared.T).all()
+    assert split_amount(curves, 0).sum() == 0
+
+    # an empty pool never gets anything
+    empty = make_cache([(SPOOKY, SEX, BOO, 0, 0, False), (SOLIDLY, SEX, BOO, 1_000 * E, 1_000 * E, False)])
+    allocations = split_amount(empty.curves(empty.candidates(SEX, BOO)), 100 * E)
+    assert list(allocations) == [0, 100 * E]
+
+
+def test_split_payload():
+    cache = sex_cache()
+    strategy = "0x" + "11" * 20
+    trade = Trade(strategy, SEX, BOO, 200_000 * E)
+
+    async def build():
+        return await build_payloads(cache, [trade], block=1, split_steps=64)
+
+    (payload,) = asyncio.run(build())
+    assert len(payload.routes) > 1
+    assert payload.amount_out == sum(route.amount_out for route in payload.routes)
+    assert payload.min_amount_out == sum(
+        route.amount_out * (model.BASIS_POINTS - 50) // model.BASIS_POINTS for route in payload.routes
+    )
+    # an approve and a swap for every venue on every route
+    segments = sum(len(_segments(route)) for route in payload.routes)
+    assert payload.swapper_data.count(APPROVE) == segments
+    assert payload.swapper_data.count(SWAP_V2) + payload.swapper_data.count(SWAP_SOLIDLY) == segments
+
+
+def test_split_speed_tens_of_pools():
+    # sex and boo through six connectors, three pools on every hop
+    connectors = [f"0x{0xc0 + i:040x}" for i in range(6)]
+    pools = [(SOLIDLY, SEX, BOO, 100_000 * E, 100_000 * E, False)]
+    for i, connector in enumerate(connectors):
+        for token in (SEX, BOO):
+            size = (500_000 + 100_000 * i) * E
+            pools.append((SPOOKY, token, connector, size, size, False))
+            pools.append((SOLIDLY, token, connector, size, size, False))
+            pools.append((SOLIDLY, token, connector, size // 2, size // 2, True))
+    cache = make_cache(pools)
+    cache.connectors = connectors
+    assert sum(len(p) for p in cache.pools.values()) == 37
+
+    cache.split_routes(SEX, BOO, 1_000_000 * E)
+    start = time.perf_counter()
+    routes = cache.split_routes(SEX, BOO, 1_000_000 * E)
+    elapsed = time.perf_counter() - start
+    print(f"Split across {len(cache.candidates(SEX, BOO))} candidate routes in {elapsed * 1000:.1f}ms")
+
+    assert len(routes) > 2
+    assert sum(route.amount_out for route in routes) > cache.best_route(SEX, BOO, 1_000_000 * E).amount_out
+    assert elapsed < 0.1
@@ -0,0 +1,160 @@
+import asyncio
+import time
+
+import brownie
+from brownie import Contract
+from brownie import config
+from brownie import web3
+
+from strategy_tools.lens import read_fleet_lens
+from strategy_tools.multicall import read_fleet
+from strategy_tools.rpc import RpcClient
+
+# a whole fleet's state in one eth_call of our never deployed StrategyLens
+
+FLEET = 200
+PER_VAULT = 20  # a vault's withdrawal queue holds 20 strategies
+
+
+def new_vault(pm, gov, rewards, guardian, management, token):
+    Vault = pm(config["dependencies"][0]).Vault
+    vault = guardian.deploy(Vault)
+    vault.initialize(token, gov, rewards, "", "", guardian)
+    vault.setDepositLimit(2 ** 256 - 1, {"from": gov})
+    vault.setManagement(management, {"from": gov})
+    vault.setManagementFee(0, {"from": gov})
+    return vault
+
+
+def check_state(state, s, vault, block):
+    staked = s.balanceOfLPStaked()
+    position = s.positionSnapshot()
+    params = vault.strategies(s).dict()
+    assert state.block == block
+    assert state.errors == {}
+    assert state.vault == vault.address
+    assert state.harvest_trigger == s.harvestTrigger(0)
+    assert state.estimated_total_assets == s.estimatedTotalAssets()
+    assert state.balance_of_lp_staked == staked
+    assert (state.boo_in_lp, state.xboo_in_lp) == (position["booInLp"], position["xbooInLp"])
+    # per 1e18 lp, which the lens doesn't read
+    assert state.balance_of_constituents is None
+    assert state.credit_available == vault.creditAvailable(s)
+    assert state.params.debt_ratio == params["debtRatio"]
+    assert state.params.activation == params["activation"]
+    assert state.params.last_report == params["lastReport"]
+    assert state.params.total_debt == params["totalDebt"]
+    assert state.params.max_debt_per_harvest == params["maxDebtPerHarvest"]
+
+
+def test_lens_matches_reads(
+    StrategyLens, Strategy, accounts, gov, token, vault, whale, strategy, strategist, rewards, keeper, chain, amount,
+):
+    vault.updateStrategyDebtRatio(strategy, 5_000, {"from": gov})
+    tx = strategy.cloneStrategy(vault, strategist, rewards, keeper, "Idle", strategy.pools(0)[0], {"from": gov})
+    idle = Strategy.at(tx.events["Cloned"]["clone"])
+    vault.addStrategy(idle, 2_500, 0, 2 ** 256 - 1, 1_000, {"from": gov})
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    chain.mine(1)
+    block = chain.height
+
+    # the token has none of our views and an account has no code at all, neither breaks the snapshot
+    eoa = accounts[5]
+
+    async def run():
+        async with RpcClient(web3.provider.endpoint_uri) as rpc:
+            return await read_fleet_lens(rpc, [c.address for c in (strategy, idle, token, eoa)], StrategyLens.bytecode)
+
+    (harvested, not_harvested, not_a_strategy, no_code) = asyncio.run(run())
+    check_state(harvested, strategy, vault, block)
+    check_state(not_harvested, idle, vault, block)
+    assert harvested.balance_of_lp_staked > 0
+    assert not_harvested.credit_available > 0
+
+    for state in (not_a_strategy, no_code):
+        assert state.vault is None and state.params is None and state.harvest_trigger is None
+        assert set(state.errors) >= {"vault", "strategies", "creditAvailable", "harvestTrigger"}
+    assert no_code.address == eoa.address
+
+
+# with two pools our boo and xboo come from both, not from the first pool's staked lp
+def test_lens_two_pools(StrategyLens, gov, token, vault, whale, strategy, chain, amount, stable_pool):
+    strategy.addPool(stable_pool, {"from": gov})
+    strategy.setPoolWeights([5_000, 5_000], {"from": gov})
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    chain.mine(1)
+
+    async def run():
+        async with RpcClient(web3.provider.endpoint_uri) as rpc:
+            return await read_fleet_lens(rpc, [strategy.address], StrategyLens.bytecode)
+
+    (state,) = asyncio.run(run())
+    check_state(state, strategy, vault, chain.height)
+    pools = strategy.positionSnapshot()["pools"]
+    assert all(pool["booInLp"] > 0 for pool in pools)
+    assert state.boo_in_lp == sum(pool["booInLp"] for pool in pools)
+    assert state.xboo_in_lp == sum(pool["xbooInLp"] for pool in pools)
+    assert state.boo_in_lp > pools[0]["booInLp"]
+
+
+def test_lens_fleet_latency(
+    StrategyLens, Strategy, pm, gov, token, whale, strategy, strategist, rewards, keeper, guardian, management,
+    trade_factory, ymechs_safe, chain, amount,
+):
+    fleet = []
+    vaults = {}
+    for v in range(FLEET // PER_VAULT):
+        vault = new_vault(pm, gov, rewards, guardian, management, token)
+        for i in range(PER_VAULT):
+            tx = strategy.cloneStrategy(vault, strategist, rewards, keeper, f"Lens{v}-{i}", strategy.pools(0)[0], {"from": gov})
+            clone = Strategy.at(tx.events["Cloned"]["clone"])
+            vault.addStrategy(clone, 10_000 // PER_VAULT, 0, 2 ** 256 - 1, 1_000, {"from": gov})
+            fleet.append(clone)
+            vaults[clone.address] = vault
+        token.approve(vault, 2 ** 256 - 1, {"from": whale})
+        vault.deposit(amount // 20, {"from": whale})
+        # one harvested strategy per vault, so the fleet isn't all zeros
+        chain.sleep(1)
+        trade_factory.grantRole(trade_factory.STRATEGY(), fleet[-1], {"from": ymechs_safe, "gas_price": "0 gwei"})
+        fleet[-1].setDoHealthCheck(False, {"from": gov})
+        fleet[-1].harvest({"from": gov})
+    chain.mine(1)
+    block = chain.height
+    addresses = [s.address for s in fleet]
+
+    async def run():
+        async with RpcClient(web3.provider.endpoint_uri) as rpc:
+            start = time.perf_counter()
+            lens = await read_fleet_lens(rpc, addresses, StrategyLens.bytecode)
+            lens_time = time.perf_counter() - start
+            lens_calls = rpc.calls
+
+            start = time.perf_counter()
+            multicall = await read_fleet(rpc, addresses, block=block)
+            return lens, lens_calls, lens_time, multicall, time.perf_counter() - start
+
+    lens, lens_calls, lens_time, multicall, multicall_time = asyncio.run(run())
+
+    print(f"\nLens: {FLEET} strategies in {lens_calls} round-trips, {lens_time * 1000:.0f}ms")
+    print(f"Multicall: {FLEET} strategies in {multicall_time * 1000:.0f}ms")
+
+    assert lens_calls == 2
+    assert len(lens) == FLEET
+    for state, other in zip(lens, multicall):
+        assert state.address == other.address
+        assert state.errors == {}
+        assert state.vault == other.vault
+        assert state.estimated_total_assets == other.estimated_total_assets
+        assert state.balance_of_lp_staked == other.balance_of_lp_staked
+        assert state.params == other.params
+    for i in (0, PER_VAULT - 1, FLEET - 1):
+        check_state(lens[i], fleet[i], vaults[fleet[i].address], block)
+    assert sum(state.balance_of_lp_staked > 0 for state in lens) == FLEET // PER_VAULT
@@ -0,0 +1,198 @@
+import asyncio
+
+import brownie
+from brownie import Contract
+from brownie import config
+from brownie import web3
+import pytest
+
+from strategy_tools.rpc import RpcClient
+
+from mock_ecosystem import update_oracles
+from strategy_tools.yswaps import SOLIDLY, QuoteCache, Trade, build_payloads
+
+# two vaults, one strategy each, harvested every 12 hours for a week. one sells its sex and solid inside
+# harvest, the other through ySwaps straight after it, so that boo only gets deposited a harvest later.
+# both sell through the same solidly pairs, what's left between them is the yield of compounding earlier
+
+HARVESTS = 14
+DELAY = 12  # hours
+XBOO_GROWTH = 20 * 10 ** 18  # boo added to xboo every hour
+
+
+@pytest.fixture(autouse=True)
+def only_offline(offline):
+    if not offline:
+        pytest.skip("simulates on our mock pools, run with --network development")
+
+
+def sell_through_yswaps(strategy, boo, rewards, trade_factory, multicall_swapper, ymechs_safe):
+    trades = [Trade(strategy.address, reward.address, boo.address, reward.balanceOf(strategy)) for reward in rewards]
+    trades = [trade for trade in trades if trade.amount > 0]
+    if not trades:
+        return
+
+    async def build():
+        async with RpcClient(web3.provider.endpoint_uri) as rpc:
+            return await build_payloads(QuoteCache(rpc, venues=(SOLIDLY,)), trades, swapper=multicall_swapper.address)
+
+    for payload in asyncio.run(build()):
+        trade_factory.execute["tuple,address,bytes"](
+            payload.trade[:4] + (payload.min_amount_out,),
+            multicall_swapper,
+            payload.swapper_data,
+            {"from": ymechs_safe},
+        )
+
+
+def unsold_value(mock_ecosystem, strategy, lpdepositer, sex, solid):
+    """our loose and pending sex and solid in boo, at the twap."""
+    pending = lpdepositer.pendingRewards(strategy, [strategy.pools(0)[0]])[0]
+    in_wftm = 0
+    for name, token in (("sex", sex), ("solid", solid)):
+        amount = token.balanceOf(strategy) + pending[name]
+        if amount > 0:
+            in_wftm += mock_ecosystem.reward_pairs[name].quote(token, amount, 4)
+    return strategy.ethToWant(in_wftm)
+
+
+def test_sync_compounding_sim(
+    Strategy,
+    pm,
+    mock_ecosystem,
+    gov,
+    rewards,
+    guardian,
+    management,
+    token,
+    vault,
+    whale,
+    strategy,
+    strategist,
+    keeper,
+    chain,
+    amount,
+    boo,
+    xboo,
+    sex,
+    solid,
+    lpdepositer,
+    trade_factory,
+    multicall_swapper,
+    ymechs_safe,
+):
+    other_vault = guardian.deploy(pm(config["dependencies"][0]).Vault)
+    other_vault.initialize(token, gov, rewards, "", "", guardian)
+    other_vault.setDepositLimit(2 ** 256 - 1, {"from": gov})
+    tx = strategy.cloneStrategy(other_vault, strategist, rewards, keeper, "SyncBoo", strategy.pools(0)[0], {"from": gov})
+    synced = Strategy.at(tx.events["Cloned"]["clone"])
+    trade_factory.grantRole(trade_factory.STRATEGY(), synced, {"from": ymechs_safe, "gas_price": "0 gwei"})
+    other_vault.addStrategy(synced, 10_000, 0, 2 ** 256 - 1, 1_000, {"from": gov})
+    synced.setSyncCompounding(True, {"from": gov})
+
+    deposit = amount // 2
+    for v in (vault, other_vault):
+        v.setManagementFee(0, {"from": gov})
+        v.setPerformanceFee(0, {"from": gov})
+        token.approve(v, 2 ** 256 - 1, {"from": whale})
+        v.deposit(deposit, {"from": whale})
+    chain.sleep(1)
+    for s in (strategy, synced):
+        s.setDoHealthCheck(False, {"from": gov})
+        s.harvest({"from": gov})
+    update_oracles(mock_ecosystem, 5)
+
+    for i in range(HARVESTS):
+        for _ in range(DELAY):
+            chain.sleep(3_600)
+            boo.mint(xboo, XBOO_GROWTH, {"from": gov})
+            for pair in mock_ecosystem.reward_pairs.values():
+                pair.sync({"from": gov})
+
+        # take turns going first, so neither always sells into the other's price impact
+        for s in (strategy, synced) if i % 2 else (synced, strategy):
+            s.setDoHealthCheck(False, {"from": gov})
+            s.harvest({"from": gov})
+            if s == strategy:
+                sell_through_yswaps(strategy, boo, (sex, solid), trade_factory, multicall_swapper, ymechs_safe)
+        assert sex.balanceOf(synced) <= synced.minRewardToSell()
+        assert solid.balanceOf(synced) <= synced.minRewardToSell()
+
+    # what each vault holds, what its strategy hasn't reported yet, and rewards still to sell
+    results = {}
+    for v, s in ((vault, strategy), (other_vault, synced)):
+        unrealized = s.estimatedTotalAssets() - v.strategies(s).dict()["totalDebt"]
+        value = v.totalAssets() + unrealized + unsold_value(mock_ecosystem, s, lpdepositer, sex, solid)
+        results[s.address] = value - deposit
+
+    async_yield, sync_yield = results[strategy.address], results[synced.address]
+    print(f"\nySwaps after harvest: {async_yield / 1e18:.4f} boo")
+    print(f"Sold inside harvest: {sync_yield / 1e18:.4f} boo")
+    print(f"Compounding a harvest earlier: +{(sync_yield - async_yield) / 1e18:.4f} boo, "
+          f"{(sync_yield - async_yield) * 10_000 / async_yield:.1f} bps of yield")
+    assert async_yield > 0
+    assert sync_yield > async_yield
+
+
+def test_sync_compounding_dust_and_twap(
+    mock_ecosystem,
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    chain,
+    amount,
+    sex,
+    solid,
+    wftm,
+    solidex_router,
+):
+    with brownie.reverts():
+        strategy.setSyncCompounding(True, {"from": whale})
+    with brownie.reverts():
+        strategy.setRewardSellSlippage(10_001, {"from": gov})
+    strategy.setSyncCompounding(True, {"from": gov})
+    assert strategy.syncCompounding()
+    assert sex.allowance(strategy, solidex_router) == 2 ** 256 - 1
+
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+
+    # without twap history there's no min out we'd trust, so rewards wait for the trade factory
+    chain.sleep(86_400)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    assert sex.balanceOf(strategy) > 0
+
+    # with it, we sell everything over our dust threshold
+    update_oracles(mock_ecosystem, 5)
+    strategy.setMinRewardToSell(sex.balanceOf(strategy) * 10, {"from": gov})
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    assert sex.balanceOf(strategy) > 0
+    strategy.setMinRewardToSell(0, {"from": gov})
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    assert sex.balanceOf(strategy) == 0
+    assert solid.balanceOf(strategy) == 0
+
+    # dump sex on its pair right before harvest: spot falls well under the twap and our min out stops the sale
+    chain.sleep(86_400)
+    sex.mint(whale, 10 ** 24, {"from": whale})
+    sex.approve(solidex_router, 2 ** 256 - 1, {"from": whale})
+    solidex_router.swapExactTokensForTokens(
+        10 ** 24, 0, [(sex, wftm, False)], whale, 2 ** 256 - 1, {"from": whale}
+    )
+    strategy.setDoHealthCheck(False, {"from": gov})
+    with brownie.reverts():
+        strategy.harvest({"from": gov})
+
+    # async mode leaves it all to the trade factory
+    strategy.setSyncCompounding(False, {"from": gov})
+    assert sex.allowance(strategy, solidex_router) == 0
+    strategy.harvest({"from": gov})
+    assert sex.balanceOf(strategy) > 0
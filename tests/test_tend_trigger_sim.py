@@ -0,0 +1,155 @@
+import brownie
+from brownie import Contract
+from brownie import config
+import pytest
+
+from mock_ecosystem import update_oracles
+
+# two strategies side by side for a week, both harvested every 12 hours (their maxReportDelay). boo turns
+# up loose in both every few hours (donations, deposits the lpSlippage gate skipped), one of them waits
+# for its harvest to deposit it while the other is tended whenever tendTrigger(callCost) says so
+
+HOURS = 7 * 24
+HARVEST_EVERY = 12  # hours
+DONATE_EVERY = 3  # hours
+TEND_WORTH = 4 * 3_600  # a tend costs what a donation earns over this many seconds
+DONATION = 50 * 10 ** 18
+XBOO_GROWTH = 20 * 10 ** 18  # boo added to xboo every hour
+
+
+@pytest.fixture(autouse=True)
+def only_offline(offline):
+    if not offline:
+        pytest.skip("simulates on our mock pools, run with --network development")
+
+
+def pending_value(mock_ecosystem, strategy, lpdepositer, sex, solid):
+    """pending sex and solid in boo, the way tendTrigger prices them."""
+    pending = lpdepositer.pendingRewards(strategy, [strategy.pools(0)[0]])[0]
+    in_wftm = 0
+    for name, token in (("sex", sex), ("solid", solid)):
+        if pending[name] > 0:
+            in_wftm += mock_ecosystem.reward_pairs[name].quote(token, pending[name], 4)
+    return strategy.ethToWant(in_wftm)
+
+
+def test_tend_trigger_sim(
+    Strategy,
+    mock_ecosystem,
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    strategist,
+    keeper,
+    rewards,
+    chain,
+    amount,
+    boo,
+    xboo,
+    sex,
+    solid,
+    lpdepositer,
+    trade_factory,
+    ymechs_safe,
+):
+    # a clone of our strategy takes half of the vault, so both earn exactly the same
+    tx = strategy.cloneStrategy(vault, strategist, rewards, keeper, "TendedBoo", strategy.pools(0)[0], {"from": gov})
+    tended = Strategy.at(tx.events["Cloned"]["clone"])
+    trade_factory.grantRole(trade_factory.STRATEGY(), tended, {"from": ymechs_safe, "gas_price": "0 gwei"})
+    vault.updateStrategyDebtRatio(strategy, 5_000, {"from": gov})
+    vault.addStrategy(tended, 5_000, 0, 2 ** 256 - 1, 1_000, {"from": gov})
+    # tendTrigger prices a tend up to our next harvest, which comes on this schedule here
+    tended.setMaxReportDelay(HARVEST_EVERY * 3_600, {"from": gov})
+
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    for s in (strategy, tended):
+        s.setDoHealthCheck(False, {"from": gov})
+        s.harvest({"from": gov})
+
+    # no twap, no price for our gas, so no tend either
+    boo.mint(tended, DONATION, {"from": gov})
+    assert tended.tendTrigger(10 ** 18) == False
+    tended.tend({"from": gov})
+    update_oracles(mock_ecosystem, 5)
+
+    # price a tend at what a donation would earn over a few hours, so only early donations are worth a tend
+    invested = tended.estimatedTotalAssets() - tended.balanceOfWant()
+    elapsed = chain.time() - vault.strategies(tended).dict()["lastReport"]
+    cost_in_boo = pending_value(mock_ecosystem, tended, lpdepositer, sex, solid) * DONATION * TEND_WORTH // (
+        invested * elapsed
+    )
+    call_cost = mock_ecosystem.reward_pairs["boo"].quote(boo, cost_in_boo, 4)
+    assert tended.ethToWant(call_cost) > 0
+    assert tended.tendTrigger(call_cost) == False
+
+    utilization = {strategy.address: [], tended.address: []}
+    tends = 0
+    for hour in range(1, HOURS + 1):
+        chain.sleep(3_600)
+        boo.mint(xboo, XBOO_GROWTH, {"from": gov})
+        for pair in mock_ecosystem.reward_pairs.values():
+            pair.sync({"from": gov})
+        if hour % DONATE_EVERY == 0:
+            for s in (strategy, tended):
+                boo.mint(s, DONATION, {"from": gov})
+
+        if hour % HARVEST_EVERY == 0:
+            for s in (strategy, tended):
+                s.setDoHealthCheck(False, {"from": gov})
+                s.harvest({"from": gov})
+        elif tended.tendTrigger(call_cost):
+            tended.tend({"from": keeper})
+            tends += 1
+
+        for s in (strategy, tended):
+            utilization[s.address].append(1 - s.balanceOfWant() / s.estimatedTotalAssets())
+
+    # what each holds plus what it's still owed, less what the tends cost us
+    value = {}
+    for s in (strategy, tended):
+        value[s.address] = s.estimatedTotalAssets() + pending_value(mock_ecosystem, s, lpdepositer, sex, solid)
+    value[tended.address] -= tends * cost_in_boo
+
+    old_use = sum(utilization[strategy.address]) / HOURS
+    new_use = sum(utilization[tended.address]) / HOURS
+    print(f"\nHarvests only: {old_use:.2%} of assets invested on average, worth {value[strategy.address] / 1e18:.4f} boo")
+    print(f"Tended {tends} times: {new_use:.2%} of assets invested on average, worth {value[tended.address] / 1e18:.4f} "
+          f"boo after {tends * cost_in_boo / 1e18:.4f} boo of gas")
+    assert 0 < tends < HOURS // DONATE_EVERY
+    assert new_use > old_use
+    assert value[tended.address] > value[strategy.address]
+
+
+# idle boo would also earn what our position has grown by since our harvest (xboo growth here), a tend counts that too
+def test_tend_trigger_counts_xboo_growth(
+    mock_ecosystem, gov, token, vault, whale, strategy, chain, amount, boo, xboo, sex, solid, lpdepositer
+):
+    # xboo is about to grow 5% without our pool following, so let our lp price drift that far
+    strategy.setLpSlippage["uint256,bool"](900, True, {"from": gov})
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    update_oracles(mock_ecosystem, 5)
+    chain.sleep(3_600)
+    boo.mint(strategy, DONATION, {"from": gov})
+    chain.mine(1)
+
+    # a call that costs twice what our rewards alone say the donation would earn before our harvest
+    snapshot = strategy.positionSnapshot()
+    invested = snapshot["totalAssets"] - snapshot["looseBoo"]
+    since = chain.time() - vault.strategies(strategy).dict()["lastReport"]
+    rewards_only = pending_value(mock_ecosystem, strategy, lpdepositer, sex, solid) * DONATION * (
+        strategy.maxReportDelay() - since
+    ) // (invested * since)
+    assert rewards_only > 0
+    call_cost = mock_ecosystem.reward_pairs["boo"].quote(boo, 2 * rewards_only, 4)
+    assert strategy.tendTrigger(call_cost) == False
+
+    boo.mint(xboo, boo.balanceOf(xboo) // 20, {"from": gov})
+    assert strategy.tendTrigger(call_cost) == True
@@ -0,0 +1,103 @@
+import brownie
+from brownie import Contract
+from brownie import config
+from brownie.test import given, strategy as st
+from hypothesis import settings, HealthCheck
+
+# withdrawals size their lp exactly, so a withdrawal should never report a loss
+
+
+@given(share_bps=st("uint256", min_value=1, max_value=9_000))
+@settings(
+    max_examples=50, suppress_health_check=[HealthCheck.function_scoped_fixture]
+)
+def test_withdrawal_sizing_no_loss(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    chain,
+    amount,
+    share_bps,
+):
+    ## deposit to the vault after approving
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    chain.sleep(1)
+
+    shares = vault.balanceOf(whale) * share_bps // 10_000
+    to_withdraw = vault.pricePerShare() * shares // 10 ** token.decimals()
+
+    # our preflight should cover what the vault is about to ask for
+    (lp_to_remove, lp_to_unstake, boo_after) = strategy.withdrawalPlan(to_withdraw)
+    assert lp_to_unstake[0] <= lp_to_remove[0]
+    assert boo_after >= to_withdraw
+
+    before = token.balanceOf(whale)
+    tx = vault.withdraw(shares, whale, 0, {"from": whale})
+    print("Withdrawal gas:", tx.gas_used)
+
+    assert abs(token.balanceOf(whale) - before - to_withdraw) <= 1
+    assert vault.strategies(strategy).dict()["totalLoss"] == 0
+
+
+def test_lp_sizing_covers_amount(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    chain,
+    amount,
+    xboo,
+):
+    ## deposit to the vault after approving
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    chain.sleep(1)
+
+    # booToLpTokens is a view now, and the lp it quotes is always enough
+    for fraction in [1, 10, 100, 1_000, 5_000]:
+        wanted = amount * fraction // 10_000
+        lp_needed = strategy.booToLpTokens(wanted, 0)
+        (value_boo, value_xboo) = strategy.balanceOfConstituents(lp_needed)
+        assert value_boo + xboo.xBOOForBOO(value_xboo) >= wanted
+
+
+# withdrawals drain our buffer of loose boo, a tend leaves our lp alone and our next harvest tops it up
+def test_boo_buffer_refilled_on_harvest(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    chain,
+    amount,
+):
+    strategy.setBooBuffer(200, {"from": gov})
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    chain.sleep(1)
+    assert strategy.balanceOfWant() >= strategy.estimatedTotalAssets() * 200 // 10_000
+
+    vault.withdraw(vault.balanceOf(whale) // 20, whale, 10_000, {"from": whale})
+    assert strategy.balanceOfWant() < strategy.estimatedTotalAssets() * 200 // 10_000
+
+    staked = strategy.balanceOfLPStaked()
+    strategy.tend({"from": gov})
+    assert strategy.balanceOfLPStaked() == staked
+
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    assert strategy.balanceOfLPStaked() < staked
+    assert strategy.balanceOfWant() >= strategy.estimatedTotalAssets() * 200 // 10_000
@@ -0,0 +1,206 @@
+import asyncio
+import time
+
+import brownie
+import pytest
+from brownie import Contract
+from brownie import config
+from brownie import web3
+
+from strategy_tools.rpc import RpcClient
+from strategy_tools.yswaps import QuoteCache, Trade, build_payloads
+
+# our payload builder should sell rewards through the trade factory for exactly what it quoted
+
+
+def test_yswaps_builder_executes(
+    gov,
+    token,
+    vault,
+    whale,
+    strategy,
+    chain,
+    amount,
+    sex,
+    solid,
+    trade_factory,
+    multicall_swapper,
+    ymechs_safe,
+    offline,
+):
+    token.approve(vault, 2 ** 256 - 1, {"from": whale})
+    vault.deposit(amount, {"from": whale})
+    chain.sleep(1)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+
+    # earn some rewards and claim them
+    chain.sleep(86400)
+    chain.mine(1)
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    chain.mine(1)
+
+    trades = [
+        Trade(strategy.address, reward.address, token.address, reward.balanceOf(strategy))
+        for reward in (sex, solid)
+    ]
+    assert all(trade.amount > 0 for trade in trades)
+
+    async def build():
+        async with RpcClient(web3.provider.endpoint_uri) as rpc:
+            return await build_payloads(QuoteCache(rpc), trades, swapper=multicall_swapper.address)
+
+    payloads = asyncio.run(build())
+    if offline:
+        # our mock spooky pays more for sex but solidly pays more for boo, so the best route crosses venues
+        assert payloads[0].route.venues == ["spooky", "solidly"]
+
+    for reward, payload in zip((sex, solid), payloads):
+        assert payload.min_amount_out < payload.amount_out
+        before = token.balanceOf(strategy)
+        trade_factory.execute["tuple,address,bytes"](
+            payload.trade[:4] + (payload.min_amount_out,),
+            multicall_swapper,
+            payload.swapper_data,
+            {"from": ymechs_safe},
+        )
+        assert reward.balanceOf(strategy) == 0
+        assert token.balanceOf(strategy) - before == payload.amount_out
+
+    # the raw calldata does the same thing as brownie's encoding
+    assert payloads[0].calldata == trade_factory.execute["tuple,address,bytes"].encode_input(
+        payloads[0].trade[:4] + (payloads[0].min_amount_out,),
+        multicall_swapper,
+        payloads[0].swapper_data,
+    )
+
+
+# a big sale split across routes still lands exactly what we quoted
+def test_yswaps_builder_split(
+    gov,
+    strategy,
+    token,
+    sex,
+    trade_factory,
+    multicall_swapper,
+    ymechs_safe,
+    offline,
+    chain,
+):
+    if not offline:
+        pytest.skip("mints sex, mock tokens only")
+    # first harvest turns on our trades
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    sex.mint(strategy, 100_000 * 10 ** 18, {"from": gov})
+    chain.mine(1)
+
+    trade = Trade(strategy.address, sex.address, token.address, sex.balanceOf(strategy))
+
+    async def build():
+        async with RpcClient(web3.provider.endpoint_uri) as rpc:
+            cache = QuoteCache(rpc)
+            (single,) = await build_payloads(cache, [trade], swapper=multicall_swapper.address)
+            (split,) = await build_payloads(cache, [trade], swapper=multicall_swapper.address, split_steps=64)
+            return single, split
+
+    single, split = asyncio.run(build())
+    print(f"Single route: {single.amount_out / 1e18:.2f}, split over {len(split.routes)}: {split.amount_out / 1e18:.2f}")
+    assert len(split.routes) > 1
+    assert split.amount_out > single.amount_out
+
+    before = token.balanceOf(strategy)
+    trade_factory.execute["tuple,address,bytes"](
+        trade[:4] + (split.min_amount_out,), multicall_swapper, split.swapper_data, {"from": ymechs_safe}
+    )
+    assert sex.balanceOf(strategy) == 0
+    assert token.balanceOf(strategy) - before == split.amount_out
+
+
+# reserves move between our quote and the trade, the venue change in the middle of our route absorbs it
+def test_yswaps_builder_reserves_move(
+    gov,
+    strategy,
+    token,
+    sex,
+    wftm,
+    trade_factory,
+    multicall_swapper,
+    spooky_router,
+    ymechs_safe,
+    offline,
+    chain,
+):
+    if not offline:
+        pytest.skip("mints sex, mock tokens only")
+    # first harvest turns on our trades
+    strategy.setDoHealthCheck(False, {"from": gov})
+    strategy.harvest({"from": gov})
+    sex.mint(strategy, 100 * 10 ** 18, {"from": gov})
+    chain.mine(1)
+
+    trade = Trade(strategy.address, sex.address, token.address, sex.balanceOf(strategy))
+
+    async def build():
+        async with RpcClient(web3.provider.endpoint_uri) as rpc:
+            cache = QuoteCache(rpc)
+            (payload,) = await build_payloads(cache, [trade], swapper=multicall_swapper.address)
+            return cache, payload
+
+    cache, payload = asyncio.run(build())
+    assert payload.route.venues == ["spooky", "solidly"]
+    (spooky_hop, solidly_hop) = payload.route.hops
+    assert solidly_hop.amount_in < spooky_hop.amount_out
+
+    # someone sells sex on spooky first, a few bps worse for our first hop
+    (reserve0, reserve1) = cache.reserves[spooky_hop.pool.address]
+    reserve_sex = reserve0 if spooky_hop.pool.token0 == sex.address else reserve1
+    dump = reserve_sex // 5_000
+    sex.mint(gov, dump, {"from": gov})
+    sex.approve(spooky_router, dump, {"from": gov})
+    spooky_router.swapExactTokensForTokens(dump, 0, [sex, wftm], gov, 2 ** 256 - 1, {"from": gov})
+
+    before = token.balanceOf(strategy)
+    trade_factory.execute["tuple,address,bytes"](
+        trade[:4] + (payload.min_amount_out,), multicall_swapper, payload.swapper_data, {"from": ymechs_safe}
+    )
+    assert sex.balanceOf(strategy) == 0
+    # the spooky hop paid less than we quoted but still more than our solidly hop swaps
+    assert token.balanceOf(strategy) - before == payload.amount_out
+
+
+def test_yswaps_builder_benchmark(strategy, token, sex, solid, chain):
+    chain.mine(1)
+    # lots of strategies selling rewards, only the amounts differ
+    trades = [
+        Trade(f"0x{i + 1:040x}", reward.address, token.address, (i + 1) * 10 ** 18)
+        for i in range(500)
+        for reward in (sex, solid)
+    ]
+
+    async def build():
+        async with RpcClient(web3.provider.endpoint_uri) as rpc:
+            cache = QuoteCache(rpc)
+            block = await rpc.block_number()
+
+            start = time.perf_counter()
+            cold = await build_payloads(cache, trades, block=block)
+            cold_time = time.perf_counter() - start
+            cold_calls = rpc.calls
+
+            start = time.perf_counter()
+            warm = await build_payloads(cache, trades, block=block)
+            warm_time = time.perf_counter() - start
+            return cold, cold_calls, cold_time, warm, rpc.calls - cold_calls, warm_time
+
+    cold, cold_calls, cold_time, warm, warm_calls, warm_time = asyncio.run(build())
+
+    print(f"Cold: {cold_calls} round-trips, {len(trades) / cold_time:.0f} payloads/s")
+    print(f"Warm: {warm_calls} round-trips, {len(trades) / warm_time:.0f} payloads/s")
+
+    # discovery plus reserves the first time, nothing but quoting from then on
+    assert cold_calls <= 3
+    assert warm_calls == 0
+    assert [p.calldata for p in cold] == [p.calldata for p in warm]
+    assert all(p is not None and p.route.amount_out > 0 for p in cold)